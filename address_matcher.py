@@ -0,0 +1,179 @@
+from collections import defaultdict
+
+from address_utils import normalize_address, parse_address_components, HOUSE_NUMBER_RE
+
+# Relative weight of each component in a match score
+COMPONENT_WEIGHTS = {
+    'house_number': 0.45,
+    'street': 0.35,
+    'city': 0.1,
+    'zip': 0.1,
+}
+
+# Minimum score for a candidate to count as the same property
+MATCH_THRESHOLD = 0.75
+
+# Street trigram similarity below which a candidate is rejected outright,
+# unless one street name contains the other (directionals, unit suffixes)
+MIN_STREET_SIMILARITY = 0.7
+
+# Candidates scored in full per query, picked by shared trigram count
+MAX_SCORED_CANDIDATES = 50
+
+
+def trigrams(text):
+    """Return the set of padded character trigrams of a lowercased string"""
+    text = f"  {text.lower()} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _similarity(a, b):
+    """Jaccard similarity of two trigram sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _contains_words(a, b):
+    a, b = f" {a.lower()} ", f" {b.lower()} "
+    return a in b or b in a
+
+
+def candidate_components(record):
+    """Extract normalized address components from a zestimate or parcel record"""
+    address = record.get('address')
+
+    if isinstance(address, dict):
+        # Parcels API returns a structured address
+        full = address.get('full') or ''
+        components = parse_address_components(full) if full else {}
+        house = str(address.get('house') or components.get('house_number') or '')
+        street = address.get('street') or ''
+        if street:
+            street = normalize_address(street)
+            house_match = HOUSE_NUMBER_RE.match(street)
+            if house_match and house_match.group(1) == house:
+                street = house_match.group(2)
+        else:
+            street = components.get('street', '')
+        return {
+            'full': full,
+            'house_number': house,
+            'street': street,
+            'city': (address.get('city') or components.get('city') or ''),
+            'zip': str(address.get('zip') or components.get('zip') or '')[:5],
+        }
+
+    # Zestimates API returns a single address string
+    full = str(address or '')
+    components = parse_address_components(full)
+    return {
+        'full': full,
+        'house_number': components.get('house_number', ''),
+        'street': components.get('street', ''),
+        'city': components.get('city', ''),
+        'zip': components.get('zip', '')[:5],
+    }
+
+
+class AddressIndex:
+    """Trigram index over candidate addresses for offline fuzzy matching.
+
+    Candidates come from bundles that were already fetched (``near`` results,
+    parcel searches), so ranking a query costs no HTTP calls.
+    """
+
+    def __init__(self, records=None):
+        self._candidates = []
+        self._street_grams = []
+        self._by_trigram = defaultdict(set)
+        self._by_house = defaultdict(set)
+        self._seen = set()
+        if records:
+            self.add_records(records)
+
+    def __len__(self):
+        return len(self._candidates)
+
+    def add_records(self, records):
+        for record in records:
+            self.add(record)
+
+    def add(self, record):
+        """Index a zestimate or parcel record; records without a ZPID are skipped"""
+        zpid = record.get('zpid')
+        if not zpid or str(zpid) in self._seen:
+            return
+        components = candidate_components(record)
+        if not components['street'] and not components['full']:
+            return
+
+        index = len(self._candidates)
+        self._seen.add(str(zpid))
+        self._candidates.append((str(zpid), components))
+
+        grams = trigrams(components['street'] or components['full'])
+        self._street_grams.append(grams)
+        for gram in grams:
+            self._by_trigram[gram].add(index)
+        if components['house_number']:
+            self._by_house[components['house_number']].add(index)
+
+    def match(self, address, limit=5, min_score=0.0):
+        """Rank indexed candidates against an address, best first"""
+        query = parse_address_components(address)
+        if not query or not self._candidates:
+            return []
+
+        house = query.get('house_number', '')
+        street_grams = trigrams(query.get('street', ''))
+
+        # Shortlist by shared trigrams, always keeping exact house number hits
+        shared = defaultdict(int)
+        for gram in street_grams:
+            for index in self._by_trigram.get(gram, ()):
+                shared[index] += 1
+        shortlist = set(sorted(shared, key=shared.get, reverse=True)[:MAX_SCORED_CANDIDATES])
+        shortlist.update(self._by_house.get(house, ()))
+
+        matches = []
+        for index in shortlist:
+            zpid, components = self._candidates[index]
+            score = self._score(query, street_grams, components, self._street_grams[index])
+            if score >= min_score:
+                matches.append({
+                    'zpid': zpid,
+                    'address': components['full'],
+                    'score': round(score, 4),
+                    'components': components
+                })
+
+        matches.sort(key=lambda m: m['score'], reverse=True)
+        return matches[:limit]
+
+    @staticmethod
+    def _score(query, query_grams, components, candidate_grams):
+        # Only the same house number on (nearly) the same street can be the same property
+        house, street = query.get('house_number'), query.get('street')
+        if not house or not street or house.lower() != str(components['house_number']).lower():
+            return 0.0
+        street_similarity = _similarity(query_grams, candidate_grams)
+        if street_similarity < MIN_STREET_SIMILARITY and not _contains_words(street, components['street']):
+            return 0.0
+
+        total = 0.0
+        weight_sum = 0.0
+
+        for field, weight in COMPONENT_WEIGHTS.items():
+            wanted = query.get(field)
+            if not wanted:
+                continue
+            weight_sum += weight
+            if field == 'street':
+                total += weight * street_similarity
+            elif field == 'zip':
+                total += weight * (wanted[:5] == components['zip'])
+            else:
+                total += weight * (wanted.lower() == str(components[field]).lower())
+
+        return total / weight_sum if weight_sum else 0.0
@@ -0,0 +1,333 @@
+import re
+from functools import lru_cache
+
+# Precompiled patterns shared by the normalizer and parser
+WHITESPACE_RE = re.compile(r'\s+')
+HOUSE_NUMBER_RE = re.compile(r'^(\d+)\s+(.+)')
+STATE_ZIP_RE = re.compile(r'^([A-Z]{2})\s+(\d{5}(?:-\d{4})?)$')
+STATE_RE = re.compile(r'^([A-Z]{2})$')
+ZIP_RE = re.compile(r'^(\d{5}(?:-\d{4})?)$')
+# A state code before a zip at the end of a part ("Seattle wa 98101")
+STATE_BEFORE_ZIP_RE = re.compile(r'\b([A-Za-z]{2})(\s+\d{5}(?:-\d{4})?)$')
+
+# Common suffixes abbreviated wherever they appear in the street part
+COMMON_SUFFIXES = {
+    'STREET': 'St', 'ST': 'St',
+    'AVENUE': 'Ave', 'AVE': 'Ave',
+    'ROAD': 'Rd', 'RD': 'Rd',
+    'DRIVE': 'Dr', 'DR': 'Dr',
+    'COURT': 'Ct', 'CT': 'Ct',
+    'LANE': 'Ln', 'LN': 'Ln',
+    'PLACE': 'Pl', 'PL': 'Pl',
+    'BOULEVARD': 'Blvd', 'BLVD': 'Blvd',
+    'CIRCLE': 'Cir', 'CIR': 'Cir',
+    'TERRACE': 'Ter', 'TER': 'Ter',
+    'WAY': 'Way',
+}
+
+# USPS Publication 28 suffixes, only applied to the last street token
+USPS_SUFFIXES = {
+    'ALLEY': 'Aly', 'ALLEE': 'Aly', 'ALLY': 'Aly',
+    'ANNEX': 'Anx', 'ANEX': 'Anx',
+    'ARCADE': 'Arc',
+    'AV': 'Ave', 'AVEN': 'Ave', 'AVENU': 'Ave', 'AVN': 'Ave', 'AVNUE': 'Ave',
+    'BAYOU': 'Byu', 'BAYOO': 'Byu',
+    'BEACH': 'Bch',
+    'BEND': 'Bnd',
+    'BLUFF': 'Blf',
+    'BOTTOM': 'Btm',
+    'BOUL': 'Blvd', 'BOULV': 'Blvd',
+    'BRANCH': 'Br', 'BRNCH': 'Br',
+    'BRIDGE': 'Brg', 'BRDGE': 'Brg',
+    'BROOK': 'Brk',
+    'BYPASS': 'Byp', 'BYPAS': 'Byp', 'BYPS': 'Byp',
+    'CANYON': 'Cyn', 'CANYN': 'Cyn', 'CNYN': 'Cyn',
+    'CAUSEWAY': 'Cswy', 'CAUSWA': 'Cswy',
+    'CENTER': 'Ctr', 'CENTRE': 'Ctr', 'CENTR': 'Ctr', 'CENT': 'Ctr', 'CNTR': 'Ctr', 'CNTER': 'Ctr',
+    'CIRC': 'Cir', 'CIRCL': 'Cir', 'CRCL': 'Cir', 'CRCLE': 'Cir',
+    'CLIFF': 'Clf', 'CLIFFS': 'Clfs',
+    'CLUB': 'Clb',
+    'COMMON': 'Cmn', 'COMMONS': 'Cmns',
+    'CORNER': 'Cor', 'CORNERS': 'Cors',
+    'COURSE': 'Crse',
+    'COURTS': 'Cts',
+    'COVE': 'Cv', 'COVES': 'Cvs',
+    'CREEK': 'Crk',
+    'CRESCENT': 'Cres', 'CRSENT': 'Cres', 'CRSNT': 'Cres',
+    'CROSSING': 'Xing', 'CRSSNG': 'Xing',
+    'CROSSROAD': 'Xrd', 'CROSSROADS': 'Xrds',
+    'CURVE': 'Curv',
+    'DALE': 'Dl',
+    'DAM': 'Dm',
+    'DIVIDE': 'Dv', 'DIV': 'Dv', 'DVD': 'Dv',
+    'DRIV': 'Dr', 'DRV': 'Dr', 'DRIVES': 'Drs',
+    'ESTATE': 'Est', 'ESTATES': 'Ests',
+    'EXPRESSWAY': 'Expy', 'EXPRESS': 'Expy', 'EXPR': 'Expy', 'EXPW': 'Expy',
+    'EXTENSION': 'Ext', 'EXTN': 'Ext', 'EXTNSN': 'Ext',
+    'FALLS': 'Fls',
+    'FERRY': 'Fry', 'FRRY': 'Fry',
+    'FIELD': 'Fld', 'FIELDS': 'Flds',
+    'FLAT': 'Flt', 'FLATS': 'Flts',
+    'FORD': 'Frd',
+    'FOREST': 'Frst', 'FORESTS': 'Frst',
+    'FORGE': 'Frg', 'FORG': 'Frg',
+    'FORK': 'Frk', 'FORKS': 'Frks',
+    'FREEWAY': 'Fwy', 'FREEWY': 'Fwy', 'FRWAY': 'Fwy', 'FRWY': 'Fwy',
+    'GARDEN': 'Gdn', 'GARDENS': 'Gdns', 'GARDN': 'Gdn', 'GRDEN': 'Gdn', 'GRDN': 'Gdn',
+    'GATEWAY': 'Gtwy', 'GATEWY': 'Gtwy', 'GATWAY': 'Gtwy', 'GTWAY': 'Gtwy',
+    'GLEN': 'Gln',
+    'GREEN': 'Grn',
+    'GROVE': 'Grv', 'GROV': 'Grv',
+    'HARBOR': 'Hbr', 'HARB': 'Hbr', 'HARBR': 'Hbr', 'HRBOR': 'Hbr',
+    'HAVEN': 'Hvn',
+    'HEIGHTS': 'Hts', 'HT': 'Hts',
+    'HIGHWAY': 'Hwy', 'HIGHWY': 'Hwy', 'HIWAY': 'Hwy', 'HIWY': 'Hwy', 'HWAY': 'Hwy',
+    'HILL': 'Hl', 'HILLS': 'Hls',
+    'HOLLOW': 'Holw', 'HOLLOWS': 'Holw', 'HLLW': 'Holw', 'HOLWS': 'Holw',
+    'ISLAND': 'Is', 'ISLND': 'Is', 'ISLANDS': 'Iss',
+    'JUNCTION': 'Jct', 'JCTION': 'Jct', 'JCTN': 'Jct', 'JUNCTN': 'Jct', 'JUNCTON': 'Jct',
+    'KEY': 'Ky', 'KEYS': 'Kys',
+    'KNOLL': 'Knl', 'KNOL': 'Knl', 'KNOLLS': 'Knls',
+    'LAKE': 'Lk', 'LAKES': 'Lks',
+    'LANDING': 'Lndg', 'LNDNG': 'Lndg',
+    'LIGHT': 'Lgt', 'LIGHTS': 'Lgts',
+    'LOAF': 'Lf',
+    'LOCK': 'Lck', 'LOCKS': 'Lcks',
+    'LODGE': 'Ldg', 'LDGE': 'Ldg', 'LODG': 'Ldg',
+    'LOOPS': 'Loop',
+    'MANOR': 'Mnr', 'MANORS': 'Mnrs',
+    'MEADOW': 'Mdw', 'MEADOWS': 'Mdws', 'MEDOWS': 'Mdws',
+    'MILL': 'Ml', 'MILLS': 'Mls',
+    'MISSION': 'Msn', 'MISSN': 'Msn', 'MSSN': 'Msn',
+    'MOTORWAY': 'Mtwy',
+    'MOUNT': 'Mt', 'MNT': 'Mt',
+    'MOUNTAIN': 'Mtn', 'MNTAIN': 'Mtn', 'MNTN': 'Mtn', 'MOUNTIN': 'Mtn', 'MTIN': 'Mtn',
+    'NECK': 'Nck',
+    'ORCHARD': 'Orch', 'ORCHRD': 'Orch',
+    'OVL': 'Oval',
+    'OVERPASS': 'Opas',
+    'PARKS': 'Park',
+    'PARKWAY': 'Pkwy', 'PARKWY': 'Pkwy', 'PKWAY': 'Pkwy', 'PKY': 'Pkwy', 'PARKWAYS': 'Pkwy',
+    'PASSAGE': 'Psge',
+    'PINE': 'Pne', 'PINES': 'Pnes',
+    'PLAIN': 'Pln', 'PLAINS': 'Plns',
+    'PLAZA': 'Plz', 'PLZA': 'Plz',
+    'POINT': 'Pt', 'POINTS': 'Pts',
+    'PORT': 'Prt', 'PORTS': 'Prts',
+    'PRAIRIE': 'Pr', 'PRR': 'Pr',
+    'RADIAL': 'Radl', 'RAD': 'Radl', 'RADIEL': 'Radl',
+    'RANCH': 'Rnch', 'RANCHES': 'Rnch', 'RNCHS': 'Rnch',
+    'RAPID': 'Rpd', 'RAPIDS': 'Rpds',
+    'REST': 'Rst',
+    'RIDGE': 'Rdg', 'RDGE': 'Rdg', 'RIDGES': 'Rdgs',
+    'RIVER': 'Riv', 'RVR': 'Riv', 'RIVR': 'Riv',
+    'ROADS': 'Rds',
+    'ROUTE': 'Rte',
+    'SHOAL': 'Shl', 'SHOALS': 'Shls',
+    'SHORE': 'Shr', 'SHOAR': 'Shr', 'SHORES': 'Shrs', 'SHOARS': 'Shrs',
+    'SKYWAY': 'Skwy',
+    'SPRING': 'Spg', 'SPNG': 'Spg', 'SPRNG': 'Spg', 'SPRINGS': 'Spgs', 'SPNGS': 'Spgs', 'SPRNGS': 'Spgs',
+    'SPURS': 'Spur',
+    'SQUARE': 'Sq', 'SQR': 'Sq', 'SQRE': 'Sq', 'SQU': 'Sq', 'SQUARES': 'Sqs',
+    'STATION': 'Sta', 'STATN': 'Sta', 'STN': 'Sta',
+    'STRAVENUE': 'Stra', 'STRAV': 'Stra', 'STRAVEN': 'Stra', 'STRAVN': 'Stra', 'STRVN': 'Stra', 'STRVNUE': 'Stra',
+    'STREAM': 'Strm', 'STREME': 'Strm',
+    'STRT': 'St', 'STR': 'St', 'STREETS': 'Sts',
+    'SUMMIT': 'Smt', 'SUMIT': 'Smt', 'SUMITT': 'Smt',
+    'TERR': 'Ter',
+    'THROUGHWAY': 'Trwy',
+    'TRACE': 'Trce', 'TRACES': 'Trce',
+    'TRACK': 'Trak', 'TRACKS': 'Trak', 'TRK': 'Trak', 'TRKS': 'Trak',
+    'TRAFFICWAY': 'Trfy',
+    'TRAIL': 'Trl', 'TRAILS': 'Trl', 'TRLS': 'Trl',
+    'TRAILER': 'Trlr', 'TRLRS': 'Trlr',
+    'TUNNEL': 'Tunl', 'TUNEL': 'Tunl', 'TUNLS': 'Tunl', 'TUNNELS': 'Tunl', 'TUNNL': 'Tunl',
+    'TURNPIKE': 'Tpke', 'TRNPK': 'Tpke', 'TURNPK': 'Tpke',
+    'UNDERPASS': 'Upas',
+    'UNION': 'Un', 'UNIONS': 'Uns',
+    'VALLEY': 'Vly', 'VALLY': 'Vly', 'VLLY': 'Vly', 'VALLEYS': 'Vlys',
+    'VIADUCT': 'Via', 'VDCT': 'Via', 'VIADCT': 'Via',
+    'VIEW': 'Vw', 'VIEWS': 'Vws',
+    'VILLAGE': 'Vlg', 'VILL': 'Vlg', 'VILLAG': 'Vlg', 'VILLG': 'Vlg', 'VILLIAGE': 'Vlg', 'VILLAGES': 'Vlgs',
+    'VILLE': 'Vl',
+    'VISTA': 'Vis', 'VIST': 'Vis', 'VST': 'Vis', 'VSTA': 'Vis',
+    'WALKS': 'Walk',
+    'WY': 'Way', 'WAYS': 'Ways',
+    'WELL': 'Wl', 'WELLS': 'Wls',
+}
+
+DIRECTIONALS = {
+    'NORTH': 'N', 'N': 'N',
+    'SOUTH': 'S', 'S': 'S',
+    'EAST': 'E', 'E': 'E',
+    'WEST': 'W', 'W': 'W',
+    'NORTHEAST': 'NE', 'NE': 'NE',
+    'NORTHWEST': 'NW', 'NW': 'NW',
+    'SOUTHEAST': 'SE', 'SE': 'SE',
+    'SOUTHWEST': 'SW', 'SW': 'SW',
+}
+
+# Unit designators that are followed by a unit number ("Apt 4", "Suite 200")
+RANGED_UNITS = {
+    'APARTMENT': 'Apt', 'APT': 'Apt',
+    'BUILDING': 'Bldg', 'BLDG': 'Bldg',
+    'DEPARTMENT': 'Dept', 'DEPT': 'Dept',
+    'FLOOR': 'Fl', 'FL': 'Fl',
+    'HANGAR': 'Hngr', 'HNGR': 'Hngr',
+    'KEY': 'Key',
+    'LOT': 'Lot',
+    'PIER': 'Pier',
+    'ROOM': 'Rm', 'RM': 'Rm',
+    'SLIP': 'Slip',
+    'SPACE': 'Spc', 'SPC': 'Spc',
+    'STOP': 'Stop',
+    'SUITE': 'Ste', 'STE': 'Ste',
+    'TRAILER': 'Trlr', 'TRLR': 'Trlr',
+    'UNIT': 'Unit',
+    '#': '#',
+}
+
+# Unit designators that stand alone at the end of the street line ("Rear")
+UNRANGED_UNITS = {
+    'BASEMENT': 'Bsmt', 'BSMT': 'Bsmt',
+    'FRONT': 'Frnt', 'FRNT': 'Frnt',
+    'LOBBY': 'Lbby', 'LBBY': 'Lbby',
+    'LOWER': 'Lowr', 'LOWR': 'Lowr',
+    'OFFICE': 'Ofc', 'OFC': 'Ofc',
+    'PENTHOUSE': 'Ph', 'PH': 'Ph',
+    'REAR': 'Rear',
+    'SIDE': 'Side',
+    'UPPER': 'Uppr', 'UPPR': 'Uppr',
+}
+
+# Any-position lookups for the street part, merged once at import time
+STREET_TOKENS = {**COMMON_SUFFIXES, **DIRECTIONALS}
+DIRECTIONAL_ABBREVIATIONS = set(DIRECTIONALS.values())
+
+
+def _normalize_street(street):
+    """Normalize the street segment of an address in one pass over its tokens"""
+    tokens = street.split(' ')
+    last = len(tokens) - 1
+    result = []
+    unit_start = None
+    suffix_index = None
+    suffix_key = None
+
+    for i, token in enumerate(tokens):
+        key = token.upper().rstrip('.')
+
+        if unit_start is not None:
+            result.append(key)
+            continue
+
+        # A unit designator needs at least a house number and street name before it
+        if len(result) >= 2:
+            if key in RANGED_UNITS and i < last:
+                unit_start = len(result)
+                result.append(RANGED_UNITS[key])
+                continue
+            if key in UNRANGED_UNITS and i == last:
+                unit_start = len(result)
+                result.append(UNRANGED_UNITS[key])
+                continue
+            if key.startswith('#') and len(key) > 1:
+                # "#3" stays one token, as searches send it
+                unit_start = len(result)
+                result.append(key)
+                continue
+
+        abbrev = STREET_TOKENS.get(key)
+        if abbrev is None:
+            # Keep ordinals as "27th" rather than str.title()'s "27Th"
+            abbrev = token.lower() if token[:1].isdigit() else token.title()
+            if key in USPS_SUFFIXES:
+                suffix_index, suffix_key = len(result), key
+        result.append(abbrev)
+
+    # The full USPS table only applies at the suffix position, never to street
+    # names ("Lake Shore Dr" stays as is, "Lake Shore Parkway" -> "Lake Shore Pkwy")
+    street_end = (unit_start if unit_start is not None else len(result)) - 1
+    while street_end > 1 and result[street_end] in DIRECTIONAL_ABBREVIATIONS:
+        street_end -= 1
+    if suffix_index is not None and suffix_index == street_end and suffix_index > 1:
+        result[suffix_index] = USPS_SUFFIXES[suffix_key]
+
+    return ' '.join(result)
+
+
+def _normalize_locality(part, city=False):
+    """Title-case a city / state / zip part, keeping state codes upper case"""
+    if not city and STATE_RE.match(part.upper()):
+        return part.upper()
+    return STATE_BEFORE_ZIP_RE.sub(lambda m: m.group(1).upper() + m.group(2), part.title())
+
+
+@lru_cache(maxsize=4096)
+def normalize_address(address):
+    """Normalize an address string for consistent searching"""
+    if not address:
+        return ""
+
+    # Remove extra whitespace, then normalize comma-separated parts
+    address = WHITESPACE_RE.sub(' ', address.strip())
+    parts = [part.strip() for part in address.split(',')]
+
+    # Street suffixes and directionals only apply to the street part so city
+    # names like "North Miami" or "Lake Oswego" are left alone
+    normalized = [_normalize_street(parts[0])] if parts[0] else ['']
+    normalized.extend(_normalize_locality(part, city=i == 1) for i, part in enumerate(parts[1:], 1))
+
+    return ', '.join(part for part in normalized if part)
+
+
+@lru_cache(maxsize=4096)
+def _parse_address_components(address):
+    normalized = normalize_address(address)
+
+    # Split address by commas to separate components
+    parts = [part.strip() for part in normalized.split(',') if part.strip()]
+
+    components = {}
+
+    if len(parts) >= 1:
+        # First part is typically street address
+        house_match = HOUSE_NUMBER_RE.match(parts[0])
+        if house_match:
+            components['house_number'] = house_match.group(1)
+            components['street'] = house_match.group(2)
+        else:
+            components['street'] = parts[0]
+
+    if len(parts) >= 2:
+        # Second part is typically city
+        components['city'] = parts[1]
+
+    # Handle state and zip - could be in different formats
+    for part in parts[2:]:
+        part = part.upper()
+
+        state_zip_match = STATE_ZIP_RE.match(part)
+        if state_zip_match:
+            components['state'] = state_zip_match.group(1)
+            components['zip'] = state_zip_match.group(2)
+            break
+
+        state_match = STATE_RE.match(part)
+        if state_match:
+            components['state'] = state_match.group(1)
+            continue
+
+        zip_match = ZIP_RE.match(part)
+        if zip_match:
+            components['zip'] = zip_match.group(1)
+
+    return tuple(components.items())
+
+
+def parse_address_components(address):
+    """Parse address into searchable components"""
+    if not address:
+        return {}
+    # Memoized as a tuple so callers always get their own dict
+    return dict(_parse_address_components(address))
@@ -1,52 +1,181 @@
-from flask import Flask, request, jsonify, render_template, send_from_directory
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import Flask, request, jsonify, render_template, send_from_directory, Response, stream_with_context
 from flask_cors import CORS
 import os
+import importlib.util
+import itertools
 import requests
-from dotenv import load_dotenv
 import json
 from datetime import datetime
 import logging
-import time
 import re
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry  # Fixed import
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from cachetools import TTLCache
+from address_utils import normalize_address, parse_address_components
+from address_matcher import AddressIndex, MATCH_THRESHOLD
+from bridge import BridgeBatchError, BridgeClient, build_property_record
+import fast_json
+from fast_json import FastJSONProvider
+from http_caching import init_compression, etag_for_versions, etag_for_body, etag_matches, not_modified
+from instrumentation import init_instrumentation, record_cache, run_in_context, upstream_histograms
+from metrics import init_metrics
+from property_cache import PropertyCache, PortfolioSummaryStore, summarize_properties
+from property_query import PropertyIndex, has_query_args, parse_query_args
+from comparables import rank_comparables
 # Removed geopy imports - using direct API address filtering instead
 
-# Setup logging and load environment variables
-logging.basicConfig(level=logging.DEBUG)
+# Setup logging (LOG_LEVEL=DEBUG for full request/response logging)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
-load_dotenv()
-
-try:
-    import gspread
-    logger.info("Successfully imported gspread")
-    from google.oauth2.service_account import Credentials
-    logger.info("Successfully imported Credentials from google.oauth2.service_account")
-    SHEETS_AVAILABLE = True
-    logger.info("Google Sheets dependencies available")
-except ImportError as e:
-    SHEETS_AVAILABLE = False
-    logger.error(f"Google Sheets dependencies not available: {e}. Portfolio saving will use in-memory storage.")
+
+# Serverless and production deployments get their environment from the platform
+if not os.getenv("VERCEL") and os.getenv("FLASK_ENV") != "production":
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# Google Sheets dependencies are only imported the first time a portfolio is
+# saved or read; checking that they are installed does not import them
+def module_available(name):
+    """Check that a module is installed without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
+
+SHEETS_AVAILABLE = module_available("gspread") and module_available("google.oauth2")
+if not SHEETS_AVAILABLE:
+    logger.warning("Google Sheets dependencies not available. Portfolio saving will use in-memory storage.")
+
+# Cold start timings, served by /api/startup-report
+STARTUP_REPORT = {
+    "module_import_ms": None,
+    "first_request_ms": None,
+    "lazy_imports_ms": {}
+}
+
+_SHEETS_MODULES = None
+
+def load_sheets_modules():
+    """Import gspread and google-auth on first use; returns (gspread, Credentials)"""
+    global _SHEETS_MODULES
+    if _SHEETS_MODULES is None:
+        start = time.perf_counter()
+        import gspread
+        from google.oauth2.service_account import Credentials
+        _SHEETS_MODULES = (gspread, Credentials)
+        STARTUP_REPORT["lazy_imports_ms"]["sheets"] = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(f"Loaded Google Sheets dependencies in {STARTUP_REPORT['lazy_imports_ms']['sheets']} ms")
+    return _SHEETS_MODULES
+
+def load_module(name):
+    """Import an optional subsystem (export, comps, tiles) on first use"""
+    module = sys.modules.get(name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        STARTUP_REPORT["lazy_imports_ms"][name] = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(f"Loaded {name} in {STARTUP_REPORT['lazy_imports_ms'][name]} ms")
+    return module
 
 # Initialize Flask app
 app = Flask(__name__, 
     template_folder='templates',
     static_folder='static'
 )
+app.json = FastJSONProvider(app)
 CORS(app)
+init_compression(app)
+init_instrumentation(app)
+init_metrics(app)
+# The sampling profiler is only imported when it is switched on
+if os.getenv("PROFILE_REQUESTS", "").lower() in ("1", "true", "yes"):
+    from request_profiler import init_profiler
+    init_profiler(app)
 API_KEY = os.getenv("API_KEY")
 
+# Shared Bridge data access: pooled session, zpid.in batching, ZPID caches and
+# rate limiting, configured from BRIDGE_* env vars (BRIDGE_API_BASE can point
+# at benchmarks/mock_bridge.py to run offline)
+bridge_client = BridgeClient.from_env()
+ZESTIMATES_URL = bridge_client.zestimates_url
+PARCELS_URL = bridge_client.parcels_url
+# Every Bridge call goes through this session so it is timed per request
+http = bridge_client.session
+
 # Using direct Bridge API address filtering - no geocoding needed
 
 # In-memory storage fallback for read-only environments
 MEMORY_PORTFOLIOS = []
+MEMORY_PORTFOLIOS_LOCK = threading.Lock()
+
+# Address indexes over parcels fetched per (city, zip) for fallback matching
+AREA_INDEXES = TTLCache(maxsize=64, ttl=3600)
+AREA_INDEXES_LOCK = threading.Lock()
+
+# Processed property records and materialized per-portfolio summaries; least
+# recently used records beyond PROPERTY_CACHE_SIZE drop out of both and the indexes
+property_cache = PropertyCache(maxsize=int(os.getenv("PROPERTY_CACHE_SIZE", 20000)))
+portfolio_summaries = PortfolioSummaryStore(property_cache)
+# Sorted indexes for server-side sort, filter and paging of cached records
+property_index = PropertyIndex(property_cache)
+# Distinct ZPIDs one bulk refresh may fetch; with BRIDGE_BATCH_DELAY between
+# 50-ZPID batches, 2000 keeps a refresh well inside the worker timeout
+MAX_REFRESH_ZPIDS = int(os.getenv("MAX_REFRESH_ZPIDS", 2000))
+# Distinct ZPIDs one Parquet/Arrow export may fetch, capped for the same reason
+MAX_EXPORT_ZPIDS = int(os.getenv("MAX_EXPORT_ZPIDS", 2000))
+
+# Neighbors fetched from Bridge per nearby request, and how many of the most similar are returned
+NEARBY_CANDIDATES = int(os.getenv("NEARBY_CANDIDATES", 20))
+NEARBY_RESULTS = int(os.getenv("NEARBY_RESULTS", 20))
+
+# Comparable sales cached per geohash cell; sales change slowly, so cells live a day by default
+COMPS_CACHE_TTL = int(os.getenv("COMPS_CACHE_TTL", 86400))
+MAX_COMPS_RADIUS_MILES = 2.0
+MAX_COMPS_LIMIT = 50
+# Normalized address -> ZPID of comps searches, so warm searches skip the address lookup
+COMPS_SUBJECTS = TTLCache(maxsize=10000, ttl=86400)
+COMPS_SUBJECTS_LOCK = threading.Lock()
+
+# The comps engine and the map tile cache are built by the first request using them
+_SUBSYSTEMS = {}
+_SUBSYSTEMS_LOCK = threading.Lock()
+
+def get_comps_engine():
+    with _SUBSYSTEMS_LOCK:
+        if 'comps' not in _SUBSYSTEMS:
+            CompsEngine = load_module('comps').CompsEngine
+            _SUBSYSTEMS['comps'] = CompsEngine(bridge_client, cache_ttl=COMPS_CACHE_TTL,
+                                               workers=bridge_client.parcel_workers)
+        return _SUBSYSTEMS['comps']
+
+def get_tile_cache():
+    """Enriched properties per map tile for the nearby map, cached as long as Zestimates"""
+    with _SUBSYSTEMS_LOCK:
+        if 'tiles' not in _SUBSYSTEMS:
+            TileCache = load_module('tiles').TileCache
+            _SUBSYSTEMS['tiles'] = TileCache(bridge_client, cache_ttl=bridge_client.zestimate_cache.ttl,
+                                             workers=bridge_client.parcel_workers)
+        return _SUBSYSTEMS['tiles']
 
 # Google Sheets configuration
 GOOGLE_SERVICE_ACCOUNT_KEY = os.getenv("GOOGLE_SERVICE_ACCOUNT_KEY")
 GOOGLE_SHEET_ID = os.getenv("GOOGLE_SHEET_ID", "1BvLNvgwK5h7gO_3wD1C2mF8jL9pR6tY")  # Default sheet ID
 
+# One authorized client per process; SHEETS_LOCK also serializes sheet writes
+# so concurrent saves can't interleave the header check and append
+_SHEETS_CLIENT = None
+SHEETS_LOCK = threading.Lock()
+
 def get_sheets_client():
     """Get authenticated Google Sheets client"""
+    global _SHEETS_CLIENT
+    if _SHEETS_CLIENT is not None:
+        return _SHEETS_CLIENT
+    
     if not SHEETS_AVAILABLE:
         logger.error("Google Sheets dependencies not available")
         return None
@@ -61,15 +190,18 @@ def get_sheets_client():
         service_account_info = json.loads(GOOGLE_SERVICE_ACCOUNT_KEY)
         logger.debug(f"Service account info parsed successfully, type: {service_account_info.get('type')}")
         
+        gspread, Credentials = load_sheets_modules()
         credentials = Credentials.from_service_account_info(
             service_account_info,
             scopes=['https://www.googleapis.com/auth/spreadsheets']
         )
         logger.debug("Credentials created successfully")
         
-        client = gspread.authorize(credentials)
-        logger.debug("Google Sheets client authorized successfully")
-        return client
+        with SHEETS_LOCK:
+            if _SHEETS_CLIENT is None:
+                _SHEETS_CLIENT = gspread.authorize(credentials)
+                logger.debug("Google Sheets client authorized successfully")
+        return _SHEETS_CLIENT
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse GOOGLE_SERVICE_ACCOUNT_KEY as JSON: {e}")
         return None
@@ -100,34 +232,38 @@ def save_portfolio_to_sheets(portfolio_data):
         row_data = [
             timestamp,
             portfolio_data.get('name', 'Unnamed'),
-            json.dumps(portfolio_data.get('zpids', [])),
+            fast_json.dumps(portfolio_data.get('zpids', [])),
             portfolio_data.get('input', ''),
-            json.dumps(portfolio_data.get('data', {}))
+            fast_json.dumps(portfolio_data.get('data', {}))
         ]
         logger.debug(f"Prepared row data for portfolio: {portfolio_data.get('name')}")
         
-        # Add header if sheet is empty
-        try:
-            existing_headers = sheet.row_values(1)
-            if not existing_headers:
-                logger.debug("Sheet appears empty, adding headers")
-                sheet.append_row(['Timestamp', 'Portfolio Name', 'ZPIDs', 'Input', 'Data'])
-            else:
-                logger.debug(f"Sheet has existing headers: {existing_headers}")
-        except Exception as e:
-            logger.warning(f"Could not check headers, adding them anyway: {e}")
-            sheet.append_row(['Timestamp', 'Portfolio Name', 'ZPIDs', 'Input', 'Data'])
-        
-        # Add portfolio data
-        logger.debug("Adding portfolio data to sheet")
-        sheet.append_row(row_data)
-        logger.info(f"Portfolio '{portfolio_data.get('name')}' saved successfully to Google Sheets")
-        return True
+        with SHEETS_LOCK:
+            return _append_portfolio_row(sheet, row_data, portfolio_data.get('name'))
         
     except Exception as e:
         logger.error(f"Error saving portfolio to Google Sheets: {e}", exc_info=True)
         return False
 
+def _append_portfolio_row(sheet, row_data, name):
+    """Append a portfolio row, adding the header row first if the sheet is empty"""
+    try:
+        existing_headers = sheet.row_values(1)
+        if not existing_headers:
+            logger.debug("Sheet appears empty, adding headers")
+            sheet.append_row(['Timestamp', 'Portfolio Name', 'ZPIDs', 'Input', 'Data'])
+        else:
+            logger.debug(f"Sheet has existing headers: {existing_headers}")
+    except Exception as e:
+        logger.warning(f"Could not check headers, adding them anyway: {e}")
+        sheet.append_row(['Timestamp', 'Portfolio Name', 'ZPIDs', 'Input', 'Data'])
+    
+    # Add portfolio data
+    logger.debug("Adding portfolio data to sheet")
+    sheet.append_row(row_data)
+    logger.info(f"Portfolio '{name}' saved successfully to Google Sheets")
+    return True
+
 def get_portfolios_from_sheets():
     """Get all portfolios from Google Sheets"""
     try:
@@ -143,9 +279,9 @@ def get_portfolios_from_sheets():
             try:
                 portfolio = {
                     'name': record.get('Portfolio Name'),
-                    'zpids': json.loads(record.get('ZPIDs', '[]')),
+                    'zpids': fast_json.loads(record.get('ZPIDs', '[]')),
                     'input': record.get('Input', ''),
-                    'data': json.loads(record.get('Data', '{}')),
+                    'data': fast_json.loads(record.get('Data', '{}')),
                     'timestamp': record.get('Timestamp')
                 }
                 portfolios.append(portfolio)
@@ -159,179 +295,30 @@ def get_portfolios_from_sheets():
         logger.error(f"Error getting portfolios from Google Sheets: {e}")
         return []
 
-# Configure retry strategy
-retry_strategy = Retry(
-    total=3,
-    backoff_factor=1,
-    status_forcelist=[429, 500, 502, 503, 504]
-)
-adapter = HTTPAdapter(max_retries=retry_strategy)
-http = requests.Session()
-http.mount("https://", adapter)
-http.mount("http://", adapter)
-
-def safe_float(value, default=0.0):
-    if value is None:
-        return default
-    try:
-        return float(value)
-    except (ValueError, TypeError):
-        return default
-
-def normalize_address(address):
-    """Normalize an address string for consistent searching"""
-    if not address:
-        return ""
-    
-    # Remove extra whitespace and convert to title case
-    address = re.sub(r'\s+', ' ', address.strip()).title()
-    
-    # Common abbreviation standardizations
-    abbreviations = {
-        'Street': 'St', 'St.': 'St',
-        'Avenue': 'Ave', 'Ave.': 'Ave', 
-        'Road': 'Rd', 'Rd.': 'Rd',
-        'Drive': 'Dr', 'Dr.': 'Dr',
-        'Court': 'Ct', 'Ct.': 'Ct',
-        'Lane': 'Ln', 'Ln.': 'Ln',
-        'Place': 'Pl', 'Pl.': 'Pl',
-        'Boulevard': 'Blvd', 'Blvd.': 'Blvd',
-        'Circle': 'Cir', 'Cir.': 'Cir',
-        'Terrace': 'Ter', 'Ter.': 'Ter',
-        'Way': 'Way',
-        'North': 'N', 'South': 'S', 'East': 'E', 'West': 'W',
-        'Northeast': 'NE', 'Northwest': 'NW', 'Southeast': 'SE', 'Southwest': 'SW'
-    }
-    
-    for full, abbrev in abbreviations.items():
-        address = re.sub(rf'\b{full}\b', abbrev, address, flags=re.IGNORECASE)
-    
-    return address
-
-def parse_address_components(address):
-    """Parse address into searchable components"""
-    if not address:
-        return {}
-    
-    # Normalize the address first
-    normalized = normalize_address(address)
-    
-    # Split address by commas to separate components
-    parts = [part.strip() for part in normalized.split(',') if part.strip()]
-    
-    components = {}
-    
-    if len(parts) >= 1:
-        # First part is typically street address
-        street_part = parts[0]
-        
-        # Extract house number (digits at the beginning)
-        house_match = re.match(r'^(\d+)\s+(.+)', street_part)
-        if house_match:
-            components['house_number'] = house_match.group(1)
-            components['street'] = house_match.group(2)
-        else:
-            components['street'] = street_part
-    
-    if len(parts) >= 2:
-        # Second part is typically city
-        components['city'] = parts[1]
-    
-    # Handle state and zip - could be in different formats
-    if len(parts) >= 3:
-        # Look through remaining parts for state and zip
-        for i in range(2, len(parts)):
-            part = parts[i].strip().upper()
-            
-            # Check if this part contains both state and zip
-            state_zip_match = re.match(r'^([A-Z]{2})\s+(\d{5}(?:-\d{4})?)$', part)
-            if state_zip_match:
-                components['state'] = state_zip_match.group(1)
-                components['zip'] = state_zip_match.group(2)
-                break
-            
-            # Check if this is just a state
-            state_match = re.match(r'^([A-Z]{2})$', part)
-            if state_match:
-                components['state'] = state_match.group(1)
-                continue
-            
-            # Check if this is just a zip code
-            zip_match = re.match(r'^(\d{5}(?:-\d{4})?)$', part)
-            if zip_match:
-                components['zip'] = zip_match.group(1)
-                continue
-    
-    return components
-
 def is_zpid(input_str):
     """Check if input string is a ZPID (numeric)"""
     if not input_str:
         return False
     return input_str.strip().isdigit()
 
-def find_best_address_match(address, nearby_zpids):
-    """Find the best matching property from nearby results by comparing addresses"""
-    if not nearby_zpids or not address:
-        return []
-    
-    search_components = parse_address_components(address)
-    search_house_number = search_components.get('house_number', '').lower()
-    search_street = search_components.get('street', '').lower().replace('nw', 'northwest').replace('ne', 'northeast').replace('sw', 'southwest').replace('se', 'southeast')
-    search_city = search_components.get('city', '').lower()
-    
-    logger.info(f"Looking for match - House: {search_house_number}, Street: {search_street}, City: {search_city}")
-    logger.info(f"Checking {len(nearby_zpids)} nearby properties for address match")
-    
-    # Get addresses from zestimates API to compare
-    api_url = "https://api.bridgedataoutput.com/api/v2/zestimates_v2/zestimates"
-    
-    exact_matches = []
-    close_matches = []
-    
-    for i, zpid in enumerate(nearby_zpids[:15]):  # Check more properties
-        try:
-            response = http.get(api_url, params={
-                "access_token": API_KEY,
-                "zpid": zpid
-            })
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('bundle'):
-                prop = data['bundle'][0]
-                prop_address = prop.get('address', '').lower()
-                
-                if prop_address:
-                    logger.info(f"Property {i+1}: ZPID {zpid} = '{prop_address}'")
-                    
-                    # Simple but effective matching - look for house number in the address
-                    if search_house_number and search_house_number in prop_address:
-                        # Also check if street name appears (even partially)
-                        street_words = search_street.split()
-                        street_matches = 0
-                        for word in street_words:
-                            if len(word) > 2 and word in prop_address:  # Skip tiny words like "nw"
-                                street_matches += 1
-                        
-                        if street_matches > 0:
-                            logger.info(f"*** MATCH FOUND: House number {search_house_number} and street components found in {prop_address}")
-                            exact_matches.append(zpid)
-                            break  # Take the first good match
-            
-            time.sleep(0.2)  # Rate limiting
-            
-        except Exception as e:
-            logger.error(f"Error checking address for ZPID {zpid}: {str(e)}")
-            continue
-    
-    # Return the best match found
-    if exact_matches:
-        logger.info(f"Returning exact match: {exact_matches[0]}")
-        return exact_matches[:1]
-    else:
-        logger.warning(f"No address matches found for {address}")
+def best_address_matches(index, address):
+    """ZPIDs of the indexed records that best match an address
+
+    Equal best scores are ambiguous and all returned; nothing scoring below
+    MATCH_THRESHOLD is.
+    """
+    matches = index.match(address, limit=10, min_score=MATCH_THRESHOLD)
+    matches = [match for match in matches if match['score'] == matches[0]['score']]
+    for match in matches:
+        logger.info(f"Address MATCH: {match['address']} -> ZPID {match['zpid']} (score {match['score']})")
+    return [match['zpid'] for match in matches]
+
+def find_best_address_match(address, candidates):
+    """Rank candidate parcel or zestimate records already fetched against an address"""
+    if not candidates or not address:
         return []
+    logger.info(f"Ranking {len(candidates)} candidate properties for address match: {address}")
+    return best_address_matches(AddressIndex(candidates), address)
 
 def search_properties_by_address(address):
     """Search for properties by address using Bridge parcels API address.full parameter"""
@@ -340,7 +327,7 @@ def search_properties_by_address(address):
     
     logger.info(f"Searching for property at address: {address}")
     
-    parcels_url = "https://api.bridgedataoutput.com/api/v2/pub/parcels"
+    parcels_url = PARCELS_URL
     
     # Normalize the address for search
     normalized_address = normalize_address(address)
@@ -366,6 +353,7 @@ def search_properties_by_address(address):
             
             logger.info(f"Attempt {attempt_num}: Searching with address.full = '{list(search_params.values())[0]}'")
             
+            bridge_client.rate_limiter.wait()
             response = http.get(parcels_url, params=params)
             response.raise_for_status()
             
@@ -384,6 +372,11 @@ def search_properties_by_address(address):
                             full_addr = str(parcel_address)
                         logger.info(f"MATCH FOUND: {full_addr} -> ZPID {zpid}")
                 
+                # A bundle can hold several parcels (units, neighbours); keep the
+                # best address match when one clears the threshold
+                if len(zpids) > 1:
+                    zpids = find_best_address_match(address, data['bundle']) or zpids
+                
                 if zpids:
                     logger.info(f"Successfully found {len(zpids)} properties on attempt {attempt_num}")
                     return zpids
@@ -406,152 +399,96 @@ def search_properties_by_address_fallback(address):
         logger.warning(f"Fallback failed - address missing city or zip: {address}")
         return []
     
-    parcels_url = "https://api.bridgedataoutput.com/api/v2/pub/parcels"
+    parcels_url = PARCELS_URL
+    area_key = (search_city.lower(), search_zip[:5])
     
     try:
-        params = {
-            "access_token": API_KEY,
-            "address.city": search_city,
-            "address.zip": search_zip,
-            "limit": 100
-        }
-        
-        logger.info(f"Fallback: Searching parcels in {search_city}, {search_zip}")
-        
-        response = http.get(parcels_url, params=params)
-        response.raise_for_status()
+        # Parcels already fetched for this city/zip are indexed and reused
+        with AREA_INDEXES_LOCK:
+            area_index = AREA_INDEXES.get(area_key)
+        record_cache('area-index', hits=int(area_index is not None), misses=int(area_index is None))
         
-        data = response.json()
-        
-        if not data.get('success') or not data.get('bundle'):
-            logger.warning(f"Fallback: No parcels found in {search_city}, {search_zip}")
-            return []
-        
-        # Look for exact address matches in the area results
-        search_house_number = components.get('house_number', '').lower()
-        search_street = components.get('street', '').lower()
-        
-        matching_zpids = []
-        
-        for parcel in data['bundle']:
-            parcel_address = parcel.get('address', {})
+        if area_index is None:
+            params = {
+                "access_token": API_KEY,
+                "address.city": search_city,
+                "address.zip": search_zip,
+                "limit": 100
+            }
             
-            if isinstance(parcel_address, dict):
-                parcel_house = str(parcel_address.get('house', '')).lower()
-                parcel_street = parcel_address.get('street', '').lower()
-                full_addr = parcel_address.get('full', '')
-            else:
-                # Try to parse from string
-                house_match = re.match(r'^(\d+)\s+(.+)', str(parcel_address).strip())
-                if house_match:
-                    parcel_house = house_match.group(1).lower()
-                    parcel_street = house_match.group(2).lower()
-                else:
-                    continue
-                full_addr = str(parcel_address)
+            logger.info(f"Fallback: Searching parcels in {search_city}, {search_zip}")
+            
+            bridge_client.rate_limiter.wait()
+            response = http.get(parcels_url, params=params)
+            response.raise_for_status()
             
-            # Check for house number and street match
-            if (search_house_number and parcel_house and search_house_number == parcel_house and
-                search_street and parcel_street and search_street in parcel_street):
-                zpid = parcel.get('zpid')
-                if zpid:
-                    logger.info(f"Fallback MATCH: {full_addr} -> ZPID {zpid}")
-                    matching_zpids.append(str(zpid))
+            data = response.json()
+            
+            if not data.get('success') or not data.get('bundle'):
+                logger.warning(f"Fallback: No parcels found in {search_city}, {search_zip}")
+                return []
+            
+            area_index = AddressIndex(data['bundle'])
+            with AREA_INDEXES_LOCK:
+                AREA_INDEXES[area_key] = area_index
+        else:
+            logger.info(f"Fallback: Using cached parcel index for {search_city}, {search_zip}")
         
-        return matching_zpids
+        # Rank the area results against the address without further API calls
+        return best_address_matches(area_index, address)
         
     except Exception as e:
         logger.error(f"Fallback search failed: {str(e)}")
         return []
 
-def get_living_area_from_parcel(areas):
-    """Extract living area from parcel data areas, checking multiple area types"""
-    if not areas:
-        return 0
-        
-    # Check different area types in order of preference
-    area_types = [
-        'Living Building Area',
-        'Finished Building Area',
-        'Total Building Area',
-        'Zillow Calculated Finished Area'
-    ]
-    
-    for area_type in area_types:
-        area = next((
-            area.get('areaSquareFeet', 0)
-            for area in areas
-            if area.get('type') == area_type
-        ), 0)
-        if area:
-            return area
-    return 0
-
-def process_parcel_data(parcel):
-    """Process a single parcel record and extract relevant data"""
-    if not parcel:
-        return None
-        
-    # Get building info
-    buildings = parcel.get('building', [])
-    building = buildings[0] if buildings else {}
-    
-    # Get living area
-    areas = parcel.get('areas', [])
-    living_area = get_living_area_from_parcel(areas)
-    
-    return {
-        'bedrooms': safe_float(building.get('bedrooms')),
-        'bathrooms': safe_float(building.get('fullBaths', building.get('baths'))),
-        'livingArea': living_area,
-        'yearBuilt': building.get('yearBuilt'),
-        'propertyType': parcel.get('landUseDescription'),
-        'stories': safe_float(building.get('totalStories')),
-        'lotSize': safe_float(parcel.get('lotSizeSquareFeet'))
-    }
+def is_property_fresh(zpid):
+    """True if the cached property record is younger than the Zestimate cache TTL"""
+    age = property_cache.age(zpid)
+    return age is not None and age < bridge_client.zestimate_cache.ttl
 
-def get_parcel_data_batch(zpids):
-    """Get parcel data for multiple ZPIDs in a single request"""
-    if not zpids:
-        return {}
-        
-    url = "https://api.bridgedataoutput.com/api/v2/pub/parcels"
-    all_parcel_data = {}
-    chunk_size = 10
-    
-    for i in range(0, len(zpids), chunk_size):
-        chunk = zpids[i:i + chunk_size]
-        params = {
-            "access_token": API_KEY,
-            "zpid.in": ",".join(chunk)
-        }
-        
-        try:
-            logger.debug(f"Fetching parcel data for ZPIDs: {chunk}")
-            response = http.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            logger.debug(f"Parcel API response: {data}")
-            
-            if data.get('success') and data.get('bundle'):
-                for parcel in data['bundle']:
-                    zpid = str(parcel.get('zpid'))
-                    if not zpid:
-                        continue
-                    
-                    parcel_info = process_parcel_data(parcel)
-                    if parcel_info:
-                        all_parcel_data[zpid] = parcel_info
-            
-            time.sleep(1)  # Rate limiting
-            
-        except Exception as e:
-            logger.error(f"Error processing parcel data for chunk {chunk}: {str(e)}")
-            continue
+def conditional_json(payload, etag=None):
+    """JSON response with a strong ETag, or 304 if the client already has it"""
+    response = jsonify(payload)
+    etag = etag or etag_for_body(response.get_data())
+    if etag_matches(etag):
+        return not_modified(app.response_class, etag)
+    response.set_etag(etag)
+    return response
+
+def fetch_property_records(zpid_list):
+    """Fetch Zestimates and parcel data for ZPIDs and merge them into property records, without caching them
+
+    Raises BridgeBatchError only if every zpid.in batch failed.
+    """
+    # Fetch Zestimates in zpid.in batches, reusing cached records; ZPIDs of
+    # failed batches are left out like unknown ones, as callers report missing ZPIDs
+    try:
+        zestimates = bridge_client.get_zestimates(zpid_list)
+    except BridgeBatchError as e:
+        if not e.results:
+            raise
+        logger.warning(f"Continuing without {len(e.failed)} ZPIDs: {e}")
+        zestimates = e.results
+    all_results = [zestimates[zpid] for zpid in zpid_list if zpid in zestimates]
+
+    logger.debug(f"Completed Zestimate fetching. Total properties: {len(all_results)}")
+
+    if not all_results:
+        return []
+
+    # Get parcel data for all properties, in concurrent zpid.in batches
+    parcels = bridge_client.get_parcels([str(r.get('zpid')) for r in all_results])
+    logger.debug(f"Final parcel data count: {len(parcels)}")
     
-    logger.debug(f"Final parcel data count: {len(all_parcel_data)}")
-    return all_parcel_data
+    return [build_property_record(result, parcels.get(str(result.get('zpid')))) for result in all_results]
+
+def get_property_records(zpid_list):
+    """Fetch property records for ZPIDs and refresh them in the property cache"""
+    processed_results = fetch_property_records(zpid_list)
+    for property_info in processed_results:
+        # Refresh the cached record; portfolio summaries update incrementally
+        property_cache.put(property_info)
+    return processed_results
 
 @app.route('/')
 def home():
@@ -588,102 +525,34 @@ def get_properties():
         return jsonify({"error": "No properties found for the provided addresses/ZPIDs"}), 400
     
     # Remove duplicates while preserving order
-    zpid_list = list(dict.fromkeys(all_zpids))
+    zpid_list = list(dict.fromkeys(str(z) for z in all_zpids))
     logger.debug(f"Final ZPID list after address conversion: {zpid_list}")
 
-    api_url = "https://api.bridgedataoutput.com/api/v2/zestimates_v2/zestimates"
-    all_results = []
-    
-    # Process Zestimates in batches
-    batch_size = 8
-    for i in range(0, len(zpid_list), batch_size):
-        batch = zpid_list[i:i+batch_size]
-        logger.debug(f"Processing Zestimate batch {i//batch_size + 1} with {len(batch)} ZPIDs")
-        
-        params = {
-            "access_token": API_KEY,
-            "zpid.in": ",".join(batch)
-        }
-        
-        try:
-            response = http.get(api_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if 'bundle' in data:
-                all_results.extend(data['bundle'])
-                logger.debug(f"Added {len(data['bundle'])} results, total so far: {len(all_results)}")
-            
-            time.sleep(1)  # Rate limiting between batches
-            
-        except requests.RequestException as e:
-            logger.error(f"Error fetching Zestimate batch starting at index {i}: {str(e)}")
-            continue
+    # Unchanged portfolios are answered from the cached record versions alone
+    if request.if_none_match and all(is_property_fresh(z) for z in zpid_list):
+        etag = etag_for_versions(zpid_list, property_cache.version)
+        if etag_matches(etag):
+            logger.debug(f"Portfolio of {len(zpid_list)} ZPIDs not modified")
+            return not_modified(app.response_class, etag)
 
-    logger.debug(f"Completed Zestimate fetching. Total properties: {len(all_results)}")
-
-    if all_results:
-        # Get parcel data for all properties
-        zpids = [str(r.get('zpid')) for r in all_results]
-        parcel_data = get_parcel_data_batch(zpids)
-        
-        # Process results and merge data
-        processed_results = []
-        for result in all_results:
-            zpid = str(result.get('zpid'))
-            
-            # Start with basic property info
-            property_info = {
-                'zpid': zpid,
-                'address': result.get('address'),
-                'zestimate': safe_float(result.get('zestimate')),
-                'rentalZestimate': safe_float(result.get('rentalZestimate')),
-                'latitude': result.get('Latitude'),
-                'longitude': result.get('Longitude'),
-                'bedrooms': 0,
-                'bathrooms': 0,
-                'livingArea': 0,
-                'yearBuilt': 'N/A',
-                'propertyType': None,
-                'stories': 0,
-                'lotSize': 0
-            }
-            
-            # Merge parcel data if available
-            if zpid in parcel_data:
-                property_info.update(parcel_data[zpid])
-            
-            # Calculate cap rate
-            if property_info['zestimate'] > 0:
-                property_info['capRate'] = round(
-                    (property_info['rentalZestimate'] * 12 * 0.60 / property_info['zestimate'] * 100),
-                    2
-                )
-            else:
-                property_info['capRate'] = 0
-            
-            processed_results.append(property_info)
+    try:
+        processed_results = get_property_records(zpid_list)
+    except BridgeBatchError as e:
+        return jsonify({"error": str(e), "failed_zpids": e.failed}), 502
 
-        # Calculate portfolio metrics
-        total_value = sum(safe_float(p['zestimate']) for p in processed_results)
-        total_rental = sum(safe_float(p['rentalZestimate']) for p in processed_results)
-        total_sqft = sum(safe_float(p['livingArea']) for p in processed_results)
-        
+    if processed_results:
         portfolio_metrics = {
             'properties': processed_results,
-            'summary': {
-                'total_value': total_value,
-                'total_rental': total_rental,
-                'avg_cap_rate': sum(p['capRate'] for p in processed_results) / len(processed_results),
-                'property_count': len(processed_results),
-                'total_sqft': total_sqft,
-                'avg_price_per_sqft': total_value / total_sqft if total_sqft > 0 else 0,
-                'total_bedrooms': sum(safe_float(p['bedrooms']) for p in processed_results),
-                'total_bathrooms': sum(safe_float(p['bathrooms']) for p in processed_results)
-            }
+            'summary': summarize_properties(processed_results)
         }
         
-        return jsonify(portfolio_metrics), 200
+        # Partial data (some ZPIDs unknown or their batch failed) is never tagged,
+        # so a client can't keep revalidating an incomplete portfolio
+        returned = {record['zpid'] for record in processed_results}
+        if any(zpid not in returned for zpid in zpid_list):
+            return jsonify(portfolio_metrics)
+        
+        return conditional_json(portfolio_metrics, etag_for_versions(zpid_list, property_cache.version))
     
     return jsonify({"error": "No results found"}), 404
 
@@ -696,27 +565,18 @@ def nearby_page(zpid):
 def nearby_properties(zpid):
     try:
         logger.info(f"Fetching nearby properties for ZPID: {zpid}")
-        api_url = "https://api.bridgedataoutput.com/api/v2/zestimates_v2/zestimates"
         
-        # First get the source property
-        logger.debug(f"Getting source property data for ZPID: {zpid}")
-        response = http.get(api_url, params={
-            "access_token": API_KEY,
-            "zpid": zpid
-        })
-        
-        if response.status_code != 200:
-            logger.error(f"Failed to get source property. Status: {response.status_code}, Response: {response.text}")
-            return jsonify({"error": f"Failed to get source property: {response.status_code}"}), 500
-            
-        source_data = response.json()
-        logger.debug(f"Source property response: {source_data}")
+        # First get the source property (cached if it was seen in a portfolio or nearby bundle)
+        try:
+            property_data = bridge_client.get_zestimates([zpid]).get(str(zpid))
+        except requests.RequestException as e:
+            logger.error(f"Failed to get source property: {e}")
+            return jsonify({"error": f"Failed to get source property: {e}"}), 502
         
-        if not source_data.get('bundle'):
+        if not property_data:
             logger.warning(f"No source property found for ZPID: {zpid}")
             return jsonify({"error": "Source property not found"}), 404
             
-        property_data = source_data['bundle'][0]
         latitude = property_data.get('Latitude')
         longitude = property_data.get('Longitude')
         
@@ -728,214 +588,178 @@ def nearby_properties(zpid):
             
         # Get source property type from parcels API for filtering
         source_property_type = None
+        source_parcel = None
         try:
-            source_parcel_response = http.get(
-                "https://api.bridgedataoutput.com/api/v2/pub/parcels",
-                params={
-                    "access_token": API_KEY,
-                    "zpid": zpid
-                }
-            )
-            if source_parcel_response.status_code == 200:
-                source_parcel_data = source_parcel_response.json()
-                if source_parcel_data.get('bundle'):
-                    source_property_type = source_parcel_data['bundle'][0].get('landUseDescription')
-                    logger.info(f"Source property type: '{source_property_type}'")
+            source_parcel = bridge_client.get_parcel(zpid)
+            if source_parcel:
+                source_property_type = source_parcel.get('landUseDescription')
+                logger.info(f"Source property type: '{source_property_type}'")
         except Exception as e:
             logger.warning(f"Could not get source property type: {e}")
         
         logger.debug(f"Source property type for filtering: {source_property_type}")
             
-        # Get nearby properties
+        # Get nearby properties; the records are cached for later portfolio lookups
         logger.debug(f"Getting nearby properties for coordinates: {longitude},{latitude}")
-        response = http.get(api_url, params={
-            "access_token": API_KEY,
-            "near": f"{longitude},{latitude}",
-            "limit": 20
-        })
-        
-        if response.status_code != 200:
-            logger.error(f"Failed to get nearby properties. Status: {response.status_code}, Response: {response.text}")
-            return jsonify({"error": f"Failed to get nearby properties: {response.status_code}"}), 500
-            
-        data = response.json()
-        logger.debug(f"Nearby properties API response success: {data.get('success', False)}, count: {len(data.get('bundle', []))}")
+        try:
+            bundle = bridge_client.get_nearby(longitude, latitude, limit=NEARBY_CANDIDATES)
+        except requests.RequestException as e:
+            logger.error(f"Failed to get nearby properties: {e}")
+            return jsonify({"error": f"Failed to get nearby properties: {e}"}), 502
         
-        if not data or not data.get('bundle'):
+        if not bundle:
             logger.info("No nearby properties found, returning empty list")
             return jsonify([]), 200
 
         # Extract all zpids from the nearby properties
-        nearby_zpids = [str(prop['zpid']) for prop in data['bundle'] if prop.get('zpid')]
+        nearby_zpids = [str(prop['zpid']) for prop in bundle if prop.get('zpid')]
         logger.debug(f"Found {len(nearby_zpids)} nearby property ZPIDs")
 
-        # Get parcel data for all properties in batches
-        parcel_data = {}
-        batch_size = 10
-        
-        logger.info(f"Getting parcel data for {len(nearby_zpids)} properties: {nearby_zpids[:5]}...")
-        
-        for i in range(0, len(nearby_zpids), batch_size):
-            batch = nearby_zpids[i:i + batch_size]
-            logger.info(f"Fetching parcel data for batch {i//batch_size + 1}: {batch}")
-            
-            try:
-                parcel_response = http.get(
-                    "https://api.bridgedataoutput.com/api/v2/pub/parcels",
-                    params={
-                        "access_token": API_KEY,
-                        "zpid.in": ",".join(batch)
-                    }
-                )
-                
-                logger.info(f"Parcel API response status: {parcel_response.status_code}")
-                
-                if parcel_response.status_code != 200:
-                    logger.error(f"Parcel API error: {parcel_response.text}")
-                    continue
-                    
-                parcel_results = parcel_response.json()
-                logger.info(f"Parcel API response: success={parcel_results.get('success')}, bundle_count={len(parcel_results.get('bundle', []))}")
-                
-                if parcel_results.get('bundle'):
-                    for parcel in parcel_results['bundle']:
-                        zpid = str(parcel.get('zpid'))
-                        if not zpid:
-                            logger.warning("Parcel missing ZPID")
-                            continue
-                            
-                        # Get building info
-                        buildings = parcel.get('building', [])
-                        building = buildings[0] if buildings else {}
-                        
-                        # Get living area - check multiple area types
-                        areas = parcel.get('areas', [])
-                        living_area = 0
-                        
-                        # Check different area types in order of preference
-                        area_types = [
-                            'Living Building Area',
-                            'Finished Building Area',
-                            'Total Building Area',
-                            'Zillow Calculated Finished Area'
-                        ]
-                        
-                        for area_type in area_types:
-                            area = next((
-                                area.get('areaSquareFeet', 0)
-                                for area in areas
-                                if area.get('type') == area_type
-                            ), 0)
-                            if area:
-                                living_area = area
-                                break
-                        
-                        parcel_info = {
-                            'bedrooms': safe_float(building.get('bedrooms')),
-                            'bathrooms': safe_float(building.get('fullBaths', building.get('baths'))),
-                            'livingArea': living_area,
-                            'yearBuilt': building.get('yearBuilt'),
-                            'propertyType': parcel.get('landUseDescription')
-                        }
-                        
-                        parcel_data[zpid] = parcel_info
-                        logger.debug(f"Parcel data for {zpid}: beds={parcel_info['bedrooms']}, baths={parcel_info['bathrooms']}, sqft={parcel_info['livingArea']}, type='{parcel_info['propertyType']}'")
-                else:
-                    logger.warning(f"No parcel bundle data returned for batch: {batch}")
-                    
-            except Exception as e:
-                logger.error(f"Error fetching parcel data for batch {batch}: {str(e)}")
-                continue
-            
-            time.sleep(1)  # Rate limiting between batches
-        
-        # Process and combine the data with simple property type prioritization
-        matching_properties = []
-        other_properties = []
+        # Get parcel data for all properties in zpid.in batches
+        parcel_data = bridge_client.get_parcels(nearby_zpids)
         
-        for prop in data['bundle']:
+        candidates = []
+        for prop in bundle:
             prop_zpid = str(prop.get('zpid'))
             
             # Skip the source property itself
             if prop_zpid == str(zpid):
                 continue
                 
-            latitude = prop.get('Latitude')
-            longitude = prop.get('Longitude')
-            
-            property_info = {
-                'zpid': prop_zpid,
-                'address': prop.get('address'),
-                'zestimate': safe_float(prop.get('zestimate')),
-                'rentalZestimate': safe_float(prop.get('rentalZestimate')),
-                'latitude': latitude,
-                'longitude': longitude,
-                'bedrooms': 0,
-                'bathrooms': 0,
-                'livingArea': 0,
-                'yearBuilt': 'N/A',
-                'propertyType': None
-            }
-            
-            if not latitude or not longitude:
-                logger.warning(f"Property {prop_zpid} missing coordinates: lat={latitude}, lng={longitude}")
+            property_info = build_property_record(prop, parcel_data.get(prop_zpid))
             
-            # Update with parcel data if available
-            if prop_zpid in parcel_data:
-                property_info.update(parcel_data[prop_zpid])
-                logger.debug(f"Updated property {prop_zpid} with parcel data: beds={property_info.get('bedrooms')}, baths={property_info.get('bathrooms')}, sqft={property_info.get('livingArea')}")
-            else:
+            if not property_info['latitude'] or not property_info['longitude']:
+                logger.warning(f"Property {prop_zpid} missing coordinates")
+            if prop_zpid not in parcel_data:
                 logger.warning(f"No parcel data found for property {prop_zpid}")
             
-            # Calculate cap rate
-            if property_info['zestimate'] > 0:
-                property_info['capRate'] = round(
-                    (property_info['rentalZestimate'] * 12 * 0.60 / property_info['zestimate'] * 100),
-                    2
-                )
-            else:
-                property_info['capRate'] = 0
+            property_type = (property_info.get('propertyType') or '').strip().lower()
             
-            # Simple property type matching - prioritize same type, but include others
-            property_type = property_info.get('propertyType') or ''
-            property_type = property_type.strip() if property_type else ''
+            # For Single Family Residential, exclude townhomes, condos, mobile homes completely
+            if source_property_type and property_type and 'single family residential' in source_property_type.lower():
+                excluded_types = ['townhome', 'townhouse', 'condo', 'condominium', 'mobile home', 'manufactured home']
+                if property_type != source_property_type.lower().strip() and any(excluded in property_type for excluded in excluded_types):
+                    logger.debug(f"❌ EXCLUDED for Single Family: {prop_zpid} - '{property_type}' (excluded type)")
+                    continue  # Skip this property completely
             
-            if source_property_type and property_type:
-                # Exact match only - no partial matching
-                if property_type.lower().strip() == source_property_type.lower().strip():
-                    matching_properties.append(property_info)
-                    logger.debug(f"✅ EXACT MATCH: {prop_zpid} - '{property_type}' == '{source_property_type}'")
-                else:
-                    # For Single Family Residential, exclude townhomes, condos, mobile homes completely
-                    if 'single family residential' in source_property_type.lower():
-                        excluded_types = ['townhome', 'townhouse', 'condo', 'condominium', 'mobile home', 'manufactured home']
-                        if any(excluded in property_type.lower() for excluded in excluded_types):
-                            logger.debug(f"❌ EXCLUDED for Single Family: {prop_zpid} - '{property_type}' (excluded type)")
-                            continue  # Skip this property completely
-                    
-                    other_properties.append(property_info)
-                    logger.debug(f"⚠️ DIFFERENT TYPE: {prop_zpid} - '{property_type}' vs '{source_property_type}'")
-            else:
-                other_properties.append(property_info)
-        
-        # Combine results: matching properties first, then others to fill up to 20 total
-        nearby_properties = matching_properties[:20]  # Take up to 20 matching first
+            candidates.append(property_info)
         
-        if len(nearby_properties) < 20:
-            remaining_slots = 20 - len(nearby_properties)
-            nearby_properties.extend(other_properties[:remaining_slots])
+        # Rank by similarity to the source: distance, beds, baths, sqft, year built and land use
+        source_record = build_property_record(property_data, source_parcel)
+        ranked = rank_comparables(source_record, candidates)
+        nearby_properties = ranked[:NEARBY_RESULTS]
         
-        logger.info(f"Found {len(matching_properties)} matching properties and {len(other_properties)} other properties for source type '{source_property_type}'")
+        logger.info(f"Ranked {len(candidates)} nearby properties against source type '{source_property_type}'")
         logger.info(f"Parcel data retrieved for {len(parcel_data)} properties out of {len(nearby_zpids)} nearby properties")
         
-        logger.debug(f"Returning {len(nearby_properties)} nearby properties from {len(data['bundle'])} total properties")
+        logger.debug(f"Returning {len(nearby_properties)} nearby properties from {len(bundle)} total properties")
+        
+        if has_query_args(request.args):
+            # Sort, filter and page all ranked candidates through the shared index;
+            # the cache is bounded, so the candidates can go into it
+            for property_info in candidates:
+                property_cache.put(property_info)
+            try:
+                page = property_index.query(
+                    zpids=[p['zpid'] for p in candidates],
+                    origin=(float(latitude), float(longitude)),
+                    **parse_query_args(request.args)
+                )
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            similarity = {p['zpid']: p['similarity'] for p in ranked}
+            response = conditional_json([{**p, 'similarity': similarity.get(p['zpid'])} for p in page.properties])
+            if page.next_cursor:
+                response.headers['X-Next-Cursor'] = page.next_cursor
+            return response
         
-        return jsonify(nearby_properties), 200
+        return conditional_json(nearby_properties)
         
     except Exception as e:
         logger.error(f"Error in nearby properties for ZPID {zpid}: {str(e)}", exc_info=True)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
     
+def tile_response(key_function, *args):
+    tiles = load_module('tiles')
+    try:
+        key = getattr(tiles, key_function)(*args)
+        heading = tiles.parse_heading(request.args['heading']) if request.args.get('heading') else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    tile = get_tile_cache().get(key, heading)
+    if tile is None:
+        return jsonify({"error": "Failed to load tile"}), 502
+    return conditional_json(tile)
+
+@app.route('/api/tiles/<int:z>/<int:x>/<int:y>', methods=['GET'])
+def property_tile(z, x, y):
+    """Enriched properties inside a z/x/y web map tile (zoom 14+)
+
+    ?heading=dx,dy (the pan direction, x east and y south) prefetches the
+    adjacent tiles that way.
+    """
+    return tile_response('xyz_key', z, x, y)
+
+@app.route('/api/tiles/geohash/<prefix>', methods=['GET'])
+def property_tile_geohash(prefix):
+    """Enriched properties inside a geohash cell (6+ characters); ?heading=dx,dy prefetches ahead as for tiles"""
+    return tile_response('geohash_key', prefix)
+
+@app.route('/transactions')
+def transactions_page():
+    """Render the nearby transactions (comps) page"""
+    return render_template('transactions.py')
+
+@app.route('/api/nearby-transactions', methods=['GET'])
+def nearby_transactions():
+    """Recent sales within radius miles of an address or ZPID, with summary and rolling neighborhood stats"""
+    address = (request.args.get('address') or '').strip()
+    zpid = (request.args.get('zpid') or '').strip()
+    radius = request.args.get('radius', 0.5, type=float)
+    limit = request.args.get('limit', 10, type=int)
+    
+    if not (address or zpid):
+        return jsonify({"error": "address or zpid is required"}), 400
+    if radius is None or not 0 < radius <= MAX_COMPS_RADIUS_MILES:
+        return jsonify({"error": f"radius must be between 0 and {MAX_COMPS_RADIUS_MILES} miles"}), 400
+    if limit is None or not 1 <= limit <= MAX_COMPS_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_COMPS_LIMIT}"}), 400
+    
+    try:
+        if not zpid:
+            key = normalize_address(address)
+            with COMPS_SUBJECTS_LOCK:
+                zpid = COMPS_SUBJECTS.get(key)
+            record_cache('comps-subjects', hits=int(zpid is not None), misses=int(zpid is None))
+            if zpid is None:
+                found_zpids = search_properties_by_address(address)
+                if not found_zpids:
+                    return jsonify({"error": f"No property found for address: {address}"}), 404
+                zpid = str(found_zpids[0])
+                with COMPS_SUBJECTS_LOCK:
+                    COMPS_SUBJECTS[key] = zpid
+        
+        subject = bridge_client.get_zestimate(zpid)
+        if not subject or not (subject.get('Latitude') and subject.get('Longitude')):
+            return jsonify({"error": "Property coordinates not found"}), 404
+        latitude, longitude = float(subject['Latitude']), float(subject['Longitude'])
+        
+        result = get_comps_engine().query(latitude, longitude, radius, limit)
+        if result['failedCells'] == result['totalCells']:
+            return jsonify({"error": "Failed to load comparable sales from Bridge"}), 502
+        result['subject'] = {
+            'zpid': zpid,
+            'address': subject.get('address'),
+            'latitude': latitude,
+            'longitude': longitude
+        }
+        logger.info(f"Nearby transactions for ZPID {zpid}: {result['summary']['totalTransactions']} within {radius} mi")
+        return jsonify(result), 200
+        
+    except Exception as e:
+        logger.error(f"Error in nearby transactions for '{address or zpid}': {str(e)}", exc_info=True)
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
 @app.route('/api/save-portfolio', methods=['POST'])
 def save_portfolio():
     portfolio_data = request.json
@@ -952,6 +776,7 @@ def save_portfolio():
         return jsonify({"error": "Portfolio name is required and cannot be empty"}), 400
     
     portfolio_data['timestamp'] = datetime.now().isoformat()
+    portfolio_summaries.register(portfolio_name, portfolio_data.get('zpids', []))
     
     # Try Google Sheets first
     if SHEETS_AVAILABLE and GOOGLE_SERVICE_ACCOUNT_KEY:
@@ -965,18 +790,20 @@ def save_portfolio():
     try:
         global MEMORY_PORTFOLIOS
         
-        # Find existing portfolio with same name
-        portfolio_index = next((i for i, p in enumerate(MEMORY_PORTFOLIOS) 
-                              if p.get('name') == portfolio_data['name']), None)
-        
-        if portfolio_index is not None:
-            MEMORY_PORTFOLIOS[portfolio_index] = portfolio_data
-            logger.info(f"Updated existing portfolio '{portfolio_data['name']}' in memory")
-        else:
-            MEMORY_PORTFOLIOS.append(portfolio_data)
-            logger.info(f"Added new portfolio '{portfolio_data['name']}' to memory")
+        with MEMORY_PORTFOLIOS_LOCK:
+            # Find existing portfolio with same name
+            portfolio_index = next((i for i, p in enumerate(MEMORY_PORTFOLIOS) 
+                                  if p.get('name') == portfolio_data['name']), None)
+            
+            if portfolio_index is not None:
+                MEMORY_PORTFOLIOS[portfolio_index] = portfolio_data
+                logger.info(f"Updated existing portfolio '{portfolio_data['name']}' in memory")
+            else:
+                MEMORY_PORTFOLIOS.append(portfolio_data)
+                logger.info(f"Added new portfolio '{portfolio_data['name']}' to memory")
+            total = len(MEMORY_PORTFOLIOS)
         
-        return jsonify({"message": f"Portfolio saved successfully (in-memory, {len(MEMORY_PORTFOLIOS)} total)"}), 200
+        return jsonify({"message": f"Portfolio saved successfully (in-memory, {total} total)"}), 200
         
     except Exception as e:
         logger.error(f"Error saving portfolio to memory: {str(e)}")
@@ -995,28 +822,240 @@ def get_portfolios():
     
     # Fallback to in-memory storage
     try:
-        global MEMORY_PORTFOLIOS
-        logger.info(f"Returning {len(MEMORY_PORTFOLIOS)} portfolios from memory")
-        return jsonify(MEMORY_PORTFOLIOS), 200
+        with MEMORY_PORTFOLIOS_LOCK:
+            portfolios = list(MEMORY_PORTFOLIOS)
+        logger.info(f"Returning {len(portfolios)} portfolios from memory")
+        return jsonify(portfolios), 200
     except Exception as e:
         logger.error(f"Error getting portfolios from memory: {e}")
         return jsonify([]), 200
 
+def load_saved_portfolios():
+    """All saved portfolios from Google Sheets, else from memory"""
+    portfolios = []
+    if SHEETS_AVAILABLE and GOOGLE_SERVICE_ACCOUNT_KEY:
+        portfolios = get_portfolios_from_sheets()
+    if not portfolios:
+        with MEMORY_PORTFOLIOS_LOCK:
+            portfolios = list(MEMORY_PORTFOLIOS)
+    return portfolios
+
+def latest_saved_portfolios():
+    """Newest saved revision of each portfolio by name
+
+    Saves are appended rather than updated in place, so a name can have
+    several rows; the newest timestamp wins, and the later row on a tie.
+    """
+    latest = {}
+    for portfolio in load_saved_portfolios():
+        name = portfolio.get('name')
+        current = latest.get(name)
+        if current is None or (portfolio.get('timestamp') or '') >= (current.get('timestamp') or ''):
+            latest[name] = portfolio
+    return latest
+
+def find_saved_portfolio(name):
+    """Look up the newest saved revision of a portfolio in Google Sheets, else in memory"""
+    return latest_saved_portfolios().get(name)
+
+@app.route('/api/portfolio-summary/<name>', methods=['GET'])
+def portfolio_summary(name):
+    """Return the precomputed summary for a saved portfolio"""
+    summary = portfolio_summaries.summary(name)
+    
+    if summary is None:
+        # Portfolio not materialized yet in this process - build it from storage
+        portfolio = find_saved_portfolio(name)
+        if not portfolio:
+            return jsonify({"error": "Portfolio not found"}), 404
+        portfolio_summaries.register(name, portfolio.get('zpids', []))
+        summary = portfolio_summaries.summary(name)
+    
+    zpids = portfolio_summaries.members(name)
+    missing = [z for z in zpids if property_cache.get(z) is None]
+    
+    return jsonify({
+        "name": name,
+        "summary": summary,
+        "cached_count": len(zpids) - len(missing),
+        "missing_zpids": missing
+    }), 200
+
+@app.route('/api/refresh-portfolios', methods=['POST'])
+def refresh_portfolios():
+    """Refresh many saved portfolios at once, fetching each distinct ZPID only once
+
+    Body: {"names": [...]} (default: every saved portfolio) and optionally
+    "force": true to bypass the Zestimate/parcel caches. Returns the
+    refreshed summary of each portfolio; 400 if the portfolios hold more
+    than MAX_REFRESH_ZPIDS distinct ZPIDs.
+    """
+    data = request.get_json(silent=True) or {}
+    names = data.get('names')
+    if names is not None and not (isinstance(names, list) and all(isinstance(n, str) for n in names)):
+        return jsonify({"error": "names must be a list of portfolio names"}), 400
+    
+    # One read of the store; the newest revision of a name wins, as in find_saved_portfolio
+    saved = latest_saved_portfolios()
+    selected = list(dict.fromkeys(names)) if names is not None else [n for n in saved if n]
+    not_found = [name for name in selected if name not in saved]
+    selected = [name for name in selected if name in saved]
+    if not selected:
+        return jsonify({"error": "No saved portfolios found", "not_found": not_found}), 404
+    
+    members = {name: list(dict.fromkeys(str(z) for z in saved[name].get('zpids') or [])) for name in selected}
+    unique_zpids = list(dict.fromkeys(z for zpids in members.values() for z in zpids))
+    total_entries = sum(len(zpids) for zpids in members.values())
+    if len(unique_zpids) > MAX_REFRESH_ZPIDS:
+        return jsonify({
+            "error": f"Refresh covers {len(unique_zpids)} distinct ZPIDs; at most {MAX_REFRESH_ZPIDS} per request, "
+                     f"pass fewer names",
+            "unique_zpids": len(unique_zpids)
+        }), 400
+    logger.info(f"Refreshing {len(selected)} portfolios: {total_entries} entries, {len(unique_zpids)} unique ZPIDs")
+    
+    if data.get('force'):
+        bridge_client.evict(unique_zpids)
+    
+    # Shared ZPIDs are fetched once; each write to the property cache updates
+    # the materialized summaries of every portfolio holding that ZPID
+    try:
+        refreshed = {record['zpid'] for record in get_property_records(unique_zpids)}
+    except BridgeBatchError as e:
+        return jsonify({"error": str(e), "failed_zpids": e.failed}), 502
+    
+    portfolios = []
+    for name in selected:
+        portfolio_summaries.register(name, members[name])
+        portfolios.append({
+            "name": name,
+            "summary": portfolio_summaries.summary(name),
+            "missing_zpids": [z for z in members[name] if z not in refreshed]
+        })
+    
+    return jsonify({
+        "portfolios": portfolios,
+        "not_found": not_found,
+        "total_entries": total_entries,
+        "unique_zpids": len(unique_zpids),
+        "refreshed": len(refreshed)
+    }), 200
+
+@app.route('/api/portfolio-properties/<name>', methods=['GET'])
+def portfolio_properties(name):
+    """Sorted, filtered page of a saved portfolio's properties
+
+    Takes sort, order, limit, cursor, property_type and min_<key> / max_<key>
+    query args (see property_query.parse_query_args); sorting by distance
+    needs lat and lng. Pass next_cursor back as cursor for the next page.
+    """
+    if portfolio_summaries.summary(name) is None:
+        portfolio = find_saved_portfolio(name)
+        if not portfolio:
+            return jsonify({"error": "Portfolio not found"}), 404
+        portfolio_summaries.register(name, portfolio.get('zpids', []))
+
+    try:
+        query = parse_query_args(request.args)
+        origin = None
+        if request.args.get('lat') and request.args.get('lng'):
+            origin = (float(request.args['lat']), float(request.args['lng']))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Load members that were never fetched in this process; the index picks them up
+    zpids = portfolio_summaries.members(name)
+    missing = [z for z in zpids if property_cache.get(z) is None]
+    if missing:
+        try:
+            get_property_records(missing)
+        except BridgeBatchError as e:
+            # The members already cached can still be paged
+            logger.warning(f"Could not load members of portfolio '{name}': {e}")
+
+    try:
+        page = property_index.query(zpids=zpids, origin=origin, **query)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "name": name,
+        "properties": page.properties,
+        "next_cursor": page.next_cursor
+    }), 200
+
+@app.route('/api/export/portfolio', methods=['POST'])
+def export_portfolio():
+    """Stream enriched portfolio properties as Parquet or Arrow; 400 above MAX_EXPORT_ZPIDS distinct ZPIDs"""
+    portfolio_export = load_module('portfolio_export')
+    data = request.json or {}
+    fmt = data.get('format', 'parquet')
+    name = (data.get('name') or '').strip()
+    zpids = data.get('zpids') or []
+    
+    if fmt not in portfolio_export.EXPORT_FORMATS:
+        return jsonify({"error": f"Unsupported format '{fmt}', use one of {sorted(portfolio_export.EXPORT_FORMATS)}"}), 400
+    
+    if not zpids and name:
+        portfolio = find_saved_portfolio(name)
+        if not portfolio:
+            return jsonify({"error": "Portfolio not found"}), 404
+        zpids = portfolio.get('zpids', [])
+    
+    if not zpids:
+        return jsonify({"error": "Provide zpids or the name of a saved portfolio"}), 400
+    zpids = list(dict.fromkeys(str(z) for z in zpids))
+    if len(zpids) > MAX_EXPORT_ZPIDS:
+        return jsonify({"error": f"Export covers {len(zpids)} distinct ZPIDs; at most {MAX_EXPORT_ZPIDS} per request"}), 400
+    
+    # Records are fetched and encoded a row group at a time while the response streams;
+    # they bypass the property cache so an export holds only one row group in memory
+    batches = portfolio_export.iter_record_batches(zpids, fetch_property_records)
+    try:
+        first_batch = next(batches, None)
+    except BridgeBatchError as e:
+        return jsonify({"error": str(e), "failed_zpids": e.failed}), 502
+    if first_batch is None:
+        return jsonify({"error": "No results found"}), 404
+    
+    try:
+        chunks = portfolio_export.iter_export_chunks(itertools.chain([first_batch], batches), fmt)
+        first_chunk = next(chunks)
+    except RuntimeError as e:
+        logger.error(f"Portfolio export unavailable: {e}")
+        return jsonify({"error": str(e)}), 501
+    
+    mimetype, extension = portfolio_export.EXPORT_FORMATS[fmt]
+    filename = re.sub(r'[^A-Za-z0-9_-]+', '_', name) or 'portfolio'
+    
+    def generate():
+        yield first_chunk
+        yield from chunks
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}.{extension}"}
+    )
+
 @app.route('/api/delete-portfolio', methods=['POST'])
 def delete_portfolio():
     portfolio_name = request.json.get('name')
     
     if not portfolio_name:
         return jsonify({"error": "Portfolio name is required"}), 400
+    
+    portfolio_summaries.remove(portfolio_name)
         
     try:
-        with open('portfolios.json', 'r') as f:
-            portfolios = json.load(f)
+        with MEMORY_PORTFOLIOS_LOCK:
+            with open('portfolios.json', 'r') as f:
+                portfolios = json.load(f)
+                
+            updated_portfolios = [p for p in portfolios if p.get('name') != portfolio_name]
             
-        updated_portfolios = [p for p in portfolios if p.get('name') != portfolio_name]
-        
-        with open('portfolios.json', 'w') as f:
-            json.dump(updated_portfolios, f)
+            with open('portfolios.json', 'w') as f:
+                json.dump(updated_portfolios, f)
             
         return jsonify({"message": "Portfolio deleted successfully"}), 200
     except FileNotFoundError:
@@ -1073,7 +1112,7 @@ def debug_parcels():
     if not search_city or not search_zip:
         return jsonify({"error": "Address missing city or zip"}), 400
     
-    parcels_url = "https://api.bridgedataoutput.com/api/v2/pub/parcels"
+    parcels_url = PARCELS_URL
     
     try:
         params = {
@@ -1083,6 +1122,7 @@ def debug_parcels():
             "limit": 20
         }
         
+        bridge_client.rate_limiter.wait()
         response = http.get(parcels_url, params=params)
         response.raise_for_status()
         
@@ -1170,33 +1210,26 @@ def debug_sheets():
     
     return jsonify(debug_info)
 
-@app.route('/api/test-address-fields', methods=['POST'])
-def test_address_fields():
-    """Test direct address field filtering on Bridge API"""
-    data = request.json
-    address = data.get('address', '')
-    
-    if not address:
-        return jsonify({"error": "Address is required"}), 400
-    
-    components = parse_address_components(address)
-    
-    results = {}
-    
-    # Test both APIs with different address field combinations
-    test_apis = [
-        {
-            "name": "zestimates_api",
-            "url": "https://api.bridgedataoutput.com/api/v2/zestimates_v2/zestimates"
-        },
-        {
-            "name": "parcels_api", 
-            "url": "https://api.bridgedataoutput.com/api/v2/pub/parcels"
-        }
-    ]
-    
-    # Different parameter combinations to test
-    test_combinations = [
+# APIs probed by the address field diagnostics
+ADDRESS_TEST_APIS = [
+    {
+        "name": "zestimates_api",
+        "url": ZESTIMATES_URL
+    },
+    {
+        "name": "parcels_api", 
+        "url": PARCELS_URL
+    }
+]
+
+# Concurrent Bridge calls allowed while running diagnostics
+DIAGNOSTIC_WORKERS = int(os.getenv("DIAGNOSTIC_WORKERS", 8))
+# Addresses per batch diagnostic; each one fires every parameter test against every API in ADDRESS_TEST_APIS
+MAX_BATCH_ADDRESSES = int(os.getenv("MAX_BATCH_ADDRESSES", 50))
+
+def build_address_test_combinations(components):
+    """Different parameter combinations to test for an address"""
+    return [
         # Test 1: Full address components
         {
             "name": "full_components",
@@ -1239,61 +1272,175 @@ def test_address_fields():
             }
         }
     ]
+
+def run_address_probe(api, test):
+    """Run a single diagnostic request, recording latency and response size"""
+    # Remove empty parameters
+    clean_params = {k: v for k, v in test["params"].items() if v}
+    
+    logger.info(f"Testing {api['name']} - {test['name']} with params: {list(clean_params.keys())}")
     
-    for api in test_apis:
-        api_results = {}
+    # Probes share the process-wide Bridge rate limit; the wait isn't part of the latency
+    bridge_client.rate_limiter.wait()
+    start = time.perf_counter()
+    try:
+        response = http.get(api["url"], params=clean_params)
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        size = len(response.content)
+        
+        # Check if it's a 400 error (bad parameters) vs other errors
+        if response.status_code == 400:
+            return {
+                "error": f"400 Bad Request - Parameters not supported: {list(clean_params.keys())}",
+                "params_used": clean_params,
+                "latency_ms": latency_ms,
+                "response_bytes": size
+            }
         
-        for test in test_combinations:
-            try:
-                # Remove empty parameters
-                clean_params = {k: v for k, v in test["params"].items() if v}
-                
-                logger.info(f"Testing {api['name']} - {test['name']} with params: {clean_params}")
-                
-                response = http.get(api["url"], params=clean_params)
-                
-                # Check if it's a 400 error (bad parameters) vs other errors
-                if response.status_code == 400:
-                    api_results[test["name"]] = {
-                        "error": f"400 Bad Request - Parameters not supported: {list(clean_params.keys())}",
-                        "params_used": clean_params
-                    }
-                    continue
-                
-                response.raise_for_status()
-                data_result = response.json()
-                
-                api_results[test["name"]] = {
-                    "params_used": clean_params,
-                    "success": data_result.get('success', False),
-                    "count": len(data_result.get('bundle', [])),
-                    "sample_addresses": [
-                        prop.get('address', {}).get('full', prop.get('address', 'N/A')) if isinstance(prop.get('address'), dict) else prop.get('address', 'N/A')
-                        for prop in data_result.get('bundle', [])[:3]
-                    ] if data_result.get('bundle') else []
-                }
-                
-                # If we found results, also get ZPIDs
-                if data_result.get('bundle'):
-                    api_results[test["name"]]["zpids"] = [
-                        str(prop.get('zpid', ''))
-                        for prop in data_result.get('bundle', [])[:3]
-                    ]
-                
-            except Exception as e:
-                api_results[test["name"]] = {
-                    "error": str(e),
-                    "params_used": clean_params
-                }
+        response.raise_for_status()
+        data_result = response.json()
+        bundle = data_result.get('bundle') or []
+        
+        result = {
+            "params_used": clean_params,
+            "success": data_result.get('success', False),
+            "count": len(bundle),
+            "sample_addresses": [
+                prop.get('address', {}).get('full', prop.get('address', 'N/A')) if isinstance(prop.get('address'), dict) else prop.get('address', 'N/A')
+                for prop in bundle[:3]
+            ],
+            "latency_ms": latency_ms,
+            "response_bytes": size
+        }
+        
+        # If we found results, also get ZPIDs
+        if bundle:
+            result["zpids"] = [str(prop.get('zpid', '')) for prop in bundle[:3]]
+        
+        return result
+        
+    except Exception as e:
+        return {
+            "error": str(e),
+            "params_used": clean_params,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+
+def run_address_field_tests(components_list):
+    """Run every API x parameter probe for each address concurrently
+    
+    Returns one ``{api_name: {test_name: result}}`` dict per components dict.
+    """
+    results = [{api["name"]: {} for api in ADDRESS_TEST_APIS} for _ in components_list]
+    
+    with ThreadPoolExecutor(max_workers=DIAGNOSTIC_WORKERS) as executor:
+        futures = {}
+        for i, components in enumerate(components_list):
+            for api in ADDRESS_TEST_APIS:
+                for test in build_address_test_combinations(components):
+                    futures[executor.submit(run_in_context(run_address_probe), api, test)] = (i, api["name"], test["name"])
         
-        results[api["name"]] = api_results
+        for future in as_completed(futures):
+            i, api_name, test_name = futures[future]
+            results[i][api_name][test_name] = future.result()
+    
+    return results
+
+def address_market(components):
+    """Market key used to group diagnostics: ZIP code, else city/state"""
+    if components.get('zip'):
+        return components['zip'][:5]
+    return ", ".join(p for p in (components.get('city'), components.get('state')) if p) or "unknown"
+
+@app.route('/api/test-address-fields', methods=['POST'])
+def test_address_fields():
+    """Test direct address field filtering on Bridge API"""
+    data = request.json
+    address = data.get('address', '')
+    
+    if not address:
+        return jsonify({"error": "Address is required"}), 400
+    
+    components = parse_address_components(address)
+    
+    start = time.perf_counter()
+    results = run_address_field_tests([components])[0]
     
     return jsonify({
         "address": address,
         "components": components,
-        "tests": results
+        "tests": results,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
     }), 200
 
+@app.route('/api/test-address-fields/batch', methods=['POST'])
+def test_address_fields_batch():
+    """Probe many addresses and report which parameter strategy works best per market"""
+    data = request.json or {}
+    addresses = [a.strip() for a in data.get('addresses', []) if a and a.strip()]
+    
+    if not addresses:
+        return jsonify({"error": "A list of addresses is required"}), 400
+    if len(addresses) > MAX_BATCH_ADDRESSES:
+        return jsonify({"error": f"At most {MAX_BATCH_ADDRESSES} addresses per batch, got {len(addresses)}"}), 400
+    
+    components_list = [parse_address_components(address) for address in addresses]
+    
+    start = time.perf_counter()
+    all_results = run_address_field_tests(components_list)
+    
+    # market -> "api/test" -> running stats
+    matrix = {}
+    per_address = []
+    for address, components, results in zip(addresses, components_list, all_results):
+        market = address_market(components)
+        market_stats = matrix.setdefault(market, {})
+        
+        for api_name, tests in results.items():
+            for test_name, result in tests.items():
+                stats = market_stats.setdefault(f"{api_name}/{test_name}", {
+                    "probes": 0, "hits": 0, "errors": 0, "total_latency_ms": 0.0, "total_bytes": 0
+                })
+                stats["probes"] += 1
+                stats["hits"] += 1 if result.get("count") else 0
+                stats["errors"] += 1 if "error" in result else 0
+                stats["total_latency_ms"] += result.get("latency_ms", 0)
+                stats["total_bytes"] += result.get("response_bytes", 0)
+        
+        per_address.append({"address": address, "market": market, "components": components, "tests": results})
+    
+    markets = {}
+    for market, strategies in matrix.items():
+        for stats in strategies.values():
+            stats["hit_rate"] = round(stats["hits"] / stats["probes"], 3)
+            stats["avg_latency_ms"] = round(stats.pop("total_latency_ms") / stats["probes"], 1)
+            stats["avg_bytes"] = round(stats.pop("total_bytes") / stats["probes"])
+        
+        # Best strategy: highest hit rate, then fewest errors, then fastest
+        ranking = sorted(
+            strategies,
+            key=lambda name: (-strategies[name]["hit_rate"], strategies[name]["errors"], strategies[name]["avg_latency_ms"])
+        )
+        markets[market] = {
+            "addresses": sum(1 for r in per_address if r["market"] == market),
+            "best_strategy": ranking[0] if strategies[ranking[0]]["hits"] else None,
+            "ranking": ranking,
+            "strategies": strategies
+        }
+    
+    include_details = str(data.get('details', '')).lower() in ('1', 'true', 'yes')
+    
+    response = {
+        "address_count": len(addresses),
+        "probe_count": sum(len(tests) for r in all_results for tests in r.values()),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        "markets": markets
+    }
+    if include_details:
+        response["results"] = per_address
+    
+    return jsonify(response), 200
+
 # Removed old geocoding debug endpoint - using direct address search now
 
 @app.route('/api/parse-input', methods=['POST'])
@@ -1366,5 +1513,29 @@ def parse_input():
         logger.error(f"Error parsing input: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.before_request
+def record_first_request():
+    """Record time from module import to the first request (cold start)"""
+    if STARTUP_REPORT["first_request_ms"] is None:
+        STARTUP_REPORT["first_request_ms"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
+
+@app.route('/api/startup-report', methods=['GET'])
+def startup_report():
+    """Cold start timings for this process"""
+    return jsonify({
+        **STARTUP_REPORT,
+        "uptime_s": round(time.perf_counter() - _IMPORT_STARTED, 1),
+        "sheets_loaded": _SHEETS_MODULES is not None,
+        "serverless": bool(os.getenv("VERCEL"))
+    }), 200
+
+@app.route('/api/timing-stats', methods=['GET'])
+def timing_stats():
+    """Per-endpoint Bridge API latency histograms for this process"""
+    return jsonify(upstream_histograms.snapshot()), 200
+
+STARTUP_REPORT["module_import_ms"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
+logger.info(f"app.py imported in {STARTUP_REPORT['module_import_ms']} ms")
+
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
\ No newline at end of file
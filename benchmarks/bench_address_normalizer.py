@@ -0,0 +1,96 @@
+"""Benchmark the single-pass address normalizer against the old regex loop.
+
+Run from the repository root:
+
+    python benchmarks/bench_address_normalizer.py --count 20000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from address_utils import normalize_address  # noqa: E402
+
+
+def legacy_normalize_address(address):
+    """The previous implementation: one re.sub per abbreviation"""
+    if not address:
+        return ""
+    address = re.sub(r'\s+', ' ', address.strip()).title()
+    abbreviations = {
+        'Street': 'St', 'St.': 'St',
+        'Avenue': 'Ave', 'Ave.': 'Ave',
+        'Road': 'Rd', 'Rd.': 'Rd',
+        'Drive': 'Dr', 'Dr.': 'Dr',
+        'Court': 'Ct', 'Ct.': 'Ct',
+        'Lane': 'Ln', 'Ln.': 'Ln',
+        'Place': 'Pl', 'Pl.': 'Pl',
+        'Boulevard': 'Blvd', 'Blvd.': 'Blvd',
+        'Circle': 'Cir', 'Cir.': 'Cir',
+        'Terrace': 'Ter', 'Ter.': 'Ter',
+        'Way': 'Way',
+        'North': 'N', 'South': 'S', 'East': 'E', 'West': 'W',
+        'Northeast': 'NE', 'Northwest': 'NW', 'Southeast': 'SE', 'Southwest': 'SW'
+    }
+    for full, abbrev in abbreviations.items():
+        address = re.sub(rf'\b{full}\b', abbrev, address, flags=re.IGNORECASE)
+    return address
+
+
+STREETS = ['Main', 'Oak', 'Lake Shore', 'Sunset', '27th', 'Pine Ridge', 'Elm', 'Harbor View']
+SUFFIXES = ['Street', 'Avenue', 'Road', 'Drive', 'Court', 'Parkway', 'Boulevard', 'Circle', 'Trail']
+DIRECTIONS = ['', 'North ', 'Northwest ', 'SE ']
+UNITS = ['', ' Apt 4', ' Suite 200', ' #12']
+CITIES = [('Miami', 'FL', '33101'), ('White Salmon', 'WA', '98672'), ('Lake Oswego', 'OR', '97034')]
+
+
+def make_addresses(count, seed=42):
+    rng = random.Random(seed)
+    addresses = []
+    for _ in range(count):
+        city, state, zip_code = rng.choice(CITIES)
+        addresses.append(
+            f"{rng.randint(1, 99999)} {rng.choice(DIRECTIONS)}{rng.choice(STREETS)} "
+            f"{rng.choice(SUFFIXES)}{rng.choice(UNITS)}, {city}, {state} {zip_code}"
+        )
+    return addresses
+
+
+def timed(func, addresses, calls_per_address):
+    start = time.perf_counter()
+    for address in addresses:
+        for _ in range(calls_per_address):
+            func(address)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=20000, help='number of distinct addresses')
+    parser.add_argument('--calls', type=int, default=3,
+                        help='normalize calls per address (search, parse and fallback each normalize)')
+    args = parser.parse_args()
+
+    addresses = make_addresses(args.count)
+
+    legacy = timed(legacy_normalize_address, addresses, args.calls)
+
+    normalize_address.cache_clear()
+    cold = timed(normalize_address.__wrapped__, addresses, args.calls)
+
+    normalize_address.cache_clear()
+    memoized = timed(normalize_address, addresses, args.calls)
+
+    total = args.count * args.calls
+    print(f"{args.count} addresses x {args.calls} calls = {total} normalizations")
+    print(f"legacy regex loop : {legacy:8.3f}s  ({total / legacy:,.0f}/s)")
+    print(f"single pass       : {cold:8.3f}s  ({total / cold:,.0f}/s)  {legacy / cold:5.1f}x")
+    print(f"single pass + LRU : {memoized:8.3f}s  ({total / memoized:,.0f}/s)  {legacy / memoized:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark stdlib json against the fast_json (orjson) path on property payloads.
+
+Run from the repository root:
+
+    python benchmarks/bench_json.py --sizes 1000 10000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fast_json  # noqa: E402
+
+
+def make_payload(count, seed=7):
+    """A /api/properties response with count synthetic property records"""
+    rng = random.Random(seed)
+    properties = []
+    for i in range(count):
+        zestimate = rng.uniform(150000, 1500000)
+        rent = zestimate * rng.uniform(0.004, 0.008)
+        properties.append({
+            'zpid': str(40000000 + i),
+            'address': f"{rng.randint(1, 9999)} Main St, White Salmon, WA 98672",
+            'zestimate': zestimate,
+            'rentalZestimate': rent,
+            'latitude': 45.7 + rng.random() / 10,
+            'longitude': -121.5 + rng.random() / 10,
+            'bedrooms': float(rng.randint(1, 6)),
+            'bathrooms': float(rng.randint(1, 4)),
+            'livingArea': rng.randint(600, 4500),
+            'yearBuilt': rng.randint(1900, 2024),
+            'propertyType': rng.choice(['Single Family Residential', 'Condominium', 'Townhouse']),
+            'stories': float(rng.randint(1, 3)),
+            'lotSize': float(rng.randint(2000, 40000)),
+            'capRate': round(rent * 12 * 0.6 / zestimate * 100, 2),
+        })
+    return {'properties': properties, 'summary': {'property_count': count}}
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"orjson available: {fast_json.ORJSON_AVAILABLE}")
+    for size in args.sizes:
+        payload = make_payload(size)
+        encoded = json.dumps(payload)
+
+        stdlib_dumps = best_of(lambda: json.dumps(payload, sort_keys=True), args.repeat)
+        fast_dumps = best_of(lambda: fast_json.dumps(payload, sort_keys=True), args.repeat)
+        stdlib_loads = best_of(lambda: json.loads(encoded), args.repeat)
+        fast_loads = best_of(lambda: fast_json.loads(encoded), args.repeat)
+
+        print(f"{size:>6} properties ({len(encoded) / 1024:,.0f} KiB)")
+        print(f"  dumps  stdlib {stdlib_dumps * 1000:8.2f} ms   fast {fast_dumps * 1000:8.2f} ms   "
+              f"{stdlib_dumps / fast_dumps:5.1f}x")
+        print(f"  loads  stdlib {stdlib_loads * 1000:8.2f} ms   fast {fast_loads * 1000:8.2f} ms   "
+              f"{stdlib_loads / fast_loads:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
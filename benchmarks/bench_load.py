@@ -0,0 +1,254 @@
+"""Load test: concurrent virtual users sending a mixed workload to the Flask app,
+backed by the offline Bridge simulator (mock_bridge.py).
+
+By default the app runs in-process on a threaded Werkzeug server. To load a
+real deployment shape, start the mock and app yourself and pass --target:
+
+    python benchmarks/mock_bridge.py --port 8765 &
+    BRIDGE_API_BASE=http://127.0.0.1:8765/api/v2 API_KEY=mock GOOGLE_SERVICE_ACCOUNT_KEY= \
+        gunicorn -w 4 -b :5001 app:app &
+    python benchmarks/bench_load.py --target http://127.0.0.1:5001 --users 32 --duration 60
+
+The save_portfolio scenario writes "load-test-N" portfolios, so a --target app
+must run without Google Sheets credentials (as above) to keep them in memory.
+
+Reports throughput, p50/p95/p99 latency and error rate per scenario. With
+--profile (in-process only) every request is profiled and the merged
+profile is written as a pstats file, e.g. for snakeviz.
+"""
+import argparse
+import glob
+import json
+import os
+import pstats
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_bridge import MockBridge, MockBridgeConfig, SyntheticDataset  # noqa: E402
+
+# Properties per portfolio request and their share of the dataset users draw from
+PORTFOLIO_SIZES = (5, 10, 25, 50)
+ACTIVE_PROPERTIES = 2000
+
+
+def scenario_parse_input(session, base_url, dataset, rng):
+    lines = rng.sample(dataset.addresses(ACTIVE_PROPERTIES), 2) + rng.sample(dataset.zpids(ACTIVE_PROPERTIES), 8)
+    return session.post(f"{base_url}/api/parse-input", json={"input": "\n".join(lines)})
+
+
+def scenario_properties(session, base_url, dataset, rng):
+    zpids = rng.sample(dataset.zpids(ACTIVE_PROPERTIES), rng.choice(PORTFOLIO_SIZES))
+    return session.post(f"{base_url}/api/properties", json={"zpids": zpids})
+
+
+def scenario_nearby(session, base_url, dataset, rng):
+    zpid = rng.choice(dataset.zpids(ACTIVE_PROPERTIES))
+    return session.get(f"{base_url}/api/nearby-properties/{zpid}")
+
+
+def scenario_save_portfolio(session, base_url, dataset, rng):
+    zpids = rng.sample(dataset.zpids(ACTIVE_PROPERTIES), rng.choice(PORTFOLIO_SIZES))
+    return session.post(f"{base_url}/api/save-portfolio", json={
+        "name": f"load-test-{rng.randint(1, 20)}",
+        "zpids": zpids,
+        "input": "\n".join(zpids),
+        "data": {}
+    })
+
+
+def scenario_get_portfolios(session, base_url, dataset, rng):
+    return session.get(f"{base_url}/api/get-portfolios")
+
+
+# Scenario name -> (weight, function)
+SCENARIOS = {
+    "parse_input": (0.2, scenario_parse_input),
+    "properties": (0.4, scenario_properties),
+    "nearby": (0.2, scenario_nearby),
+    "save_portfolio": (0.05, scenario_save_portfolio),
+    "get_portfolios": (0.15, scenario_get_portfolios),
+}
+
+
+class LoadStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {name: [] for name in SCENARIOS}
+        self.errors = {name: 0 for name in SCENARIOS}
+
+    def record(self, name, latency_ms, ok):
+        with self._lock:
+            self.latencies[name].append(latency_ms)
+            if not ok:
+                self.errors[name] += 1
+
+
+def percentile(sorted_values, q):
+    # Nearest rank
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return round(sorted_values[index], 1)
+
+
+def run_user(user_id, base_url, dataset, stats, deadline, think_time, seed):
+    rng = random.Random(seed + user_id)
+    names = list(SCENARIOS)
+    weights = [SCENARIOS[name][0] for name in names]
+    session = requests.Session()
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = SCENARIOS[name][1](session, base_url, dataset, rng)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        stats.record(name, (time.perf_counter() - start) * 1000, ok)
+        if think_time:
+            time.sleep(rng.expovariate(1 / think_time))
+
+
+def summarize(stats, elapsed):
+    report = {"elapsed_s": round(elapsed, 1), "scenarios": {}}
+    all_latencies = []
+    total_errors = 0
+    for name, latencies in stats.latencies.items():
+        latencies = sorted(latencies)
+        all_latencies.extend(latencies)
+        total_errors += stats.errors[name]
+        report["scenarios"][name] = {
+            "requests": len(latencies),
+            "rps": round(len(latencies) / elapsed, 2),
+            "error_rate": round(stats.errors[name] / len(latencies), 4) if latencies else 0,
+            "p50_ms": percentile(latencies, 0.5),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+        }
+    all_latencies.sort()
+    report["total"] = {
+        "requests": len(all_latencies),
+        "rps": round(len(all_latencies) / elapsed, 2),
+        "error_rate": round(total_errors / len(all_latencies), 4) if all_latencies else 0,
+        "p50_ms": percentile(all_latencies, 0.5),
+        "p95_ms": percentile(all_latencies, 0.95),
+        "p99_ms": percentile(all_latencies, 0.99),
+    }
+    return report
+
+
+def print_report(report):
+    print(f"{'scenario':<16} {'requests':>9} {'req/s':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = list(report["scenarios"].items()) + [("TOTAL", report["total"])]
+    for name, row in rows:
+        print(f"{name:<16} {row['requests']:>9} {row['rps']:>8} {row['error_rate']:>7.2%} "
+              f"{row['p50_ms'] or 0:>9} {row['p95_ms'] or 0:>9} {row['p99_ms'] or 0:>9}")
+
+
+def start_app(mock, batch_delay, profile_dir=None):
+    """Serve app.py in-process on a threaded Werkzeug server; returns (server, base_url)"""
+    os.environ["BRIDGE_API_BASE"] = mock.api_base
+    os.environ["BRIDGE_BATCH_DELAY"] = str(batch_delay)
+    os.environ.setdefault("API_KEY", "mock")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Saved portfolios must stay in memory: app.py loads .env, and with Sheets
+    # credentials there the save scenario would write into the real sheet.
+    # load_dotenv doesn't override variables that are already set, even empty
+    os.environ["GOOGLE_SERVICE_ACCOUNT_KEY"] = ""
+    import app
+    from werkzeug.serving import make_server
+
+    wsgi_app = app.app
+    if profile_dir:
+        from werkzeug.middleware.profiler import ProfilerMiddleware
+        wsgi_app = ProfilerMiddleware(app.app.wsgi_app, stream=None, profile_dir=profile_dir)
+
+    server = make_server("127.0.0.1", 0, wsgi_app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def merge_profiles(profile_dir, output, top=25):
+    files = glob.glob(os.path.join(profile_dir, "*.prof"))
+    if not files:
+        return
+    merged = pstats.Stats(files[0])
+    for path in files[1:]:
+        merged.add(path)
+    merged.dump_stats(output)
+    print(f"\nProfile of {len(files)} requests written to {output}; top {top} by cumulative time:")
+    pstats.Stats(output).sort_stats("cumulative").print_stats(top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed-workload load test against a mock Bridge API")
+    parser.add_argument("--users", type=int, default=16, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between a user's requests (s)")
+    parser.add_argument("--target", help="base URL of an already running app (skips the in-process app)")
+    parser.add_argument("--mock-port", type=int, default=0, help="port for the mock Bridge API")
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--batch-delay", type=float, default=0.0, help="app pause between batch requests (s)")
+    parser.add_argument("--profile", help="write a merged cProfile of all requests here (in-process only)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="also write the report here")
+    args = parser.parse_args()
+
+    dataset = SyntheticDataset(seed=args.seed)
+    mock = None
+    server = None
+    profile_dir = None
+
+    if args.target:
+        base_url = args.target.rstrip("/")
+    else:
+        config = MockBridgeConfig(latency_ms=args.latency_ms, error_rate=args.error_rate,
+                                  rate_limit=args.rate_limit, seed=args.seed)
+        mock = MockBridge(config, dataset, port=args.mock_port).start()
+        profile_dir = tempfile.mkdtemp(prefix="load-test-profile-") if args.profile else None
+        server, base_url = start_app(mock, args.batch_delay, profile_dir)
+
+    print(f"{args.users} users for {args.duration}s against {base_url}")
+    stats = LoadStats()
+    deadline = time.monotonic() + args.duration
+    users = [
+        threading.Thread(target=run_user, args=(i, base_url, dataset, stats, deadline, args.think_time, args.seed))
+        for i in range(args.users)
+    ]
+    start = time.perf_counter()
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    report = summarize(stats, time.perf_counter() - start)
+    report["config"] = vars(args)
+    if mock:
+        report["upstream"] = mock.stats()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+
+    if server:
+        server.shutdown()
+        mock.stop()
+    if profile_dir:
+        merge_profiles(profile_dir, args.profile)
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""End-to-end benchmark of /api/properties, /api/nearby-properties and
+/api/parse-input against the offline Bridge simulator (mock_bridge.py).
+
+Reports latency and upstream calls per portfolio size, cold (empty caches)
+and warm. Run from the repository root:
+
+    python benchmarks/bench_portfolio_pipeline.py --sizes 10 100 1000 --json bench.json
+
+The app's pause between batch requests defaults to 0 here; pass
+--batch-delay 1 to include production pacing.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_bridge import MockBridge, MockBridgeConfig, SyntheticDataset  # noqa: E402
+
+# Share of parse-input lines given as addresses rather than ZPIDs
+ADDRESS_SHARE = 0.1
+
+
+def _upstream_calls(before, after):
+    calls = {}
+    for endpoint, entry in after.items():
+        calls[endpoint] = entry["requests"] - before.get(endpoint, {}).get("requests", 0)
+    return calls
+
+
+def _clear_caches(app):
+    app.bridge_client.clear_caches()
+    with app.AREA_INDEXES_LOCK:
+        app.AREA_INDEXES.clear()
+
+
+def timed_call(mock, send):
+    before = mock.stats()
+    start = time.perf_counter()
+    response = send()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return {
+        "status": response.status_code,
+        "latency_ms": round(elapsed_ms, 1),
+        "upstream_calls": _upstream_calls(before, mock.stats()),
+        "response_bytes": len(response.get_data()),
+    }
+
+
+def bench_size(app, client, mock, size):
+    zpids = mock.dataset.zpids(size)
+    address_count = max(1, int(size * ADDRESS_SHARE))
+    parse_lines = mock.dataset.addresses(address_count, start=size) + zpids[:size - address_count]
+    results = {}
+
+    for phase in ("cold", "warm"):
+        if phase == "cold":
+            _clear_caches(app)
+        results[f"properties_{phase}"] = timed_call(
+            mock, lambda: client.post("/api/properties", json={"zpids": zpids}))
+        results[f"nearby_{phase}"] = timed_call(
+            mock, lambda: client.get(f"/api/nearby-properties/{zpids[0]}"))
+        results[f"parse_input_{phase}"] = timed_call(
+            mock, lambda: client.post("/api/parse-input", json={"input": "\n".join(parse_lines)}))
+    return results
+
+
+def print_report(report):
+    print(f"{'size':>6} {'route':<20} {'status':>6} {'latency ms':>11} {'calls':>6}  upstream")
+    for size, results in report["results"].items():
+        for route, result in results.items():
+            upstream = ", ".join(f"{k}={v}" for k, v in sorted(result["upstream_calls"].items()) if v)
+            print(f"{size:>6} {route:<20} {result['status']:>6} {result['latency_ms']:>11.1f} "
+                  f"{sum(result['upstream_calls'].values()):>6}  {upstream}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--batch-delay", type=float, default=0.0, help="app pause between batch requests (s)")
+    parser.add_argument("--json", help="also write the results here, to track regressions over time")
+    args = parser.parse_args()
+
+    config = MockBridgeConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                              error_rate=args.error_rate, rate_limit=args.rate_limit)
+    dataset = SyntheticDataset(size=max(20000, 2 * max(args.sizes)), seed=config.seed)
+    mock = MockBridge(config, dataset).start()
+
+    # The app reads these at import time
+    os.environ["BRIDGE_API_BASE"] = mock.api_base
+    os.environ["BRIDGE_BATCH_DELAY"] = str(args.batch_delay)
+    os.environ.setdefault("API_KEY", "mock")
+    import app
+
+    client = app.app.test_client()
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": vars(args),
+        "results": {}
+    }
+    try:
+        for size in args.sizes:
+            report["results"][size] = bench_size(app, client, mock, size)
+    finally:
+        mock.stop()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
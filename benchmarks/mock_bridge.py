@@ -0,0 +1,410 @@
+"""Offline stand-in for the Bridge zestimates_v2/zestimates, pub/parcels and
+pub/transactions APIs.
+
+Serves synthetic, deterministic property data with configurable latency,
+error rate and 429 rate limiting, so the app can be benchmarked without
+burning API quota. Run it standalone:
+
+    python benchmarks/mock_bridge.py --port 8765 --latency-ms 80 --rate-limit 10
+
+and point the app at it:
+
+    BRIDGE_API_BASE=http://127.0.0.1:8765/api/v2 API_KEY=mock python app.py
+
+Supported query parameters: zpid, zpid.in, near (lon,lat), radius (transactions,
+e.g. 0.5mi), recordingDate.gte, address.full, address.city, address.zip, limit,
+offset and fields. GET /_stats returns request counts since start.
+"""
+import argparse
+import heapq
+import json
+import math
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+ZESTIMATES_PATH = "/api/v2/zestimates_v2/zestimates"
+PARCELS_PATH = "/api/v2/pub/parcels"
+TRANSACTIONS_PATH = "/api/v2/pub/transactions"
+
+# Bridge returns 10 records unless asked for more, and at most 200
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 200
+
+FIRST_ZPID = 20000000
+
+# (city, state, zip, latitude, longitude) of the synthetic markets
+MARKETS = [
+    ("White Salmon", "WA", "98672", 45.7276, -121.4865),
+    ("Hood River", "OR", "97031", 45.7054, -121.5215),
+    ("Portland", "OR", "97214", 45.5152, -122.6426),
+    ("Spokane", "WA", "99201", 47.6588, -117.4260),
+    ("Boise", "ID", "83702", 43.6150, -116.2023),
+]
+STREETS = ["Main", "Oak", "Pine", "Maple", "Cedar", "Jewett", "Washington", "Lincoln", "Park", "Front",
+           "Hill", "Lake", "Columbia", "Spruce", "Alder", "Elm", "Willow", "Grand", "Broadway", "Division"]
+SUFFIXES = ["St", "Ave", "Blvd", "Rd", "Dr", "Ln", "Ct", "Way"]
+LAND_USES = ["Single Family Residential"] * 6 + ["Condominium", "Townhouse", "Duplex", "Mobile Home"]
+DOCUMENT_TYPES = ["Warranty Deed"] * 3 + ["Grant Deed", "Quitclaim Deed"]
+# Sales are spread over this many days before today
+SALES_HISTORY_DAYS = 1095
+MILES_PER_DEGREE = 69.0
+
+_NON_ALNUM_RE = re.compile(r"[^A-Z0-9 ]")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def address_key(address):
+    """Case, punctuation and whitespace-insensitive key for address.full lookups"""
+    return _SPACES_RE.sub(" ", _NON_ALNUM_RE.sub("", address.upper())).strip()
+
+
+class SyntheticDataset:
+    """size deterministic properties spread over MARKETS, indexed the ways the API is queried"""
+
+    def __init__(self, size=20000, seed=7):
+        rng = random.Random(seed)
+        self.properties = []
+        self.by_zpid = {}
+        self.by_address = {}
+        self.by_area = {}
+
+        for i in range(size):
+            city, state, postal_code, lat, lon = MARKETS[i % len(MARKETS)]
+            living_area = rng.randint(600, 4500)
+            zestimate = round(living_area * rng.uniform(180, 520), -2)
+            house = rng.randint(1, 9999)
+            street = f"{rng.choice(STREETS)} {rng.choice(SUFFIXES)}"
+            prop = {
+                "zpid": str(FIRST_ZPID + i),
+                "house": str(house),
+                "street": street,
+                "city": city,
+                "state": state,
+                "zip": postal_code,
+                "full": f"{house} {street}, {city}, {state} {postal_code}",
+                "latitude": lat + rng.uniform(-0.05, 0.05),
+                "longitude": lon + rng.uniform(-0.05, 0.05),
+                "zestimate": zestimate,
+                "rentalZestimate": round(zestimate * rng.uniform(0.004, 0.008), -1),
+                "bedrooms": rng.randint(1, 6),
+                "baths": rng.randint(1, 4),
+                "livingArea": living_area,
+                "yearBuilt": rng.randint(1900, 2024),
+                "stories": rng.randint(1, 3),
+                "lotSize": rng.randint(2000, 40000),
+                "landUse": rng.choice(LAND_USES),
+                "owner": f"{rng.choice(['SMITH', 'JONES', 'LEE', 'GARCIA', 'NGUYEN'])} {rng.choice(['JOHN', 'MARY', 'ALEX'])}",
+            }
+            self.properties.append(prop)
+            self.by_zpid[prop["zpid"]] = prop
+            self.by_address.setdefault(address_key(prop["full"]), []).append(prop)
+            self.by_area.setdefault((city.lower(), postal_code), []).append(prop)
+
+        # Drawn from their own generator so the properties don't depend on them
+        sales_rng = random.Random(seed + 1)
+        today = date.today()
+        self.transactions = []
+        for prop in self.properties:
+            for k in range(sales_rng.choice([0, 0, 1, 1, 2])):
+                document_type = sales_rng.choice(DOCUMENT_TYPES)
+                self.transactions.append((prop, {
+                    "id": f"{prop['zpid']}-{k}",
+                    "recordingDate": (today - timedelta(days=sales_rng.randint(0, SALES_HISTORY_DAYS))).isoformat(),
+                    "documentType": document_type,
+                    # Quitclaims transfer title without a sale
+                    "salesPrice": None if document_type == "Quitclaim Deed"
+                    else round(prop["zestimate"] * sales_rng.uniform(0.85, 1.1), -3),
+                    "buyerName": [f"BUYER {sales_rng.randint(1, 999)}"],
+                    "sellerName": [prop["owner"]],
+                    "parcels": [{"zpid": prop["zpid"], "full": prop["full"]}],
+                }))
+
+    def zpids(self, count, start=0):
+        return [p["zpid"] for p in self.properties[start:start + count]]
+
+    def addresses(self, count, start=0):
+        return [p["full"] for p in self.properties[start:start + count]]
+
+    def near(self, longitude, latitude, limit):
+        # Equirectangular distance is plenty for ranking within a market
+        scale = math.cos(math.radians(latitude))
+        return heapq.nsmallest(
+            limit, self.properties,
+            key=lambda p: ((p["longitude"] - longitude) * scale) ** 2 + (p["latitude"] - latitude) ** 2
+        )
+
+    def transactions_near(self, longitude, latitude, radius_miles, since=None):
+        scale = math.cos(math.radians(latitude))
+        matches = []
+        for prop, transaction in self.transactions:
+            if since and transaction["recordingDate"] < since:
+                continue
+            distance = MILES_PER_DEGREE * math.hypot((prop["longitude"] - longitude) * scale,
+                                                     prop["latitude"] - latitude)
+            if distance <= radius_miles:
+                matches.append((distance, transaction["id"], transaction))
+        return [transaction for _distance, _id, transaction in sorted(matches, key=lambda m: m[:2])]
+
+    @staticmethod
+    def zestimate_record(prop):
+        return {
+            "zpid": prop["zpid"],
+            "address": prop["full"],
+            "zestimate": prop["zestimate"],
+            "rentalZestimate": prop["rentalZestimate"],
+            "Latitude": prop["latitude"],
+            "Longitude": prop["longitude"],
+            "timestamp": "2024-01-01T00:00:00.000Z",
+        }
+
+    @staticmethod
+    def parcel_record(prop):
+        return {
+            "zpid": prop["zpid"],
+            "address": {
+                "full": prop["full"],
+                "house": prop["house"],
+                "street": prop["street"],
+                "city": prop["city"],
+                "state": prop["state"],
+                "zip": prop["zip"],
+            },
+            "coordinates": [prop["longitude"], prop["latitude"]],
+            "landUseDescription": prop["landUse"],
+            "lotSizeSquareFeet": prop["lotSize"],
+            "marketTotalValue": prop["zestimate"] * 0.9,
+            "ownerName": [prop["owner"]],
+            "building": [{
+                "bedrooms": prop["bedrooms"],
+                "fullBaths": prop["baths"],
+                "yearBuilt": prop["yearBuilt"],
+                "totalStories": prop["stories"],
+            }],
+            "areas": [{"type": "Living Building Area", "areaSquareFeet": prop["livingArea"]}],
+        }
+
+
+class MockBridgeConfig:
+    """Latency, failure and throttling behaviour of the mock"""
+
+    def __init__(self, latency_ms=50.0, jitter_ms=10.0, per_item_ms=0.5, error_rate=0.0, rate_limit=0.0, seed=7):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.per_item_ms = per_item_ms
+        self.error_rate = error_rate
+        # Requests per second before answering 429; 0 disables throttling
+        self.rate_limit = rate_limit
+        self.seed = seed
+
+
+class _TokenBucket:
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        mock = self.server.mock
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if url.path == "/_stats":
+            return self._send(200, mock.stats())
+
+        endpoint = {ZESTIMATES_PATH: "zestimates", PARCELS_PATH: "parcels",
+                    TRANSACTIONS_PATH: "transactions"}.get(url.path)
+        if endpoint is None:
+            return self._send(404, {"success": False, "status": 404, "message": "Not found"})
+
+        if mock.bucket and not mock.bucket.take():
+            mock.record(endpoint, 429, 0)
+            return self._send(429, {"success": False, "status": 429, "message": "Rate limit exceeded"},
+                              {"Retry-After": "1"})
+
+        if mock.config.error_rate and mock.rng.random() < mock.config.error_rate:
+            mock.record(endpoint, 500, 0)
+            return self._send(500, {"success": False, "status": 500, "message": "Simulated server error"})
+
+        try:
+            matches = mock.query(endpoint, params)
+        except ValueError as e:
+            mock.record(endpoint, 400, 0)
+            return self._send(400, {"success": False, "status": 400, "message": str(e)})
+
+        limit = min(int(params.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+        offset = int(params.get("offset", 0))
+        page = matches[offset:offset + limit]
+
+        if endpoint == "transactions":
+            bundle = page
+        else:
+            to_record = mock.dataset.zestimate_record if endpoint == "zestimates" else mock.dataset.parcel_record
+            bundle = [to_record(prop) for prop in page]
+        if params.get("fields"):
+            fields = params["fields"].split(",")
+            bundle = [{key: record[key] for key in fields if key in record} for record in bundle]
+
+        payload = {"success": True, "status": 200, "bundle": bundle, "total": len(matches)}
+        if offset + limit < len(matches):
+            next_params = {k: v for k, v in params.items() if k != "access_token"}
+            next_params["offset"] = offset + limit
+            payload["nextPage"] = f"{mock.base_url}{url.path}?{urlencode(next_params)}"
+
+        mock.sleep(len(bundle))
+        mock.record(endpoint, 200, len(bundle))
+        self._send(200, payload)
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockBridge:
+    """Threaded HTTP server answering Bridge API requests from a SyntheticDataset"""
+
+    def __init__(self, config=None, dataset=None, host="127.0.0.1", port=0):
+        self.config = config or MockBridgeConfig()
+        self.dataset = dataset or SyntheticDataset(seed=self.config.seed)
+        self.rng = random.Random(self.config.seed)
+        self.bucket = _TokenBucket(self.config.rate_limit) if self.config.rate_limit else None
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_base(self):
+        """Value for BRIDGE_API_BASE"""
+        return f"{self.base_url}/api/v2"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def query(self, endpoint, params):
+        dataset = self.dataset
+        if endpoint == "transactions":
+            try:
+                longitude, latitude = (float(v) for v in params["near"].split(","))
+                radius = float(params.get("radius", "1mi").removesuffix("mi"))
+            except (KeyError, ValueError):
+                raise ValueError("near (longitude,latitude) and radius (e.g. 0.5mi) are required")
+            return dataset.transactions_near(longitude, latitude, radius, params.get("recordingDate.gte"))
+        if params.get("zpid"):
+            prop = dataset.by_zpid.get(params["zpid"])
+            return [prop] if prop else []
+        if params.get("zpid.in"):
+            zpids = params["zpid.in"].split(",")
+            return [dataset.by_zpid[z] for z in zpids if z in dataset.by_zpid]
+        if params.get("near"):
+            try:
+                longitude, latitude = (float(v) for v in params["near"].split(","))
+            except ValueError:
+                raise ValueError("near must be longitude,latitude")
+            return dataset.near(longitude, latitude, min(int(params.get("limit", DEFAULT_LIMIT)), MAX_LIMIT))
+        if params.get("address.full"):
+            return dataset.by_address.get(address_key(params["address.full"]), [])
+        if endpoint == "parcels" and (params.get("address.city") or params.get("address.zip")):
+            city = (params.get("address.city") or "").lower()
+            postal_code = (params.get("address.zip") or "")[:5]
+            return [
+                p for (area_city, area_zip), props in dataset.by_area.items()
+                if (not city or area_city == city) and (not postal_code or area_zip == postal_code)
+                for p in props
+            ]
+        raise ValueError("One of zpid, zpid.in, near, address.full, address.city or address.zip is required")
+
+    def sleep(self, items):
+        config = self.config
+        with self._lock:
+            jitter = self.rng.gauss(0, config.jitter_ms) if config.jitter_ms else 0
+        delay = config.latency_ms + jitter + items * config.per_item_ms
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def record(self, endpoint, status, items):
+        with self._lock:
+            entry = self._stats.setdefault(endpoint, {"requests": 0, "items": 0, "statuses": {}})
+            entry["requests"] += 1
+            entry["items"] += items
+            entry["statuses"][str(status)] = entry["statuses"].get(str(status), 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Bridge API simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--size", type=int, default=20000, help="number of synthetic properties")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="base latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="standard deviation of the latency")
+    parser.add_argument("--per-item-ms", type=float, default=0.5, help="added latency per returned record")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before 429 (0 = off)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    config = MockBridgeConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, per_item_ms=args.per_item_ms,
+                              error_rate=args.error_rate, rate_limit=args.rate_limit, seed=args.seed)
+    mock = MockBridge(config, SyntheticDataset(args.size, args.seed), args.host, args.port)
+    print(f"Mock Bridge API on {mock.base_url} - set BRIDGE_API_BASE={mock.api_base}")
+    print(f"Sample ZPIDs: {', '.join(mock.dataset.zpids(3))}")
+    try:
+        mock.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
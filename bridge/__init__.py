@@ -0,0 +1,3 @@
+from bridge.client import BATCH_SIZE, DEFAULT_API_BASE, BridgeBatchError, BridgeClient, RateLimiter, make_session
+from bridge.records import (build_property_record, cap_rate, get_living_area_from_parcel, process_parcel_data,
+                            safe_float)
@@ -0,0 +1,241 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from instrumentation import InstrumentedSession, rate_limit_sleep, record_cache, record_wait, run_in_context
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_BASE = "https://api.bridgedataoutput.com/api/v2"
+
+# ZPIDs per zpid.in request
+BATCH_SIZE = 50
+
+
+def make_session(pool_size=10, max_concurrency=None, retries=3):
+    """Pooled, instrumented session that retries rate limits and server errors"""
+    retry_strategy = Retry(
+        total=retries,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504]
+    )
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = InstrumentedSession(max_concurrency=max_concurrency)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class BridgeBatchError(requests.RequestException):
+    """Some zpid.in batches of a lookup failed
+
+    results holds the records that were fetched anyway and failed the ZPIDs
+    of the failed batches, so callers that can use partial data still may.
+    """
+
+    def __init__(self, failed, results, cause):
+        super().__init__(f"{len(failed)} ZPIDs could not be fetched: {cause}")
+        self.failed = failed
+        self.results = results
+
+
+class RateLimiter:
+    """Spread requests evenly so all threads together stay under rate per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+            record_wait('rate-limit', slot - now)
+
+
+class BridgeClient:
+    """Bridge zestimates and parcels API access shared by the apps
+
+    Zestimate and parcel records are cached by ZPID, ZPID lookups go out in
+    zpid.in batches (parcels concurrently), and every call shares one pooled
+    session and an optional process-wide rate limit.
+    """
+
+    def __init__(self, api_key, api_base=DEFAULT_API_BASE, session=None, batch_size=BATCH_SIZE, batch_delay=1.0,
+                 parcel_workers=4, rate_limit=0, cache_size=10000, cache_ttl=3600):
+        self.api_key = api_key
+        self.api_base = api_base.rstrip("/")
+        self.zestimates_url = f"{self.api_base}/zestimates_v2/zestimates"
+        self.parcels_url = f"{self.api_base}/pub/parcels"
+        self.transactions_url = f"{self.api_base}/pub/transactions"
+        self.session = session or make_session()
+        self.batch_size = batch_size
+        # Pause between sequential zestimate batches of one lookup
+        self.batch_delay = batch_delay
+        self.parcel_workers = parcel_workers
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.zestimate_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.parcel_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """Client configured from API_KEY and the BRIDGE_* / ZESTIMATE_CACHE_TTL environment variables"""
+        pool_size = int(os.getenv("BRIDGE_POOL_SIZE", 10))
+        max_concurrency = int(os.getenv("BRIDGE_MAX_CONCURRENCY", 0))
+        settings = {
+            'api_key': os.getenv("API_KEY"),
+            'api_base': os.getenv("BRIDGE_API_BASE", DEFAULT_API_BASE),
+            'session': make_session(pool_size, max_concurrency),
+            'batch_delay': float(os.getenv("BRIDGE_BATCH_DELAY", 1)),
+            'parcel_workers': int(os.getenv("BRIDGE_PARCEL_WORKERS", 4)),
+            'rate_limit': float(os.getenv("BRIDGE_RATE_LIMIT", 0)),
+            'cache_ttl': int(os.getenv("ZESTIMATE_CACHE_TTL", 3600)),
+        }
+        settings.update(overrides)
+        return cls(**settings)
+
+    def get(self, url, params=None):
+        """Rate-limited GET with the access token added; returns the Response"""
+        self.rate_limiter.wait()
+        return self.session.get(url, params={"access_token": self.api_key, **(params or {})})
+
+    def _get_json(self, url, params):
+        response = self.get(url, params)
+        response.raise_for_status()
+        return response.json()
+
+    def _cached(self, cache, zpids, name):
+        found = {}
+        missing = []
+        with self._cache_lock:
+            for zpid in dict.fromkeys(str(z) for z in zpids):
+                record = cache.get(zpid)
+                if record is not None:
+                    found[zpid] = record
+                else:
+                    missing.append(zpid)
+        record_cache(name, hits=len(found), misses=len(missing))
+        return found, missing
+
+    def _store(self, cache, records):
+        with self._cache_lock:
+            for record in records:
+                if record.get('zpid'):
+                    cache[str(record['zpid'])] = record
+
+    def cache_zestimates(self, records):
+        """Store raw zestimate records (e.g. from a ``near`` bundle) in the ZPID cache"""
+        self._store(self.zestimate_cache, records)
+
+    def get_zestimates(self, zpids):
+        """Zestimate records by ZPID, from the cache or fetched in zpid.in batches
+
+        Raises BridgeBatchError (a requests.RequestException) if any batch
+        failed, after trying the rest; ZPIDs Bridge doesn't know are just absent.
+        """
+        results, missing = self._cached(self.zestimate_cache, zpids, 'zestimates')
+        logger.debug(f"Zestimate cache: {len(results)} hits, {len(missing)} to fetch")
+
+        failed = []
+        error = None
+        for i in range(0, len(missing), self.batch_size):
+            batch = missing[i:i + self.batch_size]
+            if i > 0 and self.batch_delay:
+                rate_limit_sleep(self.batch_delay)  # Rate limiting between batches
+            try:
+                bundle = self._get_json(self.zestimates_url, {"zpid.in": ",".join(batch), "limit": len(batch)})
+            except (requests.RequestException, ValueError) as e:
+                logger.error(f"Error fetching Zestimate batch starting at index {i}: {e}")
+                failed.extend(batch)
+                error = e
+                continue
+            bundle = bundle.get('bundle', [])
+            self.cache_zestimates(bundle)
+            for record in bundle:
+                results[str(record.get('zpid'))] = record
+
+        if failed:
+            raise BridgeBatchError(failed, results, error)
+        return results
+
+    def get_zestimate(self, zpid):
+        """Zestimate record for one ZPID, or None if Bridge has none; raises on request errors"""
+        return self.get_zestimates([zpid]).get(str(zpid))
+
+    def get_nearby(self, longitude, latitude, limit=20):
+        """Zestimate records nearest a point; they are cached for later ZPID lookups"""
+        bundle = self._get_json(self.zestimates_url, {"near": f"{longitude},{latitude}", "limit": limit})
+        bundle = bundle.get('bundle', [])
+        self.cache_zestimates(bundle)
+        return bundle
+
+    def _fetch_parcel_chunk(self, chunk):
+        try:
+            data = self._get_json(self.parcels_url, {"zpid.in": ",".join(chunk), "limit": len(chunk)})
+        except Exception as e:
+            logger.error(f"Error fetching parcel data for ZPIDs {chunk[:3]}... ({len(chunk)}): {e}")
+            return []
+        bundle = data.get('bundle', [])
+        logger.debug(f"Parcel API response: {len(bundle)} parcels for {len(chunk)} ZPIDs")
+        return bundle
+
+    def get_parcels(self, zpids):
+        """Raw parcel records by ZPID, from the cache or fetched in concurrent zpid.in batches"""
+        results, missing = self._cached(self.parcel_cache, zpids, 'parcels')
+        chunks = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        if not chunks:
+            return results
+
+        if len(chunks) == 1:
+            bundles = [self._fetch_parcel_chunk(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.parcel_workers, len(chunks))) as executor:
+                bundles = list(executor.map(run_in_context(self._fetch_parcel_chunk), chunks))
+
+        for bundle in bundles:
+            self._store(self.parcel_cache, bundle)
+            for parcel in bundle:
+                results[str(parcel.get('zpid'))] = parcel
+        return results
+
+    def get_parcel(self, zpid):
+        """Raw parcel record for one ZPID, or None"""
+        return self.get_parcels([zpid]).get(str(zpid))
+
+    def get_transactions_near(self, longitude, latitude, radius_miles, since=None, max_records=1000):
+        """Raw public-record transactions within radius_miles of a point, following nextPage"""
+        params = {"near": f"{longitude},{latitude}", "radius": f"{radius_miles:.3f}mi", "limit": 200}
+        if since:
+            params["recordingDate.gte"] = since
+        data = self._get_json(self.transactions_url, params)
+        records = data.get('bundle', [])
+        while data.get('nextPage') and len(records) < max_records:
+            data = self._get_json(data['nextPage'], None)
+            records.extend(data.get('bundle', []))
+        return records[:max_records]
+
+    def evict(self, zpids):
+        """Drop cached zestimate and parcel records so the next lookup fetches them again"""
+        with self._cache_lock:
+            for zpid in zpids:
+                self.zestimate_cache.pop(str(zpid), None)
+                self.parcel_cache.pop(str(zpid), None)
+
+    def clear_caches(self):
+        with self._cache_lock:
+            self.zestimate_cache.clear()
+            self.parcel_cache.clear()
@@ -0,0 +1,86 @@
+# Parcel area types that hold the living area, in order of preference
+LIVING_AREA_TYPES = [
+    'Living Building Area',
+    'Finished Building Area',
+    'Total Building Area',
+    'Zillow Calculated Finished Area'
+]
+
+# Share of gross rent assumed to remain after expenses
+NET_RENT_RATIO = 0.60
+
+
+def safe_float(value, default=0.0):
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def cap_rate(zestimate, rental_zestimate):
+    """Annual net rent as a percentage of the Zestimate (0 if there is no Zestimate)"""
+    zestimate = safe_float(zestimate)
+    if zestimate <= 0:
+        return 0
+    return safe_float(rental_zestimate) * 12 * NET_RENT_RATIO / zestimate * 100
+
+
+def get_living_area_from_parcel(areas):
+    """Extract living area from parcel data areas, checking multiple area types"""
+    if not areas:
+        return 0
+
+    for area_type in LIVING_AREA_TYPES:
+        area = next((
+            area.get('areaSquareFeet', 0)
+            for area in areas
+            if area.get('type') == area_type
+        ), 0)
+        if area:
+            return area
+    return 0
+
+
+def process_parcel_data(parcel):
+    """Process a single parcel record and extract relevant data"""
+    if not parcel:
+        return None
+
+    # Get building info
+    buildings = parcel.get('building', [])
+    building = buildings[0] if buildings else {}
+
+    return {
+        'bedrooms': safe_float(building.get('bedrooms')),
+        'bathrooms': safe_float(building.get('fullBaths', building.get('baths'))),
+        'livingArea': get_living_area_from_parcel(parcel.get('areas', [])),
+        'yearBuilt': building.get('yearBuilt'),
+        'propertyType': parcel.get('landUseDescription'),
+        'stories': safe_float(building.get('totalStories')),
+        'lotSize': safe_float(parcel.get('lotSizeSquareFeet'))
+    }
+
+
+def build_property_record(zestimate_record, parcel=None):
+    """Merge a zestimate record and its raw parcel (if any) into one property record"""
+    record = {
+        'zpid': str(zestimate_record.get('zpid')),
+        'address': zestimate_record.get('address'),
+        'zestimate': safe_float(zestimate_record.get('zestimate')),
+        'rentalZestimate': safe_float(zestimate_record.get('rentalZestimate')),
+        'latitude': zestimate_record.get('Latitude'),
+        'longitude': zestimate_record.get('Longitude'),
+        'bedrooms': 0,
+        'bathrooms': 0,
+        'livingArea': 0,
+        'yearBuilt': 'N/A',
+        'propertyType': None,
+        'stories': 0,
+        'lotSize': 0
+    }
+    if parcel:
+        record.update(process_parcel_data(parcel))
+    record['capRate'] = round(cap_rate(record['zestimate'], record['rentalZestimate']), 2)
+    return record
@@ -0,0 +1,114 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from cachetools import TTLCache
+
+from instrumentation import record_cache, run_in_context
+
+logger = logging.getLogger(__name__)
+
+
+class CellCache:
+    """TTL cache of values loaded per key (map cell or tile), where concurrent misses share one load
+
+    get_many loads missing keys concurrently as part of the calling request;
+    prefetch loads them on a small background pool without blocking it.
+    Failed loads are logged and not cached.
+    """
+
+    def __init__(self, loader, name, maxsize=5000, ttl=3600, workers=4, prefetch_workers=2, max_prefetch=64):
+        self.loader = loader
+        self.name = name
+        self.workers = workers
+        self.prefetch_workers = prefetch_workers
+        # Prefetches queued beyond this are dropped rather than piling up behind a slow upstream
+        self.max_prefetch = max_prefetch
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._prefetching = 0
+        self._prefetch_executor = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cache)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._cache
+
+    def _load(self, key, future):
+        try:
+            value = self.loader(key)
+        except Exception as e:
+            logger.error(f"Error loading {self.name} {key}: {e}")
+            value = None
+        with self._lock:
+            if value is not None:
+                self._cache[key] = value
+            self._pending.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def _claim(self, keys):
+        """Split keys into cached values, loads already in flight and loads this caller must run"""
+        found = {}
+        waiting = {}
+        to_load = {}
+        with self._lock:
+            for key in keys:
+                value = self._cache.get(key)
+                if value is not None:
+                    found[key] = value
+                elif key in self._pending:
+                    waiting[key] = self._pending[key]
+                elif key not in to_load:
+                    to_load[key] = self._pending[key] = Future()
+        return found, waiting, to_load
+
+    def get_many(self, keys):
+        """Values by key, loading missing ones; keys that failed to load are left out"""
+        found, waiting, to_load = self._claim(keys)
+        record_cache(self.name, hits=len(found), misses=len(waiting) + len(to_load))
+
+        if len(to_load) == 1:
+            self._load(*next(iter(to_load.items())))
+        elif to_load:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(to_load))) as executor:
+                list(executor.map(run_in_context(self._load), to_load, to_load.values()))
+
+        for key, future in {**waiting, **to_load}.items():
+            value = future.result()
+            if value is not None:
+                found[key] = value
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def _prefetch_one(self, key, future):
+        try:
+            self._load(key, future)
+        finally:
+            with self._lock:
+                self._prefetching -= 1
+
+    def prefetch(self, keys):
+        """Load keys that are neither cached nor in flight in the background; returns how many were queued"""
+        with self._lock:
+            keys = [key for key in dict.fromkeys(keys) if key not in self._cache and key not in self._pending]
+            keys = keys[:max(0, self.max_prefetch - self._prefetching)]
+            futures = {key: Future() for key in keys}
+            self._pending.update(futures)
+            self._prefetching += len(futures)
+            if futures and self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(max_workers=self.prefetch_workers,
+                                                             thread_name_prefix=f"{self.name}-prefetch")
+        for key, future in futures.items():
+            self._prefetch_executor.submit(self._prefetch_one, key, future)
+        return len(futures)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
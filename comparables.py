@@ -0,0 +1,97 @@
+# numpy is imported in the functions that use it, so importing this module
+# (and app.py) doesn't pay for it on a cold start
+from bridge import safe_float
+from property_query import EARTH_RADIUS_MILES
+
+# Share of the similarity score given to each component; they sum to 1
+SIMILARITY_WEIGHTS = {
+    'distance': 0.30,
+    'livingArea': 0.20,
+    'propertyType': 0.15,
+    'bedrooms': 0.15,
+    'bathrooms': 0.10,
+    'yearBuilt': 0.10,
+}
+# Distance (miles) and age difference (years) at which those components fall to 1/e
+DISTANCE_SCALE_MILES = 1.0
+YEAR_SCALE = 20.0
+# Component value when either side lacks the data
+NEUTRAL = 0.5
+
+
+def haversine_miles(latitude, longitude, latitudes, longitudes):
+    """Great-circle distances in miles from one point to arrays of points"""
+    import numpy as np
+    latitude, longitude = np.radians(latitude), np.radians(longitude)
+    latitudes, longitudes = np.radians(latitudes), np.radians(longitudes)
+    a = (np.sin((latitudes - latitude) / 2) ** 2
+         + np.cos(latitude) * np.cos(latitudes) * np.sin((longitudes - longitude) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+
+
+def _column(records, field):
+    import numpy as np
+    return np.array([safe_float(record.get(field), np.nan) for record in records], dtype=float)
+
+
+def _known(values):
+    import numpy as np
+    # Property records use 0 (or 'N/A') for missing building data
+    return np.where(values > 0, values, np.nan)
+
+
+def _land_use(value):
+    return (value or '').strip().lower()
+
+
+def similarity_scores(source, records):
+    """Distances (miles) and similarity scores (0-100) of property records to a source record, as arrays
+
+    Each component is in [0, 1]: distance and year built decay
+    exponentially, beds and baths as 1 / (1 + difference), living area
+    with the relative difference, and land use is 1 on an exact match.
+    """
+    import numpy as np
+    distances = haversine_miles(safe_float(source.get('latitude'), np.nan), safe_float(source.get('longitude'), np.nan),
+                                _column(records, 'latitude'), _column(records, 'longitude'))
+
+    def source_value(field):
+        value = safe_float(source.get(field), np.nan)
+        return value if value > 0 else np.nan
+
+    source_type = _land_use(source.get('propertyType'))
+    land_use = np.array([_land_use(record.get('propertyType')) for record in records])
+    if source_type:
+        land_use_match = np.where(land_use == '', np.nan, land_use == source_type)
+    else:
+        land_use_match = np.full(len(records), np.nan)
+
+    living_area = source_value('livingArea')
+    components = np.column_stack([
+        np.exp(-distances / DISTANCE_SCALE_MILES),
+        np.clip(1 - np.abs(_known(_column(records, 'livingArea')) - living_area) / living_area, 0, 1),
+        land_use_match,
+        1 / (1 + np.abs(_known(_column(records, 'bedrooms')) - source_value('bedrooms'))),
+        1 / (1 + np.abs(_known(_column(records, 'bathrooms')) - source_value('bathrooms'))),
+        np.exp(-np.abs(_known(_column(records, 'yearBuilt')) - source_value('yearBuilt')) / YEAR_SCALE),
+    ])
+    weights = np.array(list(SIMILARITY_WEIGHTS.values()))
+    scores = np.where(np.isnan(components), NEUTRAL, components) @ weights * 100
+    return distances, scores
+
+
+def rank_comparables(source, records, limit=None):
+    """Copies of records with distance and similarity added, most similar to source first"""
+    import numpy as np
+    if not records:
+        return []
+    distances, scores = similarity_scores(source, records)
+    order = np.argsort(-scores, kind='stable')[:limit]
+    return [
+        {
+            **records[i],
+            'distance': round(float(distances[i]), 2) if np.isfinite(distances[i]) else None,
+            'similarity': round(float(scores[i]), 1)
+        }
+        for i in order
+    ]
@@ -0,0 +1,187 @@
+import logging
+import time
+from datetime import date, timedelta
+
+import geohash_cells
+from bridge import get_living_area_from_parcel, safe_float
+from cell_cache import CellCache
+from comparables import haversine_miles
+
+logger = logging.getLogger(__name__)
+
+# Geohash length of a cache cell; 6 is about 0.4 x 0.7 miles at mid latitudes
+CELL_PRECISION = 6
+# Only sales recorded within this many days are fetched
+LOOKBACK_DAYS = 730
+# Trailing windows (months) of the neighborhood stats
+ROLLING_WINDOWS = (3, 6, 12)
+MAX_CELL_TRANSACTIONS = 1000
+
+
+def normalize_transaction(record, parcels):
+    """Flat comps record from a raw transaction; square feet and missing coordinates come from its parcel"""
+    ref = (record.get('parcels') or [{}])[0]
+    zpid = str(ref.get('zpid') or record.get('zpid') or '') or None
+    parcel = parcels.get(zpid) or {}
+    coordinates = ref.get('coordinates') or record.get('coordinates') or parcel.get('coordinates') or [None, None]
+    address = ref.get('full') or (parcel.get('address') or {}).get('full') or record.get('address')
+    price = safe_float(record.get('salesPrice'))
+    square_feet = safe_float(get_living_area_from_parcel(parcel.get('areas')))
+    return {
+        'zpid': zpid,
+        'address': address.strip() if address else None,
+        'salesPrice': price,
+        'recordingDate': record.get('recordingDate'),
+        'documentType': record.get('documentType'),
+        'buyerName': record.get('buyerName'),
+        'sellerName': record.get('sellerName'),
+        'squareFeet': square_feet or None,
+        'pricePerSqFt': round(price / square_feet, 2) if square_feet else None,
+        'latitude': safe_float(coordinates[1], None),
+        'longitude': safe_float(coordinates[0], None),
+    }
+
+
+def _months_before(today, months):
+    """'YYYY-MM' of the first month in a trailing window of months ending with today's"""
+    index = today.year * 12 + today.month - 1 - (months - 1)
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+class CompsCell:
+    """Sales recorded in one geohash cell, with arrays and monthly sums precomputed for stats"""
+
+    def __init__(self, cell, transactions):
+        import numpy as np
+        self.cell = cell
+        self.transactions = transactions
+        self.fetched_at = time.time()
+        self.latitudes = np.array([t['latitude'] for t in transactions], dtype=float)
+        self.longitudes = np.array([t['longitude'] for t in transactions], dtype=float)
+        self.prices = np.array([t['salesPrice'] for t in transactions], dtype=float)
+        self.square_feet = np.array([t['squareFeet'] for t in transactions], dtype=float)
+        # Ordinal days of the recording dates; NaN sorts as oldest
+        self.days = np.array([
+            date.fromisoformat(t['recordingDate'][:10]).toordinal() if t['recordingDate'] else np.nan
+            for t in transactions
+        ], dtype=float)
+        # 'YYYY-MM' -> [sales, price sum, sales with square feet, square feet sum, their price sum]
+        self.months = {}
+        for t in transactions:
+            if not t['recordingDate']:
+                continue
+            sums = self.months.setdefault(t['recordingDate'][:7], [0, 0.0, 0, 0.0, 0.0])
+            sums[0] += 1
+            sums[1] += t['salesPrice']
+            if t['squareFeet']:
+                sums[2] += 1
+                sums[3] += t['squareFeet']
+                sums[4] += t['salesPrice']
+
+
+def _mean(values):
+    import numpy as np
+    values = values[~np.isnan(values)]
+    return round(float(values.mean()), 2) if values.size else 0
+
+
+def neighborhood_stats(cells, today=None):
+    """Trailing-window sales stats over cells, combined from their monthly sums"""
+    today = today or date.today()
+    stats = {}
+    for months in ROLLING_WINDOWS:
+        start = _months_before(today, months)
+        sales, price_sum, sized, square_feet, sized_price = 0, 0.0, 0, 0.0, 0.0
+        for cell in cells:
+            for month, sums in cell.months.items():
+                if month >= start:
+                    sales += sums[0]
+                    price_sum += sums[1]
+                    sized += sums[2]
+                    square_feet += sums[3]
+                    sized_price += sums[4]
+        stats[f"{months}m"] = {
+            'sales': sales,
+            'averagePrice': round(price_sum / sales, 2) if sales else 0,
+            'averageSquareFeet': round(square_feet / sized, 2) if sized else 0,
+            'pricePerSqFt': round(sized_price / square_feet, 2) if square_feet else 0
+        }
+    return stats
+
+
+class CompsEngine:
+    """Comparable sales around a point, cached per geohash cell
+
+    A cold cell is filled with one Bridge transactions query around its
+    center (plus a parcel lookup for square feet); only sales inside the
+    cell are kept, so neighboring cells never overlap. Concurrent requests
+    for the same cold cell share one fetch. Warm queries are answered from
+    the cells' precomputed arrays and monthly sums without upstream calls.
+    """
+
+    def __init__(self, client, precision=CELL_PRECISION, cache_size=5000, cache_ttl=86400, workers=4):
+        self.client = client
+        self.precision = precision
+        self.cells = CellCache(self._load_cell, 'comps-cells', maxsize=cache_size, ttl=cache_ttl, workers=workers)
+
+    def _load_cell(self, cell):
+        _south, north, _west, east = geohash_cells.bounds(cell)
+        latitude, longitude = geohash_cells.center(cell)
+        radius = float(haversine_miles(latitude, longitude, north, east))
+        since = (date.today() - timedelta(days=LOOKBACK_DAYS)).isoformat()
+        raw = self.client.get_transactions_near(longitude, latitude, radius, since, MAX_CELL_TRANSACTIONS)
+
+        zpids = {str(ref['zpid']) for record in raw for ref in (record.get('parcels') or [])[:1] if ref.get('zpid')}
+        parcels = self.client.get_parcels(zpids) if zpids else {}
+
+        transactions = []
+        for record in raw:
+            transaction = normalize_transaction(record, parcels)
+            if transaction['salesPrice'] <= 0 or transaction['latitude'] is None or transaction['longitude'] is None:
+                continue
+            if geohash_cells.encode(transaction['latitude'], transaction['longitude'], self.precision) == cell:
+                transactions.append(transaction)
+        logger.debug(f"Comps cell {cell}: {len(transactions)} sales of {len(raw)} transactions fetched")
+        return CompsCell(cell, transactions)
+
+    def get_cells(self, cells):
+        """(CompsCells, geohashes that failed to load) for geohash cells, fetching cold ones concurrently"""
+        found = self.cells.get_many(cells)
+        return [found[cell] for cell in cells if cell in found], [cell for cell in cells if cell not in found]
+
+    def query(self, latitude, longitude, radius_miles, limit=10):
+        """Most recent sales within radius_miles, their summary and the surrounding cells' rolling stats
+
+        Cells that could not be loaded are left out; the result then says
+        incomplete, with the number of failedCells out of totalCells.
+        """
+        import numpy as np
+        cell_keys = geohash_cells.cells_within(latitude, longitude, radius_miles, self.precision)
+        cells, failed = self.get_cells(cell_keys)
+        transactions = [t for cell in cells for t in cell.transactions]
+        if transactions:
+            distances = haversine_miles(latitude, longitude, np.concatenate([c.latitudes for c in cells]),
+                                        np.concatenate([c.longitudes for c in cells]))
+            inside = np.flatnonzero(distances <= radius_miles)
+            prices = np.concatenate([c.prices for c in cells])[inside]
+            square_feet = np.concatenate([c.square_feet for c in cells])[inside]
+            days = np.concatenate([c.days for c in cells])[inside]
+            # Newest first, nearest first on the same day
+            order = inside[np.lexsort((distances[inside], -np.nan_to_num(days, nan=-np.inf)))][:limit]
+        else:
+            inside = order = np.array([], dtype=int)
+            prices = square_feet = np.array([], dtype=float)
+
+        return {
+            'summary': {
+                'totalTransactions': int(inside.size),
+                'averagePrice': _mean(prices),
+                'averageSquareFeet': _mean(square_feet),
+                'averagePricePerSqFt': _mean(prices / square_feet)
+            },
+            'neighborhood': neighborhood_stats(cells),
+            'transactions': [{**transactions[i], 'distance': round(float(distances[i]), 2)} for i in order],
+            'incomplete': bool(failed),
+            'failedCells': len(failed),
+            'totalCells': len(cell_keys)
+        }
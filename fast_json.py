@@ -0,0 +1,61 @@
+import json
+import logging
+
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def dumps(obj, default=None, sort_keys=False, indent=False):
+    """Serialize to a JSON string with orjson when available, else stdlib json"""
+    if ORJSON_AVAILABLE:
+        options = _OPTIONS
+        if sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=default, option=options).decode()
+        except TypeError as e:
+            # e.g. integers beyond 64 bits - let stdlib json handle it
+            logger.debug(f"orjson could not serialize payload, using stdlib json: {e}")
+    return json.dumps(obj, default=default, sort_keys=sort_keys, indent=2 if indent else None)
+
+
+def loads(data):
+    """Parse JSON from str or bytes with orjson when available, else stdlib json"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, with stdlib fallback"""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(
+            obj,
+            default=kwargs.pop('default', self.default),
+            sort_keys=kwargs.pop('sort_keys', self.sort_keys),
+            indent=kwargs.pop('indent', None) is not None
+        )
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self._app.debug if self.compact is None else not self.compact
+        return self._app.response_class(
+            f"{dumps(obj, default=self.default, sort_keys=self.sort_keys, indent=indent)}\n",
+            mimetype=self.mimetype
+        )
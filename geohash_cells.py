@@ -0,0 +1,105 @@
+import math
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_DECODE = {char: i for i, char in enumerate(_BASE32)}
+
+MILES_PER_DEGREE_LAT = 69.0
+
+
+def encode(latitude, longitude, precision=6):
+    """Geohash of a point, precision characters long"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        bounds, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def is_valid(cell):
+    return bool(cell) and all(char in _DECODE for char in cell)
+
+
+def bounds(cell):
+    """(south, north, west, east) edges of a geohash cell"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in cell:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            target = lon_range if even else lat_range
+            middle = (target[0] + target[1]) / 2
+            if value >> shift & 1:
+                target[0] = middle
+            else:
+                target[1] = middle
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def center(cell):
+    south, north, west, east = bounds(cell)
+    return (south + north) / 2, (west + east) / 2
+
+
+def cell_size(precision):
+    """(height, width) in degrees of the cells at a precision"""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def cells_within(latitude, longitude, radius_miles, precision=6):
+    """Geohash cells covering the box around a circle of radius_miles"""
+    lat_delta = radius_miles / MILES_PER_DEGREE_LAT
+    lon_delta = radius_miles / (MILES_PER_DEGREE_LAT * max(math.cos(math.radians(latitude)), 0.01))
+    height, width = cell_size(precision)
+    south, north = max(latitude - lat_delta, -90.0), min(latitude + lat_delta, 90.0)
+    west, east = longitude - lon_delta, longitude + lon_delta
+
+    cells = {}
+    lat = south
+    while True:
+        lon = west
+        while True:
+            cells[encode(lat, ((lon + 180) % 360) - 180, precision)] = None
+            if lon >= east:
+                break
+            lon = min(lon + width, east)
+        if lat >= north:
+            break
+        lat = min(lat + height, north)
+    return list(cells)
+
+
+def neighbor(cell, dlat, dlon):
+    """The cell of the same precision dlat rows north and dlon columns east, or None past a pole"""
+    south, north, west, east = bounds(cell)
+    lat = (south + north) / 2 + dlat * (north - south)
+    if not -90 < lat < 90:
+        return None
+    lon = (west + east) / 2 + dlon * (east - west)
+    return encode(lat, ((lon + 180) % 360) - 180, len(cell))
+
+
+def neighbors(cell):
+    """The up to eight cells of the same precision around a cell"""
+    cells = [neighbor(cell, dlat, dlon) for dlat in (1, 0, -1) for dlon in (-1, 0, 1) if dlat or dlon]
+    return [c for c in cells if c]
@@ -0,0 +1,34 @@
+import os
+import shutil
+
+# Metrics from every worker are written to PROMETHEUS_MULTIPROC_DIR and merged
+# at /metrics. The directory is wiped when the master starts so counters from a
+# previous deploy don't leak in.
+_multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+
+def on_starting(server):
+    if _multiproc_dir:
+        shutil.rmtree(_multiproc_dir, ignore_errors=True)
+        os.makedirs(_multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if _multiproc_dir:
+        try:
+            from prometheus_client import multiprocess
+        except ImportError:
+            return
+        multiprocess.mark_process_dead(worker.pid)
+
+
+# Serving mode. The default sync workers handle one request each, so
+# concurrency equals the worker count. Routes mostly wait on the Bridge API,
+# so GUNICORN_WORKER_CLASS=gevent lets each worker hold GUNICORN_WORKER_CONNECTIONS
+# requests in flight; gunicorn monkey-patches the worker before the app is
+# imported, so don't combine it with preload_app. Raise BRIDGE_POOL_SIZE to
+# match, and set BRIDGE_MAX_CONCURRENCY to queue upstream calls instead of
+# tripping Bridge rate limits.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
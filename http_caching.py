@@ -0,0 +1,101 @@
+import gzip
+import hashlib
+import logging
+
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Responses smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 1024
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'application/javascript',
+    'text/javascript',
+}
+
+
+def etag_for_versions(zpids, version_of):
+    """Strong ETag for an ordered list of ZPIDs from their cached record versions
+
+    Returns None if any ZPID has never been cached.
+    """
+    parts = []
+    for zpid in zpids:
+        version = version_of(zpid)
+        if not version:
+            return None
+        parts.append(f"{zpid}:{version}")
+    return hashlib.sha1(",".join(parts).encode()).hexdigest()
+
+
+def etag_for_body(body):
+    """Strong ETag from the response body itself"""
+    return hashlib.sha1(body).hexdigest()
+
+
+def etag_matches(etag):
+    """True if the request's If-None-Match holds the ETag for any content encoding"""
+    if not etag:
+        return False
+    candidates = {etag, f"{etag}-gzip", f"{etag}-br"}
+    return any(tag in request.if_none_match for tag in candidates)
+
+
+def not_modified(response_class, etag):
+    response = response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+def init_compression(app, min_size=MIN_COMPRESS_SIZE):
+    """Compress eligible responses with Brotli or gzip based on Accept-Encoding"""
+    offered = ['br', 'gzip'] if BROTLI_AVAILABLE else ['gzip']
+
+    @app.after_request
+    def compress_response(response):
+        response.vary.add('Accept-Encoding')
+
+        if (response.direct_passthrough or response.is_streamed
+                or not 200 <= response.status_code < 300
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        encoding = request.accept_encodings.best_match(offered)
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        compressed = _compress(data, encoding)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+
+        # Strong ETags identify one representation, so tag the encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f"{etag}-{encoding}")
+
+        logger.debug(f"Compressed {request.path} with {encoding}: {len(data)} -> {len(compressed)} bytes")
+        return response
+
+    return compress_response
@@ -0,0 +1,286 @@
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from flask import g, request
+
+import fast_json
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the per-endpoint latency histogram buckets
+LATENCY_BUCKETS_MS = [25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+# Trace of the request being handled; copied into worker threads with run_in_context
+_current_trace = contextvars.ContextVar('bridge_trace', default=None)
+
+# Callables notified of every upstream call, cache lookup and rate-limit wait,
+# e.g. a metrics registry
+_listeners = {'call': [], 'cache': [], 'wait': []}
+
+
+class RequestTrace:
+    """Upstream calls and cache lookups made while serving one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.calls = []
+        self.cache = {}
+        self.waits = {}
+        self._lock = threading.Lock()
+
+    def add_call(self, call):
+        with self._lock:
+            self.calls.append(call)
+
+    def add_cache(self, name, hits, misses):
+        with self._lock:
+            entry = self.cache.setdefault(name, {'hits': 0, 'misses': 0})
+            entry['hits'] += hits
+            entry['misses'] += misses
+
+    def add_wait(self, name, seconds):
+        with self._lock:
+            self.waits[name] = round(self.waits.get(name, 0.0) + seconds * 1000, 1)
+
+    def summary(self):
+        """Per-endpoint totals plus the individual calls"""
+        endpoints = {}
+        for call in self.calls:
+            entry = endpoints.setdefault(call['endpoint'], {
+                'calls': 0, 'total_ms': 0.0, 'items': 0, 'retries': 0, 'bytes': 0, 'errors': 0
+            })
+            entry['calls'] += 1
+            entry['total_ms'] = round(entry['total_ms'] + call['latency_ms'], 1)
+            entry['items'] += call['batch_size']
+            entry['retries'] += call['retries']
+            entry['bytes'] += call['bytes']
+            entry['errors'] += 0 if call['status'] and call['status'] < 400 else 1
+        return {
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 1),
+            'endpoints': endpoints,
+            'cache': self.cache,
+            'waits_ms': self.waits,
+            'calls': self.calls
+        }
+
+
+class LatencyHistograms:
+    """Cumulative latency histograms per upstream endpoint"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = list(buckets)
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._sums = {}
+
+    def observe(self, endpoint, latency_ms):
+        index = bisect.bisect_left(self.buckets, latency_ms)
+        with self._lock:
+            counts = self._counts.setdefault(endpoint, [0] * (len(self.buckets) + 1))
+            counts[index] += 1
+            self._sums[endpoint] = self._sums.get(endpoint, 0.0) + latency_ms
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for endpoint, counts in self._counts.items():
+                total = sum(counts)
+                result[endpoint] = {
+                    'count': total,
+                    'avg_ms': round(self._sums[endpoint] / total, 1) if total else 0,
+                    'buckets': {
+                        **{f"le_{bound}": sum(counts[:i + 1]) for i, bound in enumerate(self.buckets)},
+                        'le_inf': total
+                    },
+                    'p50_ms': self._percentile(counts, 0.5),
+                    'p95_ms': self._percentile(counts, 0.95),
+                    'p99_ms': self._percentile(counts, 0.99)
+                }
+            return result
+
+    def _percentile(self, counts, q):
+        # Upper bound of the bucket holding the q-th observation
+        target = q * sum(counts)
+        running = 0
+        for i, count in enumerate(counts):
+            running += count
+            if running >= target and count:
+                return self.buckets[i] if i < len(self.buckets) else None
+        return None
+
+
+upstream_histograms = LatencyHistograms()
+
+
+def add_listener(kind, listener):
+    """Register listener(...) for 'call' (call dict), 'cache' (name, hits, misses)
+    or 'wait' (name, seconds) events"""
+    _listeners[kind].append(listener)
+
+
+def _notify(kind, *args):
+    for listener in _listeners[kind]:
+        try:
+            listener(*args)
+        except Exception as e:
+            logger.error(f"Instrumentation {kind} listener failed: {e}")
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def run_in_context(fn):
+    """Wrap fn so it runs with the caller's trace, for use with thread pools"""
+    context = contextvars.copy_context()
+    # A context can only be entered by one thread at a time, so each call gets a copy
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+
+def record_cache(name, hits=0, misses=0):
+    """Record cache hits/misses for the current request"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_cache(name, hits, misses)
+    _notify('cache', name, hits, misses)
+
+
+def record_wait(name, seconds):
+    """Record time spent waiting before an upstream call"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_wait(name, seconds)
+    _notify('wait', name, seconds)
+
+
+def rate_limit_sleep(seconds, name='rate-limit'):
+    """Sleep between upstream calls, recording the wait"""
+    time.sleep(seconds)
+    record_wait(name, seconds)
+
+
+def _endpoint_name(url):
+    # ".../api/v2/zestimates_v2/zestimates" -> "zestimates", ".../pub/parcels" -> "parcels"
+    path = urlparse(url).path.rstrip('/')
+    return path.rsplit('/', 1)[-1] or path
+
+
+def _batch_size(params):
+    if not params:
+        return 1
+    for key in ('zpid.in',):
+        if params.get(key):
+            return len(str(params[key]).split(','))
+    return 1
+
+
+class InstrumentedSession(requests.Session):
+    """requests.Session that times every call and reports it to the current trace
+
+    With max_concurrency, at most that many calls are in flight at once; the
+    rest wait for a slot and the wait is recorded as 'upstream-slot'.
+    """
+
+    def __init__(self, max_concurrency=None):
+        super().__init__()
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+
+    def request(self, method, url, *args, **kwargs):
+        if self._slots is None:
+            return self._timed_request(method, url, *args, **kwargs)
+        queued = time.perf_counter()
+        with self._slots:
+            waited = time.perf_counter() - queued
+            if waited >= 0.001:
+                record_wait('upstream-slot', waited)
+            return self._timed_request(method, url, *args, **kwargs)
+
+    def _timed_request(self, method, url, *args, **kwargs):
+        start = time.perf_counter()
+        status = None
+        retries = 0
+        throttled = 0
+        size = 0
+        try:
+            response = super().request(method, url, *args, **kwargs)
+            status = response.status_code
+            size = len(response.content)
+            retry_state = getattr(response.raw, 'retries', None)
+            history = retry_state.history if retry_state is not None else ()
+            retries = len(history)
+            # 429s absorbed by the retry policy plus a final one
+            throttled = sum(1 for attempt in history if attempt.status == 429) + int(status == 429)
+            return response
+        finally:
+            call = {
+                'endpoint': _endpoint_name(url),
+                'method': method.upper(),
+                'batch_size': _batch_size(kwargs.get('params')),
+                'latency_ms': round((time.perf_counter() - start) * 1000, 1),
+                'status': status,
+                'retries': retries,
+                'throttled': throttled,
+                'bytes': size
+            }
+            upstream_histograms.observe(call['endpoint'], call['latency_ms'])
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.add_call(call)
+            _notify('call', call)
+
+
+def _server_timing(summary):
+    parts = []
+    for endpoint, entry in summary['endpoints'].items():
+        parts.append(f'bridge-{endpoint};dur={entry["total_ms"]};desc="{entry["calls"]} calls, {entry["items"]} items"')
+    for name, entry in summary['cache'].items():
+        parts.append(f'cache-{name};desc="{entry["hits"]} hit, {entry["misses"]} miss"')
+    for name, waited in summary['waits_ms'].items():
+        parts.append(f"wait-{name};dur={waited}")
+    parts.append(f"total;dur={summary['total_ms']}")
+    return ", ".join(parts)
+
+
+def init_instrumentation(app):
+    """Trace each request's upstream calls; report them in a Server-Timing header
+    and, with ?debug_timing=1, in a "_timing" field of JSON object responses"""
+
+    @app.before_request
+    def start_trace():
+        g.bridge_trace_token = _current_trace.set(RequestTrace())
+
+    @app.after_request
+    def report_trace(response):
+        trace = _current_trace.get()
+        if trace is None:
+            return response
+
+        summary = trace.summary()
+        response.headers['Server-Timing'] = _server_timing(summary)
+
+        if request.args.get('debug_timing') and response.status_code == 200 \
+                and response.mimetype == 'application/json' and not response.direct_passthrough:
+            payload = fast_json.loads(response.get_data())
+            if isinstance(payload, dict):
+                payload['_timing'] = summary
+                response.set_data(fast_json.dumps(payload))
+                # The ETag was for the body without timings, which differ on every request
+                response.headers.pop('ETag', None)
+
+        if summary['calls']:
+            logger.info(
+                f"{request.method} {request.path}: {summary['total_ms']} ms, "
+                + ", ".join(f"{e} {v['calls']} calls/{v['total_ms']} ms" for e, v in summary['endpoints'].items())
+            )
+        return response
+
+    @app.teardown_request
+    def end_trace(exc):
+        token = g.pop('bridge_trace_token', None)
+        if token is not None:
+            _current_trace.reset(token)
@@ -0,0 +1,138 @@
+import logging
+import os
+import time
+
+from flask import g, jsonify, request
+
+from instrumentation import add_listener
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+                                   generate_latest, multiprocess)
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+# Set PROMETHEUS_MULTIPROC_DIR (an empty, writable directory) before the app is
+# imported to aggregate metrics across gunicorn workers; see gunicorn.conf.py
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+REQUEST_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+UPSTREAM_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+WAIT_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 30)
+
+if PROMETHEUS_AVAILABLE:
+    HTTP_REQUESTS = Counter(
+        'zestimate_http_requests_total', "Requests served, by route and status",
+        ['method', 'route', 'status'])
+    HTTP_LATENCY = Histogram(
+        'zestimate_http_request_duration_seconds', "Request latency by route",
+        ['method', 'route'], buckets=REQUEST_BUCKETS)
+    BRIDGE_REQUESTS = Counter(
+        'bridge_requests_total', "Bridge API calls, by endpoint and final status",
+        ['endpoint', 'status'])
+    BRIDGE_LATENCY = Histogram(
+        'bridge_request_duration_seconds', "Bridge API call latency including retries",
+        ['endpoint'], buckets=UPSTREAM_BUCKETS)
+    BRIDGE_ITEMS = Counter(
+        'bridge_requested_items_total', "ZPIDs requested from the Bridge API (zpid.in batch sizes)",
+        ['endpoint'])
+    BRIDGE_RETRIES = Counter(
+        'bridge_retries_total', "Bridge API retries made by the retry policy",
+        ['endpoint'])
+    BRIDGE_THROTTLED = Counter(
+        'bridge_throttled_total', "Bridge API 429 responses, including retried ones",
+        ['endpoint'])
+    BRIDGE_BYTES = Counter(
+        'bridge_response_bytes_total', "Bridge API response body bytes",
+        ['endpoint'])
+    # Every attempt, retries included, counts against the API key's quota
+    BRIDGE_QUOTA = Counter(
+        'bridge_quota_requests_total', "Bridge API requests charged to the API key",
+        ['endpoint'])
+    RATE_LIMIT_WAIT = Histogram(
+        'bridge_rate_limit_wait_seconds', "Time spent waiting before Bridge API calls (pacing sleeps, concurrency slots)",
+        ['name'], buckets=WAIT_BUCKETS)
+    CACHE_LOOKUPS = Counter(
+        'cache_lookups_total', "Cache lookups, by cache and result",
+        ['cache', 'result'])
+
+
+def _observe_call(call):
+    endpoint = call['endpoint']
+    BRIDGE_REQUESTS.labels(endpoint, str(call['status'] or 'error')).inc()
+    BRIDGE_LATENCY.labels(endpoint).observe(call['latency_ms'] / 1000)
+    BRIDGE_ITEMS.labels(endpoint).inc(call['batch_size'])
+    BRIDGE_QUOTA.labels(endpoint).inc(1 + call['retries'])
+    if call['retries']:
+        BRIDGE_RETRIES.labels(endpoint).inc(call['retries'])
+    if call['throttled']:
+        BRIDGE_THROTTLED.labels(endpoint).inc(call['throttled'])
+    if call['bytes']:
+        BRIDGE_BYTES.labels(endpoint).inc(call['bytes'])
+
+
+def _observe_cache(name, hits, misses):
+    if hits:
+        CACHE_LOOKUPS.labels(name, 'hit').inc(hits)
+    if misses:
+        CACHE_LOOKUPS.labels(name, 'miss').inc(misses)
+
+
+def _observe_wait(name, seconds):
+    RATE_LIMIT_WAIT.labels(name).observe(seconds)
+
+
+def render_metrics():
+    """Current metrics in Prometheus text format, merged across workers in multiprocess mode"""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def init_metrics(app, endpoint='/metrics'):
+    """Count and time every route and Bridge API call, and serve them at /metrics"""
+
+    @app.route(endpoint, methods=['GET'])
+    def prometheus_metrics():
+        if not PROMETHEUS_AVAILABLE:
+            return jsonify({"error": "Metrics require prometheus-client: pip install prometheus-client"}), 501
+        return app.response_class(render_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+    if not PROMETHEUS_AVAILABLE:
+        logger.warning("prometheus-client not installed, /metrics is disabled")
+        return
+
+    add_listener('call', _observe_call)
+    add_listener('cache', _observe_cache)
+    add_listener('wait', _observe_wait)
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    def observe_request(status):
+        started = g.pop('metrics_started', None)
+        # Label by route pattern, not path, to keep cardinality bounded
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        if started is not None and route != endpoint:
+            HTTP_REQUESTS.labels(request.method, route, str(status)).inc()
+            HTTP_LATENCY.labels(request.method, route).observe(time.perf_counter() - started)
+
+    @app.after_request
+    def record_request(response):
+        observe_request(response.status_code)
+        return response
+
+    @app.teardown_request
+    def record_failed_request(exc):
+        # after_request is skipped when an exception propagates (debug mode,
+        # PROPAGATE_EXCEPTIONS or a failing after_request hook); such requests
+        # end as 500s and are only recorded here
+        if exc is not None:
+            observe_request(500)
@@ -0,0 +1,204 @@
+import argparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ZPIDs fetched per step of an export, each written as one Parquet row group / Arrow record batch.
+# 500 is ten zpid.in batches, so the first bytes go out within seconds even with BRIDGE_BATCH_DELAY
+ROW_GROUP_SIZE = 500
+
+EXPORT_FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.file', 'arrow'),
+}
+
+# Column name -> Arrow type of the merged Zestimate + parcel property records
+EXPORT_COLUMNS = [
+    ('zpid', 'string'),
+    ('address', 'string'),
+    ('zestimate', 'float64'),
+    ('rentalZestimate', 'float64'),
+    ('capRate', 'float64'),
+    ('latitude', 'float64'),
+    ('longitude', 'float64'),
+    ('bedrooms', 'float64'),
+    ('bathrooms', 'float64'),
+    ('livingArea', 'float64'),
+    ('yearBuilt', 'int32'),
+    ('propertyType', 'category'),
+    ('stories', 'float64'),
+    ('lotSize', 'float64'),
+]
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        return pa
+    except ImportError as e:
+        raise RuntimeError("Portfolio export requires pyarrow: pip install pyarrow") from e
+
+
+def export_schema():
+    pa = _pyarrow()
+    fields = []
+    for name, type_name in EXPORT_COLUMNS:
+        # Property types repeat heavily, so they load as a pandas categorical
+        field_type = pa.dictionary(pa.int32(), pa.string()) if type_name == 'category' else pa.type_for_alias(type_name)
+        fields.append(pa.field(name, field_type))
+    return pa.schema(fields)
+
+
+def _coerce(value, type_name):
+    if value is None or value == '' or value == 'N/A':
+        return None
+    try:
+        if type_name == 'float64':
+            return float(value)
+        if type_name == 'int32':
+            return int(float(value))
+    except (TypeError, ValueError):
+        return None
+    return str(value)
+
+
+def records_to_table(records, schema=None, categories=None):
+    """Convert property records into an Arrow table with the export schema
+
+    categories (column name -> {value: index}) is extended in place and
+    keeps category codes stable across the tables of one export, so each
+    table's dictionary only adds to the previous one.
+    """
+    pa = _pyarrow()
+    schema = schema or export_schema()
+    categories = {} if categories is None else categories
+    columns = {}
+    for name, type_name in EXPORT_COLUMNS:
+        values = [_coerce(record.get(name), type_name) for record in records]
+        if type_name == 'category':
+            codes = categories.setdefault(name, {})
+            indices = [None if value is None else codes.setdefault(value, len(codes)) for value in values]
+            values = pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()), pa.array(list(codes), pa.string()))
+        columns[name] = values
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+class _ChunkSink:
+    """Write-only file object that hands out what has been written since the last drain"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_record_batches(zpids, fetch, batch_size=ROW_GROUP_SIZE):
+    """Yield fetch(chunk) for successive ZPID chunks, skipping chunks with no records"""
+    for start in range(0, len(zpids), batch_size):
+        records = fetch(zpids[start:start + batch_size])
+        if records:
+            yield records
+
+
+def iter_export_chunks(batches, fmt='parquet'):
+    """Yield the encoded export in pieces, encoding each batch of records as one row group / record batch
+
+    batches is consumed lazily, so only one batch is held in memory at a time.
+    """
+    pa = _pyarrow()
+    schema = export_schema()
+    sink = _ChunkSink()
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(sink, schema, compression='snappy')
+    elif fmt == 'arrow':
+        # Later batches only append property types to the dictionary, written as deltas
+        writer = pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    categories = {}
+    for records in batches:
+        table = records_to_table(records, schema, categories)
+        if fmt == 'parquet':
+            writer.write_table(table, row_group_size=len(records))
+        else:
+            for batch in table.to_batches():
+                writer.write_batch(batch)
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+
+    writer.close()
+    yield sink.drain()
+
+
+def write_export(batches, filename, fmt=None):
+    """Write batches of property records to a Parquet or Arrow file; returns the row count"""
+    fmt = fmt or ('arrow' if filename.endswith(('.arrow', '.feather')) else 'parquet')
+    count = 0
+
+    def counted():
+        nonlocal count
+        for records in batches:
+            count += len(records)
+            yield records
+
+    with open(filename, 'wb') as f:
+        for chunk in iter_export_chunks(counted(), fmt):
+            f.write(chunk)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export enriched portfolio properties to Parquet or Arrow")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--zpid-file', help="file with one ZPID per line")
+    source.add_argument('--portfolio', help="name of a saved portfolio")
+    parser.add_argument('-o', '--output', required=True, help="output file (.parquet, .arrow or .feather)")
+    parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), help="defaults from the output extension")
+    args = parser.parse_args()
+
+    # Imported here so the module stays importable by app.py itself
+    import app
+
+    if args.zpid_file:
+        with open(args.zpid_file, encoding='utf-8') as f:
+            zpids = [line.strip() for line in f if line.strip()]
+    else:
+        portfolio = app.find_saved_portfolio(args.portfolio)
+        if not portfolio:
+            parser.error(f"Portfolio not found: {args.portfolio}")
+        zpids = [str(z) for z in portfolio.get('zpids', [])]
+
+    batches = iter_record_batches(list(dict.fromkeys(zpids)), app.fetch_property_records)
+    count = write_export(batches, args.output, args.format)
+    print(f"Exported {count} properties to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
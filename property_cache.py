@@ -0,0 +1,227 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Fields summed into the materialized portfolio aggregates
+SUMMARY_FIELDS = ['zestimate', 'rentalZestimate', 'capRate', 'livingArea', 'bedrooms', 'bathrooms']
+
+
+def _to_float(value):
+    try:
+        return float(value) if value is not None else 0.0
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _contribution(record):
+    """Return the tuple of values a single property adds to a portfolio aggregate"""
+    if not record:
+        return None
+    return tuple(_to_float(record.get(field)) for field in SUMMARY_FIELDS)
+
+
+class PropertyCache:
+    """Thread-safe store of processed property records keyed by ZPID.
+
+    Every write bumps the record's version so callers can tell when it
+    actually changed, and notifies listeners with the old and new record.
+    Listeners run outside the record lock, so they may take their own locks
+    and read the cache; writes are serialized so they see changes in order.
+    Beyond maxsize records the least recently used are evicted, and
+    listeners are told with a new record of None.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self._lock = threading.RLock()
+        self._write_lock = threading.RLock()
+        # Least recently used first
+        self._records = OrderedDict()
+        self._versions = {}
+        self._updated_at = {}
+        self._listeners = []
+        # Versions come from one clock rather than a count per ZPID, so a record
+        # evicted and cached again never reuses the version (and ETag) of older
+        # content; seeding it from the time keeps them apart across restarts too
+        self._clock = time.time_ns()
+
+    def add_listener(self, listener):
+        """Register a callable(zpid, old_record, new_record) run on every change"""
+        self._listeners.append(listener)
+
+    def _touch(self, zpid):
+        record = self._records.get(zpid)
+        if record is not None:
+            self._records.move_to_end(zpid)
+        return record
+
+    def get(self, zpid):
+        with self._lock:
+            return self._touch(str(zpid))
+
+    def get_many(self, zpids):
+        with self._lock:
+            records = {}
+            for z in zpids:
+                record = self._touch(str(z))
+                if record is not None:
+                    records[str(z)] = record
+            return records
+
+    def version(self, zpid):
+        with self._lock:
+            return self._versions.get(str(zpid), 0)
+
+    def age(self, zpid):
+        """Seconds since the record was last written, or None if not cached"""
+        with self._lock:
+            updated_at = self._updated_at.get(str(zpid))
+        return time.time() - updated_at if updated_at is not None else None
+
+    @contextmanager
+    def paused(self):
+        """Hold off writes, so state built from a snapshot can't miss a change made meanwhile"""
+        with self._write_lock:
+            yield
+
+    def _notify(self, listeners, zpid, old, new):
+        for listener in listeners:
+            try:
+                listener(zpid, old, new)
+            except Exception as e:
+                logger.error(f"Property cache listener failed for ZPID {zpid}: {e}")
+
+    def put(self, record):
+        """Store a processed property record; returns True if it changed"""
+        zpid = str(record.get('zpid'))
+        with self._write_lock:
+            with self._lock:
+                old = self._touch(zpid)
+                self._updated_at[zpid] = time.time()
+                if old == record:
+                    return False
+                self._records[zpid] = dict(record)
+                self._clock += 1
+                self._versions[zpid] = self._clock
+                evicted = []
+                while self.maxsize and len(self._records) > self.maxsize:
+                    evicted_zpid, evicted_record = self._records.popitem(last=False)
+                    self._versions.pop(evicted_zpid, None)
+                    self._updated_at.pop(evicted_zpid, None)
+                    evicted.append((evicted_zpid, evicted_record))
+                listeners = list(self._listeners)
+            self._notify(listeners, zpid, old, record)
+            for evicted_zpid, evicted_record in evicted:
+                self._notify(listeners, evicted_zpid, evicted_record, None)
+        return True
+
+    def __len__(self):
+        return len(self._records)
+
+
+class PortfolioSummaryStore:
+    """Materialized per-portfolio aggregates kept in sync with a PropertyCache.
+
+    Each portfolio keeps running sums over its cached members. When a single
+    property changes only the delta is applied to the portfolios containing
+    it, so reading a summary never touches the member records.
+    """
+
+    def __init__(self, cache):
+        self._lock = threading.RLock()
+        self._cache = cache
+        self._members = {}
+        self._sums = {}
+        self._counts = {}
+        self._portfolios_by_zpid = {}
+        cache.add_listener(self._on_property_changed)
+
+    def register(self, name, zpids):
+        """Create or replace a portfolio and build its aggregate from cached records"""
+        members = {str(z) for z in zpids}
+        # The snapshot is read before taking the store lock (listeners take
+        # it while the cache notifies), with writes held off until the
+        # portfolio is in place so none of them is missed
+        with self._cache.paused():
+            records = self._cache.get_many(members)
+            with self._lock:
+                self.remove(name)
+                self._members[name] = members
+                self._sums[name] = [0.0] * len(SUMMARY_FIELDS)
+                self._counts[name] = 0
+                for zpid in members:
+                    self._portfolios_by_zpid.setdefault(zpid, set()).add(name)
+                    self._apply(name, _contribution(records.get(zpid)), 1)
+        logger.debug(f"Registered portfolio '{name}' with {len(members)} ZPIDs")
+
+    def remove(self, name):
+        with self._lock:
+            for zpid in self._members.pop(name, ()):
+                names = self._portfolios_by_zpid.get(zpid)
+                if names:
+                    names.discard(name)
+                    if not names:
+                        del self._portfolios_by_zpid[zpid]
+            self._sums.pop(name, None)
+            self._counts.pop(name, None)
+
+    def names(self):
+        with self._lock:
+            return list(self._members)
+
+    def members(self, name):
+        with self._lock:
+            return set(self._members.get(name, ()))
+
+    def summary(self, name):
+        """Return the summary dict for a portfolio, or None if it is unknown"""
+        with self._lock:
+            if name not in self._members:
+                return None
+            return build_summary(self._sums[name], self._counts[name])
+
+    def _apply(self, name, contribution, sign):
+        if contribution is None:
+            return
+        sums = self._sums[name]
+        for i, value in enumerate(contribution):
+            sums[i] += sign * value
+        self._counts[name] += sign
+
+    def _on_property_changed(self, zpid, old, new):
+        with self._lock:
+            old_contribution = _contribution(old)
+            new_contribution = _contribution(new)
+            for name in self._portfolios_by_zpid.get(zpid, ()):
+                self._apply(name, old_contribution, -1)
+                self._apply(name, new_contribution, 1)
+
+
+def build_summary(sums, count):
+    """Turn running sums over SUMMARY_FIELDS into the /api/properties summary shape"""
+    total_value, total_rental, cap_rate_sum, total_sqft, bedrooms, bathrooms = sums
+    return {
+        'total_value': total_value,
+        'total_rental': total_rental,
+        'avg_cap_rate': cap_rate_sum / count if count else 0,
+        'property_count': count,
+        'total_sqft': total_sqft,
+        'avg_price_per_sqft': total_value / total_sqft if total_sqft > 0 else 0,
+        'total_bedrooms': bedrooms,
+        'total_bathrooms': bathrooms
+    }
+
+
+def summarize_properties(properties):
+    """Compute a summary for a list of property records in a single pass"""
+    sums = [0.0] * len(SUMMARY_FIELDS)
+    count = 0
+    for record in properties:
+        for i, value in enumerate(_contribution(record)):
+            sums[i] += value
+        count += 1
+    return build_summary(sums, count)
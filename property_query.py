@@ -0,0 +1,293 @@
+import base64
+import heapq
+import json
+import logging
+import math
+import threading
+
+from sortedcontainers import SortedList
+
+logger = logging.getLogger(__name__)
+
+# Numeric fields kept in sorted indexes; each is a sort key and a range filter
+INDEXED_FIELDS = ['capRate', 'zestimate', 'rentalZestimate', 'pricePerSqft', 'livingArea',
+                  'bedrooms', 'bathrooms', 'yearBuilt']
+# Computed against an origin at query time rather than indexed
+DISTANCE = 'distance'
+SORT_KEYS = INDEXED_FIELDS + [DISTANCE]
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+# Restricted queries scan their members instead of walking an index this many times larger
+SCAN_RATIO = 8
+EARTH_RADIUS_MILES = 3958.8
+
+# Sorts after every ZPID string, for inclusive upper bounds in the indexes
+_MAX_ZPID = '\uffff'
+
+
+def _number(value):
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def numeric_fields(record):
+    """Numeric values of the indexed fields for a property record (None where unknown)"""
+    values = {field: _number(record.get(field)) for field in INDEXED_FIELDS}
+    zestimate = values['zestimate']
+    living_area = values['livingArea']
+    values['pricePerSqft'] = zestimate / living_area if zestimate and living_area and living_area > 0 else None
+    return values
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+def encode_cursor(sort, descending, value, zpid):
+    payload = json.dumps([sort, descending, value, zpid], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort, descending):
+    """(value, zpid) of the last row of the previous page; ValueError if invalid for this sort"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, cursor_descending, value, zpid = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if cursor_sort != sort or cursor_descending != descending:
+        raise ValueError("Cursor belongs to a different sort order")
+    # The value is compared against the index, so anything but a number (or null,
+    # for the tail of records without one) would fail there instead of here
+    if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+        raise ValueError("Invalid cursor: value must be a number or null")
+    if isinstance(zpid, bool) or not isinstance(zpid, (str, int)):
+        raise ValueError("Invalid cursor: zpid must be a string")
+    return value, str(zpid)
+
+
+class QueryPage:
+    __slots__ = ('properties', 'next_cursor')
+
+    def __init__(self, properties, next_cursor):
+        self.properties = properties
+        self.next_cursor = next_cursor
+
+
+class PropertyIndex:
+    """Sorted indexes over the numeric fields of a PropertyCache, kept in sync through its listener
+
+    Pages are read by walking the index of the sort field from the cursor and
+    stopping after limit matches, so sorting or paging a large set never
+    builds or sorts the full result. Records without a value for the sort
+    field come last in either order.
+    """
+
+    def __init__(self, cache):
+        self._lock = threading.RLock()
+        self._cache = cache
+        self._values = {}
+        self._types = {}
+        self._coordinates = {}
+        self._sorted = {field: SortedList() for field in INDEXED_FIELDS}
+        self._missing = {field: SortedList() for field in INDEXED_FIELDS}
+        cache.add_listener(self._on_property_changed)
+
+    def __len__(self):
+        return len(self._values)
+
+    def _remove(self, zpid):
+        values = self._values.pop(zpid, None)
+        if values is None:
+            return
+        for field, value in values.items():
+            if value is None:
+                self._missing[field].discard(zpid)
+            else:
+                self._sorted[field].discard((value, zpid))
+        self._types.pop(zpid, None)
+        self._coordinates.pop(zpid, None)
+
+    def _on_property_changed(self, zpid, old, new):
+        with self._lock:
+            self._remove(zpid)
+            if not new:
+                return
+            values = numeric_fields(new)
+            for field, value in values.items():
+                if value is None:
+                    self._missing[field].add(zpid)
+                else:
+                    self._sorted[field].add((value, zpid))
+            self._values[zpid] = values
+            self._types[zpid] = (new.get('propertyType') or '').strip().lower()
+            latitude, longitude = _number(new.get('latitude')), _number(new.get('longitude'))
+            if latitude is not None and longitude is not None:
+                self._coordinates[zpid] = (latitude, longitude)
+
+    def _matches(self, zpid, members, filters, property_type):
+        if members is not None and zpid not in members:
+            return False
+        if property_type and self._types.get(zpid) != property_type:
+            return False
+        values = self._values[zpid]
+        for field, (low, high) in filters.items():
+            value = values.get(field)
+            if value is None or (low is not None and value < low) or (high is not None and value > high):
+                return False
+        return True
+
+    def _walk(self, field, descending, low, high, after):
+        """ZPIDs in sort order after the cursor position: indexed values, then missing ones"""
+        in_missing = after is not None and after[0] is None
+        if not in_missing:
+            minimum = (low, '') if low is not None else None
+            maximum = (high, _MAX_ZPID) if high is not None else None
+            inclusive = (True, True)
+            if after is not None:
+                if descending:
+                    maximum, inclusive = tuple(after), (True, False)
+                else:
+                    minimum, inclusive = tuple(after), (False, True)
+            for _value, zpid in self._sorted[field].irange(minimum, maximum, inclusive, reverse=descending):
+                yield zpid
+        # A range filter on the sort field excludes records without a value
+        if low is None and high is None:
+            start = after[1] if in_missing else None
+            yield from self._missing[field].irange(start, None, (False, True))
+
+    def query(self, zpids=None, sort='capRate', descending=True, filters=None, property_type=None,
+              limit=DEFAULT_LIMIT, cursor=None, origin=None):
+        """One page of cached property records matching the filters, in sort order
+
+        zpids restricts the query to a set of properties (a portfolio or a
+        nearby result); filters maps fields to (low, high) inclusive bounds,
+        either of which may be None. Distance (miles from origin, a (lat, lng)
+        pair) can be used as sort key or filter and is added to the records.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort}")
+        filters = dict(filters or {})
+        members = {str(z) for z in zpids} if zpids is not None else None
+        property_type = (property_type or '').strip().lower() or None
+        after = decode_cursor(cursor, sort, descending) if cursor else None
+        if (sort == DISTANCE or DISTANCE in filters) and origin is None:
+            raise ValueError("Sorting or filtering by distance needs an origin")
+
+        with self._lock:
+            # Small member sets are cheaper to scan than to find in a long index walk
+            if sort == DISTANCE or DISTANCE in filters or (
+                    members is not None and len(members) * SCAN_RATIO < len(self._values)):
+                rows = self._scan(members, sort, descending, filters, property_type, limit, after, origin)
+            else:
+                low, high = filters.pop(sort, (None, None))
+                rows = []
+                for zpid in self._walk(sort, descending, low, high, after):
+                    if self._matches(zpid, members, filters, property_type):
+                        rows.append((self._values[zpid][sort], zpid))
+                        if len(rows) > limit:
+                            break
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, descending, *rows[-1]) if has_more else None
+
+        records = self._cache.get_many(zpid for _key, zpid in rows)
+        properties = []
+        for _key, zpid in rows:
+            record = records.get(zpid)
+            if record is None:
+                continue
+            if origin is not None and zpid in self._coordinates:
+                record = {**record, DISTANCE: round(haversine_miles(*origin, *self._coordinates[zpid]), 2)}
+            properties.append(record)
+        return QueryPage(properties, next_cursor)
+
+    def _scan(self, members, sort, descending, filters, property_type, limit, after, origin):
+        # Distances depend on the origin and can't be indexed, so candidates
+        # are scanned and only the page is kept, in a heap, rather than sorted
+        distance_bounds = filters.pop(DISTANCE, None)
+        low, high = distance_bounds or (None, None)
+        candidates = members if members is not None else self._values.keys()
+        rows = []
+        for zpid in candidates:
+            if zpid not in self._values or not self._matches(zpid, None, filters, property_type):
+                continue
+            distance = None
+            if origin is not None and zpid in self._coordinates:
+                distance = haversine_miles(*origin, *self._coordinates[zpid])
+            if distance_bounds and (distance is None or (low is not None and distance < low)
+                                    or (high is not None and distance > high)):
+                continue
+            rows.append((distance if sort == DISTANCE else self._values[zpid][sort], zpid))
+
+        present = [row for row in rows if row[0] is not None]
+        missing = sorted(zpid for key, zpid in rows if key is None)
+        if after is not None and after[0] is None:
+            present = []
+            missing = [zpid for zpid in missing if zpid > after[1]]
+        elif after is not None:
+            after = tuple(after)
+            present = [row for row in present if (row > after if not descending else row < after)]
+        pick = heapq.nlargest if descending else heapq.nsmallest
+        page = pick(limit + 1, present)
+        if len(page) <= limit:
+            page.extend((None, zpid) for zpid in missing[:limit + 1 - len(page)])
+        return page
+
+
+def _bound(args, name):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    number = _number(value)
+    if number is None:
+        raise ValueError(f"{name} must be a number")
+    return number
+
+
+def parse_query_args(args):
+    """PropertyIndex.query keyword arguments from request args
+
+    sort=<key>, order=asc|desc (default desc, asc for distance), limit,
+    cursor, property_type, and min_<key> / max_<key> range filters.
+    """
+    sort = args.get('sort') or 'capRate'
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of: {', '.join(SORT_KEYS)}")
+    order = (args.get('order') or ('asc' if sort == DISTANCE else 'desc')).lower()
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be asc or desc")
+    try:
+        limit = int(args.get('limit') or DEFAULT_LIMIT)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+
+    filters = {}
+    for field in SORT_KEYS:
+        low, high = _bound(args, f"min_{field}"), _bound(args, f"max_{field}")
+        if low is not None or high is not None:
+            filters[field] = (low, high)
+
+    return {
+        'sort': sort,
+        'descending': order == 'desc',
+        'filters': filters,
+        'property_type': args.get('property_type'),
+        'limit': max(1, min(limit, MAX_LIMIT)),
+        'cursor': args.get('cursor') or None,
+    }
+
+
+def has_query_args(args):
+    """True if the request asks for server-side sorting, filtering or paging"""
+    return any(
+        name in ('sort', 'order', 'limit', 'cursor', 'property_type') or name.startswith(('min_', 'max_'))
+        for name in args
+    )
@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from parcel_export import RateLimiter, iter_zip_parcels, make_session, open_row_writer
+from public_data_market_analysis import ANALYSIS_FIELDS
+
+# Columns of the combined output, one row per (zip, land use)
+OUTPUT_FIELDS = [
+    "zip", "land_use", "parcels", "valued_parcels", "total_value", "mean_value",
+    "min_value", "p25_value", "median_value", "p75_value", "p90_value", "max_value",
+]
+OUTPUT_TYPES = {
+    "zip": "string", "land_use": "string", "parcels": "int64", "valued_parcels": "int64",
+    **{name: "float64" for name in OUTPUT_FIELDS[4:]},
+}
+
+
+def _to_float(value):
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _quantile(sorted_values, q):
+    # Linear interpolation between closest ranks
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+# Market value distribution by landUseDescription for one zip (runs in a worker process)
+def summarize_zip(postal_code, land_uses, values):
+    groups = {}
+    for land_use, value in zip(land_uses, values):
+        groups.setdefault(land_use or "Unknown", []).append(value)
+
+    rows = []
+    for land_use, group in sorted(groups.items()):
+        valued = sorted(v for v in group if v is not None)
+        row = {"zip": postal_code, "land_use": land_use, "parcels": len(group), "valued_parcels": len(valued)}
+        if valued:
+            total = sum(valued)
+            row.update({
+                "total_value": total,
+                "mean_value": total / len(valued),
+                "min_value": valued[0],
+                "p25_value": _quantile(valued, 0.25),
+                "median_value": _quantile(valued, 0.5),
+                "p75_value": _quantile(valued, 0.75),
+                "p90_value": _quantile(valued, 0.9),
+                "max_value": valued[-1],
+            })
+        rows.append(row)
+    return rows
+
+
+# Pull the two columns the analysis needs for every parcel in a zip
+def fetch_zip_columns(postal_code, session, rate_limiter):
+    land_uses = []
+    values = []
+    for parcel in iter_zip_parcels(postal_code, fields=ANALYSIS_FIELDS, session=session, rate_limiter=rate_limiter):
+        land_uses.append(parcel.get("landUseDescription"))
+        values.append(_to_float(parcel.get("marketTotalValue")))
+    return land_uses, values
+
+
+def load_checkpoint(path):
+    """Return {zip: rows} for every zip already completed in a previous run"""
+    done = {}
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write leaves a partial last line
+                    continue
+                done[entry["zip"]] = entry["rows"]
+    return done
+
+
+def _append_checkpoint(f, postal_code, rows):
+    f.write(json.dumps({"zip": postal_code, "rows": rows}) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def write_output(results, postal_codes, filename):
+    writer = open_row_writer(filename, fieldnames=OUTPUT_FIELDS, column_types=OUTPUT_TYPES)
+    try:
+        for postal_code in postal_codes:
+            writer.write_batch(results.get(postal_code) or [])
+    finally:
+        writer.close()
+    return writer.rows_written
+
+
+def run_batch(postal_codes, output, checkpoint=None, fetch_threads=8, workers=None, rate=5.0):
+    """Analyze many zip codes: concurrent fetches under one global rate limit,
+    aggregation in a process pool, results checkpointed per zip and written
+    to one columnar file at the end."""
+    postal_codes = list(dict.fromkeys(postal_codes))
+    checkpoint = checkpoint or f"{output}.checkpoint.jsonl"
+    results = load_checkpoint(checkpoint)
+    pending = [z for z in postal_codes if z not in results]
+    print(f"{len(postal_codes)} zip codes, {len(postal_codes) - len(pending)} already done, {len(pending)} to fetch")
+
+    session = make_session()
+    rate_limiter = RateLimiter(rate)
+    failed = []
+
+    with open(checkpoint, "a", encoding="utf-8") as checkpoint_file, \
+            ThreadPoolExecutor(max_workers=fetch_threads) as fetchers, \
+            ProcessPoolExecutor(max_workers=workers) as aggregators:
+        fetches = {fetchers.submit(fetch_zip_columns, z, session, rate_limiter): z for z in pending}
+        summaries = {}
+        outstanding = set(fetches)
+
+        # Hand each zip to the process pool as soon as its parcels are in, and
+        # checkpoint each summary as soon as it is done
+        while outstanding:
+            done, outstanding = wait(outstanding, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetches:
+                    postal_code = fetches[future]
+                    try:
+                        land_uses, values = future.result()
+                    except Exception as e:
+                        print(f"Failed to retrieve parcels for {postal_code}: {e}")
+                        failed.append(postal_code)
+                        continue
+                    summary = aggregators.submit(summarize_zip, postal_code, land_uses, values)
+                    summaries[summary] = postal_code
+                    outstanding.add(summary)
+                else:
+                    postal_code = summaries[future]
+                    rows = future.result()
+                    results[postal_code] = rows
+                    _append_checkpoint(checkpoint_file, postal_code, rows)
+                    print(f"{postal_code}: {sum(r['parcels'] for r in rows)} parcels, {len(rows)} land uses")
+
+    rows_written = write_output(results, postal_codes, output)
+    print(f"Market analysis for {len(postal_codes) - len(failed)} zip codes saved to {output} ({rows_written} rows)")
+    if failed:
+        print(f"{len(failed)} zip codes failed and will be retried on the next run: {', '.join(failed)}")
+    return failed
+
+
+def read_zip_list(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Market value distribution by land use for many zip codes")
+    parser.add_argument("postal_codes", nargs="*")
+    parser.add_argument("--zip-file", help="file with one zip code per line")
+    parser.add_argument("-o", "--output", default="market_analysis.parquet",
+                        help="combined output (.parquet needs pyarrow, otherwise .csv)")
+    parser.add_argument("--checkpoint", help="progress file used to resume (default <output>.checkpoint.jsonl)")
+    parser.add_argument("--fetch-threads", type=int, default=8, help="zip codes fetched concurrently")
+    parser.add_argument("--workers", type=int, help="aggregation processes (default CPU count)")
+    parser.add_argument("--rate", type=float, default=5.0, help="global limit on API requests per second")
+    args = parser.parse_args()
+
+    postal_codes = list(args.postal_codes)
+    if args.zip_file:
+        postal_codes.extend(read_zip_list(args.zip_file))
+    if not postal_codes:
+        parser.error("no zip codes given")
+
+    failed = run_batch(postal_codes, args.output, checkpoint=args.checkpoint, fetch_threads=args.fetch_threads,
+                       workers=args.workers, rate=args.rate)
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import argparse
+import csv
+import re
+import string
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from parcel_export import iter_parcel_pages, iter_zip_parcels, make_session
+
+# Only the fields the analysis needs are requested from the parcels API
+OWNER_FIELDS = ["zpid", "ownerName", "landUseDescription"]
+
+# Owner name partitions used by the letters mode: a-z plus leading digits,
+# with one more partition for names starting with anything else
+OWNER_PARTITIONS = list(string.ascii_lowercase) + list(string.digits)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_PUNCTUATION_RE = re.compile(r"[.,]")
+
+
+# Normalize an owner name so "Acme Homes, LLC" and "ACME HOMES LLC" count together
+def normalize_owner(name):
+    name = _PUNCTUATION_RE.sub("", str(name))
+    return _WHITESPACE_RE.sub(" ", name).strip().upper()
+
+
+def _owner_names(parcel):
+    owners = parcel.get("ownerName") or []
+    if isinstance(owners, str):
+        owners = [owners]
+    return {normalize_owner(owner) for owner in owners if owner and str(owner).strip()}
+
+
+# Add one parcel's owners to the running counts
+def _count_parcel(counts, parcel, land_use):
+    if land_use and parcel.get("landUseDescription") != land_use:
+        return
+    for owner in _owner_names(parcel):
+        counts[owner] += 1
+
+
+# Stream every parcel in the zip once and aggregate owner -> parcel counts
+def count_owners_streaming(postal_code, land_use=None, session=None):
+    counts = Counter()
+    for parcel in iter_zip_parcels(postal_code, fields=OWNER_FIELDS, session=session):
+        _count_parcel(counts, parcel, land_use)
+    return counts
+
+
+def _partition_filters():
+    prefixes = [f"startswith(ownerName, '{prefix}')" for prefix in OWNER_PARTITIONS]
+    return prefixes + [f"not ({' or '.join(prefixes)})"]
+
+
+# A parcel with several owners comes back from the partition of each of them,
+# so parcels already counted by another partition (by zpid) are skipped
+def _count_partition(postal_code, owner_filter, land_use, session, seen, seen_lock):
+    counts = Counter()
+    params = {
+        "address.zip": postal_code,
+        "fields": ",".join(OWNER_FIELDS),
+        "$filter": owner_filter,
+    }
+    for page in iter_parcel_pages(params, session=session):
+        for parcel in page:
+            zpid = parcel.get("zpid")
+            if zpid:
+                with seen_lock:
+                    if zpid in seen:
+                        continue
+                    seen.add(zpid)
+            _count_parcel(counts, parcel, land_use)
+    return counts
+
+
+# Pull the owner name partitions of a zip concurrently and merge their counts
+def count_owners_partitioned(postal_code, land_use=None, session=None, workers=8):
+    session = session or make_session()
+    counts = Counter()
+    seen = set()
+    seen_lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_count_partition, postal_code, owner_filter, land_use, session, seen, seen_lock)
+            for owner_filter in _partition_filters()
+        ]
+        for future in futures:
+            counts.update(future.result())
+    return counts
+
+
+def count_owners(postal_code, land_use=None, mode="stream", session=None):
+    if mode == "letters":
+        return count_owners_partitioned(postal_code, land_use=land_use, session=session)
+    return count_owners_streaming(postal_code, land_use=land_use, session=session)
+
+
+# Rank owners by parcel count, keeping those holding at least min_parcels
+def rank_owners(counts, min_parcels=3, top=None):
+    ranked = [(owner, count) for owner, count in counts.most_common() if count >= min_parcels]
+    return ranked[:top] if top else ranked
+
+
+# Analyze many zip codes in parallel, returning {zip: [(owner, parcels), ...]}
+def analyze_zips(postal_codes, land_use=None, min_parcels=3, top=None, mode="stream", workers=4):
+    session = make_session()
+
+    def analyze(postal_code):
+        try:
+            counts = count_owners(postal_code, land_use=land_use, mode=mode, session=session)
+            return rank_owners(counts, min_parcels=min_parcels, top=top)
+        except Exception as e:
+            print(f"Failed to analyze owners in {postal_code}: {e}")
+            return []
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(postal_codes, executor.map(analyze, postal_codes)))
+
+
+def save_rankings_csv(rankings, filename):
+    with open(filename, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Zip", "Rank", "Owner", "Parcels"])
+        for postal_code, ranked in rankings.items():
+            for rank, (owner, count) in enumerate(ranked, 1):
+                writer.writerow([postal_code, rank, owner, count])
+    print(f"Owner rankings have been saved to {filename}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank owners by number of parcels held per zip code")
+    parser.add_argument("postal_codes", nargs="+")
+    parser.add_argument("--land-use", help='only count parcels with this landUseDescription, e.g. "Single Family Residential"')
+    parser.add_argument("--min-parcels", type=int, default=3)
+    parser.add_argument("--top", type=int, help="keep only the top N owners per zip")
+    parser.add_argument("--mode", choices=["stream", "letters"], default="stream",
+                        help="stream the zip once, or pull owner name partitions concurrently")
+    parser.add_argument("--workers", type=int, default=4, help="zip codes analyzed in parallel")
+    parser.add_argument("-o", "--output", help="write rankings to this CSV file")
+    args = parser.parse_args()
+
+    rankings = analyze_zips(args.postal_codes, land_use=args.land_use, min_parcels=args.min_parcels,
+                            top=args.top, mode=args.mode, workers=args.workers)
+
+    if args.output:
+        save_rankings_csv(rankings, args.output)
+    else:
+        for postal_code, ranked in rankings.items():
+            print(f"Owners with at least {args.min_parcels} parcels in {postal_code}:")
+            for owner, count in ranked:
+                print(f"  {count:5d}  {owner}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from dotenv import load_dotenv
+
+# The pooled session and rate limiter are shared with the apps in bridge/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bridge import RateLimiter, make_session  # noqa: E402
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Define the base URL of the API (BRIDGE_API_BASE can point at a local mock)
+base_url = os.getenv("BRIDGE_API_BASE", "https://api.bridgedataoutput.com/api/v2").rstrip("/") + "/pub/parcels"
+
+# Retrieve the API key from environment variables
+api_key = os.getenv("API_KEY")
+
+# Largest page size the parcels API accepts
+PAGE_SIZE = 200
+
+
+def _get_page(session, url, params=None, rate_limiter=None):
+    if rate_limiter:
+        rate_limiter.wait()
+    response = session.get(url, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+def _with_token(url):
+    if "access_token=" in url:
+        return url
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}access_token={api_key}"
+
+
+# Yield parcel pages, fetching the next page while the caller processes the current one
+def iter_parcel_pages(params, session=None, prefetch=True, rate_limiter=None):
+    session = session or make_session()
+    params = {"access_token": api_key, "limit": PAGE_SIZE, **params}
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        data = _get_page(session, base_url, params, rate_limiter)
+        while True:
+            next_page = data.get("nextPage")
+
+            # Start the next request before handing this page back
+            pending = None
+            if next_page and prefetch:
+                pending = executor.submit(_get_page, session, _with_token(next_page), None, rate_limiter)
+
+            yield data.get("bundle") or []
+
+            if not next_page:
+                break
+            if pending:
+                data = pending.result()
+            else:
+                data = _get_page(session, _with_token(next_page), None, rate_limiter)
+
+
+# Yield every parcel in a zip code one at a time
+def iter_zip_parcels(postal_code, fields=None, session=None, prefetch=True, extra_params=None,
+                     rate_limiter=None):
+    params = {"address.zip": postal_code, **(extra_params or {})}
+    if fields:
+        params["fields"] = ",".join(fields)
+    for page in iter_parcel_pages(params, session=session, prefetch=prefetch, rate_limiter=rate_limiter):
+        yield from page
+
+
+# Flatten one parcel into a single-level row: nested dicts become prefix_key
+# columns and lists are kept as JSON strings
+def flatten_parcel(parcel, prefix=""):
+    row = {}
+    for key, value in parcel.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            row.update(flatten_parcel(value, prefix=f"{name}_"))
+        elif isinstance(value, list):
+            row[name] = json.dumps(value) if value else None
+        else:
+            row[name] = value
+    return row
+
+
+# Flatten one parcel keeping every element of nested arrays: building, areas,
+# assessments etc. become prefix_<index>_key columns (e.g. building_1_bedrooms,
+# areas_0_areaSquareFeet) with a <name>_count column, and lists of plain values
+# are joined with "; "
+def flatten_parcel_full(parcel, prefix=""):
+    row = {}
+    for key, value in parcel.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            row.update(flatten_parcel_full(value, prefix=f"{name}_"))
+        elif isinstance(value, list):
+            if any(isinstance(item, dict) for item in value):
+                row[f"{name}_count"] = len(value)
+                for index, item in enumerate(value):
+                    if isinstance(item, dict):
+                        row.update(flatten_parcel_full(item, prefix=f"{name}_{index}_"))
+                    else:
+                        row[f"{name}_{index}"] = item
+            else:
+                row[name] = "; ".join(str(item) for item in value) if value else None
+        else:
+            row[name] = value
+    return row
+
+
+def _fetch_zpid_chunk(session, chunk, fields, rate_limiter):
+    params = {"access_token": api_key, "zpid.in": ",".join(chunk), "limit": len(chunk)}
+    if fields:
+        params["fields"] = ",".join(fields)
+    return _get_page(session, base_url, params, rate_limiter).get("bundle") or []
+
+
+# Fetch parcel records for many ZPIDs with zpid.in batches run concurrently on a
+# pooled session. Yields (zpid, parcel) as chunks complete; failed chunks are
+# reported and skipped, and their ZPIDs added to failed when a list is given
+def iter_parcels_by_zpid(zpids, chunk_size=50, workers=4, fields=None, session=None, rate_limiter=None,
+                         failed=None):
+    session = session or make_session()
+    zpids = list(dict.fromkeys(str(z) for z in zpids))
+    chunks = [zpids[i:i + chunk_size] for i in range(0, len(zpids), chunk_size)]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_fetch_zpid_chunk, session, chunk, fields, rate_limiter): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            try:
+                parcels = future.result()
+            except requests.exceptions.RequestException as e:
+                chunk = futures[future]
+                print(f"Failed to retrieve data for ZPIDs {chunk[0]}..{chunk[-1]}: {e}")
+                if failed is not None:
+                    failed.extend(chunk)
+                continue
+            for parcel in parcels:
+                yield str(parcel.get("zpid")), parcel
+
+
+# Fetch parcel records for many ZPIDs, returned in the order given
+def fetch_parcels_by_zpid(zpids, **kwargs):
+    parcels = dict(iter_parcels_by_zpid(zpids, **kwargs))
+    return [parcels[str(z)] for z in dict.fromkeys(zpids) if str(z) in parcels]
+
+
+class CsvRowWriter:
+    """Write rows to CSV as they arrive; columns are fixed by the first batch"""
+
+    def __init__(self, filename, fieldnames=None):
+        self.filename = filename
+        self.fieldnames = fieldnames
+        self.rows_written = 0
+        self._file = None
+        self._writer = None
+
+    def write_batch(self, rows):
+        if not rows:
+            return
+        if self._writer is None:
+            if self.fieldnames is None:
+                self.fieldnames = list(dict.fromkeys(key for row in rows for key in row))
+            self._file = open(self.filename, "w", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerows(rows)
+        self.rows_written += len(rows)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+
+class ParquetRowWriter:
+    """Write rows to Parquet, one row group per batch; requires pyarrow"""
+
+    def __init__(self, filename, fieldnames=None, column_types=None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet output requires pyarrow: pip install pyarrow") from e
+        self._pa = pa
+        self._pq = pq
+        self.filename = filename
+        self.fieldnames = fieldnames
+        self.column_types = column_types or {}
+        self.rows_written = 0
+        self._schema = None
+        self._writer = None
+
+    def _infer_schema(self, rows):
+        pa = self._pa
+        inferred = pa.Table.from_pylist(rows).schema
+        fields = []
+        for name in self.fieldnames:
+            if name in self.column_types:
+                fields.append(pa.field(name, pa.type_for_alias(self.column_types[name])))
+                continue
+            field_type = inferred.field(name).type if name in inferred.names else pa.string()
+            # Later pages may hold floats or strings where the first page had ints or nulls
+            if pa.types.is_integer(field_type):
+                field_type = pa.float64()
+            elif pa.types.is_null(field_type):
+                field_type = pa.string()
+            fields.append(pa.field(name, field_type))
+        return pa.schema(fields)
+
+    def _coerce(self, value, field_type):
+        if value is None:
+            return None
+        pa = self._pa
+        try:
+            if pa.types.is_floating(field_type):
+                return float(value)
+            if pa.types.is_integer(field_type):
+                return int(value)
+            if pa.types.is_string(field_type):
+                return value if isinstance(value, str) else json.dumps(value)
+        except (TypeError, ValueError) as e:
+            # Never write a null in place of a value the schema can't hold
+            raise ValueError(f"Value {value!r} does not fit Parquet column type {field_type}") from e
+        return value
+
+    def write_batch(self, rows):
+        if not rows:
+            return
+        if self._writer is None:
+            if self.fieldnames is None:
+                self.fieldnames = list(dict.fromkeys(key for row in rows for key in row))
+            self._schema = self._infer_schema(rows)
+            self._writer = self._pq.ParquetWriter(self.filename, self._schema)
+        columns = {
+            field.name: [self._coerce(row.get(field.name), field.type) for row in rows]
+            for field in self._schema
+        }
+        table = self._pa.Table.from_pydict(columns, schema=self._schema)
+        self._writer.write_table(table)
+        self.rows_written += len(rows)
+
+    def close(self):
+        if self._writer:
+            self._writer.close()
+
+
+# Pick the writer from output_format or the file extension; column_types maps
+# column names to Arrow type aliases ("float64", "int64", "string") for Parquet
+def open_row_writer(filename, fieldnames=None, output_format=None, column_types=None):
+    output_format = output_format or ("parquet" if filename.endswith(".parquet") else "csv")
+    if output_format == "parquet":
+        return ParquetRowWriter(filename, fieldnames, column_types)
+    return CsvRowWriter(filename, fieldnames)
+
+
+def _value_kind(value):
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float)):
+        return "float64"
+    return "string"
+
+
+# Arrow type alias for a column from the kinds of value seen in it: a column
+# holding only numbers (or only booleans) keeps that type, anything mixed or
+# empty is written as strings so no value is lost
+def _column_type(kinds):
+    return kinds.pop() if len(kinds) == 1 else "string"
+
+
+# Write flattened rows to CSV or Parquet. Flattened parcels don't all have the
+# same keys, so rows are spooled to a temporary file first and the header
+# covers every column seen in any row, with Parquet types taken from every
+# value rather than the first batch; memory stays constant
+def write_spooled_rows(rows, filename, output_format=None):
+    columns = {}
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        for row in rows:
+            for name, value in row.items():
+                kinds = columns.setdefault(name, set())
+                if value is not None:
+                    kinds.add(_value_kind(value))
+            spool.write(json.dumps(row) + "\n")
+
+        spool.seek(0)
+        column_types = {name: _column_type(kinds) for name, kinds in columns.items()}
+        writer = open_row_writer(filename, fieldnames=list(columns), output_format=output_format,
+                                 column_types=column_types)
+        batch = []
+        try:
+            for line in spool:
+                batch.append(json.loads(line))
+                if len(batch) >= PAGE_SIZE:
+                    writer.write_batch(batch)
+                    batch = []
+            writer.write_batch(batch)
+        finally:
+            writer.close()
+    return writer.rows_written
+
+
+# Stream every parcel in a zip code to a CSV or Parquet file with constant memory
+def export_zip_parcels(postal_code, filename, fields=None, output_format=None,
+                       transform=flatten_parcel, session=None):
+    parcels = iter_zip_parcels(postal_code, fields=fields, session=session)
+    rows_written = write_spooled_rows((transform(parcel) for parcel in parcels), filename, output_format)
+    print(f"Exported {rows_written} parcels in {postal_code} to {filename}")
+    return rows_written
+
+
+# Export parcel records for many ZPIDs to CSV or Parquet; returns the ZPIDs
+# whose zpid.in requests failed
+def export_zpid_parcels(zpids, filename, output_format=None, transform=flatten_parcel_full, **fetch_kwargs):
+    failed = []
+    parcels = iter_parcels_by_zpid(zpids, failed=failed, **fetch_kwargs)
+    rows_written = write_spooled_rows((transform(parcel) for _, parcel in parcels), filename, output_format)
+    print(f"Exported {rows_written} parcel records to {filename}")
+    if failed:
+        print(f"{len(failed)} ZPIDs could not be fetched: {', '.join(failed)}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export parcels for a zip code or a list of ZPIDs to CSV or Parquet")
+    parser.add_argument("postal_code", nargs="?")
+    parser.add_argument("--zpid-file", help="export these ZPIDs (one per line) instead of a zip code")
+    parser.add_argument("-o", "--output", help="output file (default parcels_<zip>.csv)")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="defaults from the output extension")
+    parser.add_argument("--fields", help="comma separated list of parcel fields to request")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent zpid.in requests")
+    args = parser.parse_args()
+
+    fields = args.fields.split(",") if args.fields else None
+
+    if args.zpid_file:
+        with open(args.zpid_file, encoding="utf-8") as f:
+            zpids = [line.strip() for line in f if line.strip()]
+        filename = args.output or f"parcels_zpids.{args.format or 'csv'}"
+        failed = export_zpid_parcels(zpids, filename, output_format=args.format, fields=fields,
+                                     workers=args.workers)
+        raise SystemExit(1 if failed else 0)
+    elif args.postal_code:
+        filename = args.output or f"parcels_{args.postal_code}.{args.format or 'csv'}"
+        export_zip_parcels(args.postal_code, filename, fields=fields, output_format=args.format)
+    else:
+        parser.error("give a zip code or --zpid-file")
+
+
+if __name__ == "__main__":
+    main()
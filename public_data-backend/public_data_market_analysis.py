@@ -1,80 +1,53 @@
-import requests
-import os
-from dotenv import load_dotenv
-import csv
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Define the base URL of the API
-base_url = "https://api.bridgedataoutput.com/api/v2/pub/parcels"
-
-# Retrieve the API key from environment variables
-api_key = os.getenv("API_KEY")
+from parcel_export import iter_zip_parcels, CsvRowWriter, PAGE_SIZE
 
 # Define the postal code for White Salmon area
 postal_code = "98672"
 
-# Define function to retrieve parcels in the specified postal code
+# Fields needed for the analysis, so each page stays small
+ANALYSIS_FIELDS = ["address", "landUseDescription", "marketTotalValue"]
+
+# Define function to retrieve parcels in the specified postal code, following
+# every nextPage link (the next page is prefetched while this one is processed)
 def get_parcels_in_area(postal_code):
-    url = f"{base_url}?access_token={api_key}&address.zip={postal_code}"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        parcels = response.json()
-        return parcels
-    except requests.exceptions.RequestException as e:
-        print(f"Failed to retrieve parcels: {e}")
-        return None
+    return iter_zip_parcels(postal_code, fields=ANALYSIS_FIELDS)
 
 # Function to perform market analysis based on assessments
 def perform_market_analysis(parcels):
-    if parcels and 'bundle' in parcels:
-        # Extract actual parcel data
-        actual_parcels = parcels['bundle']
-        
-        # Define a list to store market analysis data
-        market_analysis_data = []
-
-        # Iterate over each parcel
-        for parcel in actual_parcels:
-            # Extract relevant fields for analysis
-            address = parcel.get('address', {})
-            land_use_description = parcel.get('landUseDescription', '')
-            market_value = parcel.get('marketTotalValue', '')
-
-            # Append extracted data to market analysis list
-            market_analysis_data.append({
-                'Address': address.get('full', ''),
-                'Land Use Description': land_use_description,
-                'Market Value': market_value
-            })
-
-        return market_analysis_data
-    else:
-        print("No parcel data found in the response.")
-        return None
-
-# Function to save market analysis data to a CSV file
-def save_to_csv(data, filename):
-    if data:
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = data[0].keys()
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for row in data:
-                writer.writerow(row)
-        print(f"Market analysis data has been saved to {filename}")
+    for parcel in parcels:
+        # Extract relevant fields for analysis
+        address = parcel.get('address') or {}
+        land_use_description = parcel.get('landUseDescription', '')
+        market_value = parcel.get('marketTotalValue', '')
+
+        yield {
+            'Address': address.get('full', ''),
+            'Land Use Description': land_use_description,
+            'Market Value': market_value
+        }
+
+# Function to save market analysis rows to a CSV file as they are produced
+def save_to_csv(rows, filename):
+    writer = CsvRowWriter(filename, fieldnames=['Address', 'Land Use Description', 'Market Value'])
+    batch = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= PAGE_SIZE:
+                writer.write_batch(batch)
+                batch = []
+        writer.write_batch(batch)
+    finally:
+        writer.close()
+
+    if writer.rows_written:
+        print(f"Market analysis data has been saved to {filename} ({writer.rows_written} parcels)")
     else:
         print("No data to save.")
 
-# Retrieve parcels in the specified postal code
-parcels = get_parcels_in_area(postal_code)
-
-# Perform market analysis based on parcels
-market_analysis_data = perform_market_analysis(parcels)
-
-# Save market analysis data to a CSV file
-if market_analysis_data:
-    save_to_csv(market_analysis_data, 'market_analysis_white_salmon.csv')
-
+# Stream parcels in the specified postal code through the analysis into a CSV file.
+# For many zip codes at once use market_analysis_batch.py
+if __name__ == '__main__':
+    try:
+        save_to_csv(perform_market_analysis(get_parcels_in_area(postal_code)), 'market_analysis_white_salmon.csv')
+    except Exception as e:
+        print(f"Failed to retrieve parcels: {e}")
@@ -0,0 +1,251 @@
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from flask import abort, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+# Off unless PROFILE_REQUESTS is set; see init_profiler
+PROFILE_REQUESTS = os.getenv("PROFILE_REQUESTS", "").lower() in ("1", "true", "yes")
+# Keep profiles of requests that run longer than this (ms); 0 disables the threshold trigger
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", 5000))
+# Fraction of requests sampled from their start in case they turn out slow
+PROFILE_WATCH_RATE = float(os.getenv("PROFILE_WATCH_RATE", 1))
+# Fraction of all requests profiled from their start whatever their duration, e.g. 0.01
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+# Stack sampling interval (ms)
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 10))
+# Required in the X-Admin-Token header to read profiles
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN")
+
+MAX_PROFILES_PER_ROUTE = 20
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame):
+    """Root-to-leaf frame labels joined by ';' (the folded format of flamegraph.pl and speedscope)"""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def _current_greenlet():
+    # Under gevent every request is a greenlet on one OS thread, invisible to
+    # sys._current_frames; the suspended greenlet's own frame is sampled instead
+    if 'gevent' in sys.modules:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            import greenlet
+            return greenlet.getcurrent()
+    return None
+
+
+def format_collapsed(samples):
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+class _ActiveRequest:
+    __slots__ = ('route', 'method', 'path', 'started', 'sampled', 'samples', 'greenlet')
+
+    def __init__(self, route, method, path, sampled, greenlet=None):
+        self.route = route
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.sampled = sampled
+        self.samples = Counter()
+        self.greenlet = greenlet
+
+
+class SamplingProfiler:
+    """Samples the stacks of in-flight requests from a background thread
+
+    Requests are sampled from their start, so a slow profile covers all of
+    the request. Those picked by sample_rate are always kept; the watch_rate
+    fraction of the rest are sampled too, but kept only if they took longer
+    than slow_ms. Unwatched requests aren't registered at all, and the
+    sampler thread blocks while no watched request is in flight.
+    """
+
+    def __init__(self, slow_ms=PROFILE_SLOW_MS, sample_rate=PROFILE_SAMPLE_RATE, interval_ms=PROFILE_INTERVAL_MS,
+                 max_profiles=MAX_PROFILES_PER_ROUTE, watch_rate=PROFILE_WATCH_RATE):
+        self.slow_s = slow_ms / 1000 if slow_ms else None
+        self.sample_rate = sample_rate
+        self.watch_rate = watch_rate if self.slow_s is not None else 0
+        self.interval_s = interval_ms / 1000
+        self.max_profiles = max_profiles
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._profiles = {}
+        self._route_samples = {}
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+            self._thread.start()
+        return self
+
+    def begin(self, route, method, path):
+        sampled = bool(self.sample_rate) and random.random() < self.sample_rate
+        if not sampled and not (self.watch_rate and random.random() < self.watch_rate):
+            return
+        with self._lock:
+            self._active[threading.get_ident()] = _ActiveRequest(route, method, path, sampled, _current_greenlet())
+        self._wakeup.set()
+
+    def end(self):
+        with self._lock:
+            active = self._active.pop(threading.get_ident(), None)
+        if active is None or not active.samples:
+            return None
+        duration_s = time.perf_counter() - active.started
+        if not active.sampled and duration_s < self.slow_s:
+            return None
+        duration_ms = round(duration_s * 1000, 1)
+        profile = {
+            'route': active.route,
+            'method': active.method,
+            'path': active.path,
+            'duration_ms': duration_ms,
+            'trigger': 'sample' if active.sampled else 'slow',
+            'finished': time.time(),
+            'interval_ms': self.interval_s * 1000,
+            'samples': active.samples
+        }
+        with self._lock:
+            self._profiles.setdefault(active.route, deque(maxlen=self.max_profiles)).append(profile)
+            self._route_samples.setdefault(active.route, Counter()).update(active.samples)
+        logger.info(f"Profiled {active.method} {active.path} ({profile['trigger']}): {duration_ms} ms, "
+                    f"{sum(active.samples.values())} samples")
+        return profile
+
+    def _run(self):
+        while True:
+            with self._lock:
+                idle = not self._active
+            if idle:
+                self._wakeup.clear()
+                # Re-check under the cleared event so a request that began meanwhile isn't missed
+                with self._lock:
+                    idle = not self._active
+                if idle:
+                    self._wakeup.wait()
+                    continue
+            time.sleep(self.interval_s)
+            self._sample()
+
+    def _sample(self):
+        with self._lock:
+            due = list(self._active.items())
+        if not due:
+            return
+        frames = sys._current_frames()
+        stacks = []
+        for ident, active in due:
+            frame = active.greenlet.gr_frame if active.greenlet is not None else frames.get(ident)
+            if frame is not None:
+                stacks.append((ident, active, collapse_stack(frame)))
+        # Counted under the lock and only while the request is still in flight,
+        # so end() never reads samples that are being updated
+        with self._lock:
+            for ident, active, stack in stacks:
+                if self._active.get(ident) is active:
+                    active.samples[stack] += 1
+
+    def routes(self):
+        with self._lock:
+            return {
+                route: [
+                    {key: value for key, value in profile.items() if key != 'samples'}
+                    for profile in profiles
+                ]
+                for route, profiles in self._profiles.items()
+            }
+
+    def collapsed(self, route, index=None):
+        """Folded stacks for a route, merged over its stored profiles or for one of them"""
+        with self._lock:
+            if index is None:
+                samples = self._route_samples.get(route)
+            else:
+                profiles = self._profiles.get(route) or []
+                samples = profiles[index]['samples'] if -len(profiles) <= index < len(profiles) else None
+            return format_collapsed(samples) if samples else None
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+            self._route_samples.clear()
+
+
+def _require_admin():
+    if not PROFILE_ADMIN_TOKEN:
+        abort(403, description="Set PROFILE_ADMIN_TOKEN to read profiles")
+    if request.headers.get('X-Admin-Token') != PROFILE_ADMIN_TOKEN:
+        abort(403)
+
+
+def init_profiler(app, profiler=None):
+    """Attach the sampling profiler to app if PROFILE_REQUESTS is set (or a profiler is given)
+
+    Profiles are listed at /admin/profiles and served as folded stacks at
+    /admin/profiles/stacks?route=/api/properties[&index=-1], ready for
+    flamegraph.pl or speedscope.
+    """
+    if profiler is None:
+        if not PROFILE_REQUESTS:
+            return None
+        profiler = SamplingProfiler()
+    profiler.start()
+
+    @app.before_request
+    def begin_profile():
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        if not route.startswith('/admin/profiles'):
+            profiler.begin(route, request.method, request.path)
+
+    @app.teardown_request
+    def end_profile(exc):
+        profiler.end()
+
+    @app.route('/admin/profiles', methods=['GET', 'DELETE'])
+    def list_profiles():
+        _require_admin()
+        if request.method == 'DELETE':
+            profiler.clear()
+            return jsonify({"message": "Profiles cleared"}), 200
+        return jsonify({
+            "slow_ms": profiler.slow_s * 1000 if profiler.slow_s else None,
+            "sample_rate": profiler.sample_rate,
+            "watch_rate": profiler.watch_rate,
+            "interval_ms": profiler.interval_s * 1000,
+            "routes": profiler.routes()
+        }), 200
+
+    @app.route('/admin/profiles/stacks', methods=['GET'])
+    def profile_stacks():
+        _require_admin()
+        route = request.args.get('route', '')
+        index = request.args.get('index', type=int)
+        collapsed = profiler.collapsed(route, index)
+        if collapsed is None:
+            return jsonify({"error": f"No profiles for route: {route}"}), 404
+        return app.response_class(collapsed, mimetype='text/plain')
+
+    logger.info(f"Request profiler enabled (slow_ms={PROFILE_SLOW_MS}, watch_rate={profiler.watch_rate}, "
+                f"sample_rate={PROFILE_SAMPLE_RATE})")
+    return profiler
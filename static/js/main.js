@@ -301,6 +301,16 @@ document.addEventListener('DOMContentLoaded', function() {
                     const inputValue = portfolio.input || portfolio.zpids.join(',');
                     document.getElementById('propertyInput').value = inputValue;
                     currentPortfolio = portfolio;
+
+                    // Show the precomputed summary right away while properties refresh
+                    const summaryResponse = await fetch(`/api/portfolio-summary/${encodeURIComponent(portfolio.name)}`);
+                    if (summaryResponse.ok) {
+                        const summaryData = await summaryResponse.json();
+                        if (summaryData.summary.property_count > 0) {
+                            updateSummary(summaryData.summary);
+                        }
+                    }
+
                     await analyzePortfolio();
                 }
             } catch (error) {
@@ -309,6 +319,45 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     };
 
+    // Fetch property data, revalidating a previously loaded result with its ETag
+    // so an unchanged portfolio comes back as an empty 304
+    const fetchProperties = async (zpids) => {
+        const cacheKey = `properties:${zpids.join(',')}`;
+        let cached = null;
+        try {
+            cached = JSON.parse(sessionStorage.getItem(cacheKey));
+        } catch (e) {
+            cached = null;
+        }
+
+        const headers = { 'Content-Type': 'application/json' };
+        if (cached && cached.etag) {
+            headers['If-None-Match'] = cached.etag;
+        }
+
+        const response = await fetch('/api/properties', {
+            method: 'POST',
+            headers,
+            body: JSON.stringify({ zpids })
+        });
+
+        if (response.status === 304 && cached) {
+            return cached.data;
+        }
+        if (!response.ok) throw new Error('Failed to fetch property data');
+
+        const data = await response.json();
+        const etag = response.headers.get('ETag');
+        if (etag) {
+            try {
+                sessionStorage.setItem(cacheKey, JSON.stringify({ etag, data }));
+            } catch (e) {
+                // Storage full - skip caching this result
+            }
+        }
+        return data;
+    };
+
     // Function to validate input
     const validateInput = async () => {
         const propertyInput = document.getElementById('propertyInput').value;
@@ -410,17 +459,7 @@ document.addEventListener('DOMContentLoaded', function() {
             }
             
             // Now get property data using the ZPIDs
-            const response = await fetch('/api/properties', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({ zpids: allZpids })
-            });
-
-            if (!response.ok) throw new Error('Failed to fetch property data');
-
-            const data = await response.json();
+            const data = await fetchProperties(allZpids);
             currentPortfolio = {
                 name: document.getElementById('portfolioName').value,
                 input: propertyInput,
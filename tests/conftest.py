@@ -0,0 +1,7 @@
+import os
+
+# Tests importing app must never reach the real Google Sheet or Bridge,
+# whatever a local .env holds; load_dotenv doesn't override these
+os.environ["GOOGLE_SERVICE_ACCOUNT_KEY"] = ""
+os.environ["API_KEY"] = "test"
+os.environ["BRIDGE_API_BASE"] = "http://127.0.0.1:9"
@@ -0,0 +1,55 @@
+import pytest
+
+from address_matcher import MATCH_THRESHOLD, AddressIndex
+
+
+def parcel(zpid, house, street, city='Seattle', zip_code='98101'):
+    return {'zpid': zpid, 'address': {'full': f"{house} {street}, {city}, WA {zip_code}", 'house': house,
+                                      'street': street, 'city': city, 'zip': zip_code}}
+
+
+@pytest.fixture
+def index():
+    return AddressIndex([
+        parcel(1, '123', 'Main St'),
+        parcel(2, '125', 'Main St'),
+        parcel(3, '123', 'Maine Ave'),
+        parcel(4, '123', 'N Main St'),
+        parcel(5, '123', 'Oak St'),
+    ])
+
+
+def zpids(matches):
+    return [match['zpid'] for match in matches]
+
+
+def test_exact_address_scores_one(index):
+    matches = index.match('123 Main Street, Seattle, WA 98101', min_score=MATCH_THRESHOLD)
+    assert matches[0]['zpid'] == '1'
+    assert matches[0]['score'] == 1.0
+
+
+def test_other_house_number_never_matches(index):
+    assert '2' not in zpids(index.match('123 Main St, Seattle, WA 98101', min_score=0.01))
+    assert index.match('127 Main St, Seattle, WA 98101', min_score=0.01) == []
+
+
+def test_dissimilar_street_is_rejected(index):
+    matches = index.match('123 Main St, Seattle, WA 98101', min_score=0.01)
+    assert not {'3', '5'} & set(zpids(matches))
+
+
+def test_directional_prefix_still_matches(index):
+    # "N Main St" contains "Main St", so it passes the street floor
+    assert '4' in zpids(index.match('123 Main St, Seattle, WA 98101', min_score=MATCH_THRESHOLD))
+
+
+def test_city_and_zip_decide_near_misses(index):
+    # Same house and street elsewhere only clears the threshold on an exact street
+    matches = index.match('123 Main St, Portland, OR 97201', min_score=MATCH_THRESHOLD)
+    assert zpids(matches) == ['1']
+    assert matches[0]['score'] < 1.0
+
+
+def test_address_without_house_number_matches_nothing(index):
+    assert index.match('Main St, Seattle, WA 98101', min_score=0.01) == []
@@ -0,0 +1,24 @@
+import pytest
+
+from address_utils import normalize_address, parse_address_components
+
+
+@pytest.mark.parametrize('address, expected', [
+    ('123 main street #3, seattle, wa 98101', '123 Main St #3, Seattle, WA 98101'),
+    ('123 Main St # 3, Seattle, WA', '123 Main St # 3, Seattle, WA'),
+    ('500 5th avenue apt 4b, new york, ny', '500 5th Ave Apt 4B, New York, NY'),
+    ('1 lake shore parkway, north miami, fl, 33161', '1 Lake Shore Pkwy, North Miami, FL, 33161'),
+    ('1 A St, seattle wa 98101-1234', '1 A St, Seattle WA 98101-1234'),
+])
+def test_normalize_address(address, expected):
+    assert normalize_address(address) == expected
+
+
+def test_two_letter_city_is_not_a_state():
+    assert normalize_address('9 Elm St, ee, wa') == '9 Elm St, Ee, WA'
+
+
+def test_components_of_a_unit_address():
+    components = parse_address_components('123 Main St #3, Seattle, WA 98101')
+    assert components == {'house_number': '123', 'street': 'Main St #3', 'city': 'Seattle',
+                          'state': 'WA', 'zip': '98101'}
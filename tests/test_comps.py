@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+import pytest
+
+import geohash_cells
+from comps import CompsEngine
+
+pytest.importorskip('numpy')
+
+LATITUDE, LONGITUDE = 47.6062, -122.3321
+
+
+class FakeClient:
+    """Transactions at each queried cell's center; cells in fail raise like a Bridge error"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = 0
+
+    def get_transactions_near(self, longitude, latitude, radius, since, limit):
+        self.calls += 1
+        cell = geohash_cells.encode(latitude, longitude, 6)
+        if cell in self.fail:
+            raise ConnectionError(f"cell {cell} failed")
+        recorded = (date.today() - timedelta(days=30)).isoformat()
+        return [{'salesPrice': 500000, 'recordingDate': recorded, 'coordinates': [longitude, latitude],
+                 'parcels': [{'zpid': f"{cell}-1"}]}]
+
+    def get_parcels(self, zpids):
+        return {z: {'areas': [{'type': 'Living Building Area', 'areaSquareFeet': 2000}]} for z in zpids}
+
+
+def test_all_cells_loaded_is_complete():
+    client = FakeClient()
+    result = CompsEngine(client).query(LATITUDE, LONGITUDE, 0.5)
+    assert result['incomplete'] is False
+    assert result['failedCells'] == 0
+    assert result['totalCells'] == client.calls
+    assert result['summary']['averagePricePerSqFt'] == 250
+
+
+def test_failed_cells_are_reported_and_retried():
+    cells = geohash_cells.cells_within(LATITUDE, LONGITUDE, 0.5, 6)
+    failing = set(cells[:2])
+    engine = CompsEngine(FakeClient(fail=failing))
+
+    result = engine.query(LATITUDE, LONGITUDE, 0.5)
+    assert result['incomplete'] is True
+    assert result['failedCells'] == len(failing)
+    assert result['totalCells'] == len(cells)
+
+    # Failures aren't cached, so the next query loads those cells again
+    engine.client = FakeClient()
+    result = engine.query(LATITUDE, LONGITUDE, 0.5)
+    assert result['incomplete'] is False
+    assert engine.client.calls == len(failing)
+
+
+def test_every_cell_failing_returns_an_empty_result():
+    cells = geohash_cells.cells_within(LATITUDE, LONGITUDE, 0.5, 6)
+    result = CompsEngine(FakeClient(fail=cells)).query(LATITUDE, LONGITUDE, 0.5)
+    assert result['failedCells'] == result['totalCells'] == len(cells)
+    assert result['transactions'] == []
+    assert result['summary']['totalTransactions'] == 0
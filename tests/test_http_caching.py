@@ -0,0 +1,78 @@
+import pytest
+
+import app as app_module
+from http_caching import etag_for_versions
+
+
+def record(zpid, zestimate=100000):
+    return {'zpid': str(zpid), 'zestimate': zestimate, 'rentalZestimate': 1000, 'capRate': 7.2,
+            'livingArea': 1000, 'bedrooms': 2, 'bathrooms': 1}
+
+
+class FakeUpstream:
+    """Zestimates served in place of Bridge; ZPIDs not in values are unknown"""
+
+    def __init__(self):
+        self.values = {}
+        self.calls = []
+
+    def fetch(self, zpids):
+        self.calls.append(list(zpids))
+        return [record(z, self.values[z]) for z in zpids if z in self.values]
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    fake = FakeUpstream()
+    monkeypatch.setattr(app_module, 'fetch_property_records', fake.fetch)
+    return fake
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def test_etag_for_versions_needs_every_zpid_cached():
+    versions = {'1': 5, '2': 7}
+    assert etag_for_versions(['1', '2'], versions.get) == etag_for_versions(['1', '2'], versions.get)
+    assert etag_for_versions(['1', '2'], versions.get) != etag_for_versions(['2', '1'], versions.get)
+    assert etag_for_versions(['1', '3'], lambda z: versions.get(z, 0)) is None
+
+
+def test_unchanged_portfolio_is_not_modified_without_refetching(upstream, client):
+    upstream.values.update({'3601': 100000, '3602': 200000})
+    first = client.post('/api/properties', json={'zpids': ['3601', '3602']})
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and etag
+
+    second = client.post('/api/properties', json={'zpids': ['3601', '3602']}, headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert len(upstream.calls) == 1
+
+
+def test_changed_record_changes_the_etag(upstream, client, monkeypatch):
+    upstream.values.update({'3611': 100000})
+    etag = client.post('/api/properties', json={'zpids': ['3611']}).headers['ETag']
+
+    # Cached records count as stale, so the next request refetches and sees the change
+    monkeypatch.setattr(app_module, 'is_property_fresh', lambda zpid: False)
+    upstream.values['3611'] = 110000
+    response = client.post('/api/properties', json={'zpids': ['3611']}, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_partial_results_have_no_etag(upstream, client):
+    upstream.values.update({'3621': 100000})
+    response = client.post('/api/properties', json={'zpids': ['3621', '3622']})
+    assert response.status_code == 200
+    assert len(response.get_json()['properties']) == 1
+    assert 'ETag' not in response.headers
+
+
+def test_debug_timing_body_has_no_etag(upstream, client):
+    upstream.values.update({'3631': 100000})
+    response = client.post('/api/properties?debug_timing=1', json={'zpids': ['3631']})
+    assert '_timing' in response.get_json()
+    assert 'ETag' not in response.headers
@@ -0,0 +1,62 @@
+import io
+
+import pytest
+
+from portfolio_export import iter_export_chunks, iter_record_batches
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+PROPERTY_TYPES = ['Single Family Residential', 'Condominium', 'Townhouse']
+
+
+def fake_fetch(calls):
+    def fetch(zpids):
+        calls.append(list(zpids))
+        # Every third ZPID is unknown upstream
+        return [{'zpid': z, 'zestimate': int(z) * 1000, 'yearBuilt': '1990',
+                 'propertyType': PROPERTY_TYPES[min(int(z) // 10, 2)]}
+                for z in zpids if int(z) % 3]
+    return fetch
+
+
+def test_batches_are_fetched_lazily_in_chunks():
+    calls = []
+    zpids = [str(z) for z in range(1, 26)]
+    batches = iter_record_batches(zpids, fake_fetch(calls), batch_size=10)
+
+    first = next(batches)
+    assert calls == [zpids[:10]]
+    rest = list(batches)
+    assert [len(c) for c in calls] == [10, 10, 5]
+    assert sum(len(b) for b in [first] + rest) == len([z for z in zpids if int(z) % 3])
+
+
+def test_chunks_without_records_are_skipped():
+    batches = list(iter_record_batches(['3', '6', '9', '1'], fake_fetch([]), batch_size=3))
+    assert [[r['zpid'] for r in b] for b in batches] == [['1']]
+
+
+def test_parquet_export_writes_one_row_group_per_batch():
+    zpids = [str(z) for z in range(1, 31)]
+    data = b''.join(iter_export_chunks(iter_record_batches(zpids, fake_fetch([]), batch_size=10)))
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.metadata.num_rows == 20
+
+
+def test_arrow_export_keeps_categories_across_batches():
+    zpids = [str(z) for z in range(1, 31)]
+    records = fake_fetch([])(zpids)
+    chunks = list(iter_export_chunks(iter_record_batches(zpids, fake_fetch([]), batch_size=10), 'arrow'))
+    assert len(chunks) > 1
+
+    table = pa.ipc.open_file(io.BytesIO(b''.join(chunks))).read_all()
+    assert table.column('zpid').to_pylist() == [r['zpid'] for r in records]
+    assert table.column('propertyType').to_pylist() == [r['propertyType'] for r in records]
+    assert table.column('yearBuilt').to_pylist() == [1990] * len(records)
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        list(iter_export_chunks(iter([]), 'csv'))
@@ -0,0 +1,86 @@
+import pytest
+
+from property_cache import PortfolioSummaryStore, PropertyCache, summarize_properties
+
+
+def record(zpid, zestimate, rental=2000, living_area=1000):
+    return {'zpid': str(zpid), 'zestimate': zestimate, 'rentalZestimate': rental, 'capRate': 1.0,
+            'livingArea': living_area, 'bedrooms': 3, 'bathrooms': 2}
+
+
+def test_summary_applies_only_the_delta_of_a_changed_property():
+    cache = PropertyCache()
+    store = PortfolioSummaryStore(cache)
+    records = [record(z, 100000 * z) for z in (1, 2, 3)]
+    for r in records:
+        cache.put(r)
+    store.register('p', ['1', '2', '3', '4'])
+    assert store.summary('p') == summarize_properties(records)
+
+    records[1] = record(2, 250000, living_area=2000)
+    assert cache.put(records[1])
+    assert store.summary('p') == summarize_properties(records)
+
+    # A member that wasn't cached when the portfolio was registered is added when it arrives
+    records.append(record(4, 50000))
+    cache.put(records[3])
+    assert store.summary('p') == summarize_properties(records)
+    assert store.summary('p')['property_count'] == 4
+
+
+def test_unchanged_put_and_non_members_leave_summaries_alone():
+    cache = PropertyCache()
+    store = PortfolioSummaryStore(cache)
+    cache.put(record(1, 100000))
+    store.register('p', ['1'])
+    before = store.summary('p')
+    version = cache.version('1')
+
+    assert not cache.put(record(1, 100000))
+    cache.put(record(9, 900000))
+    assert cache.version('1') == version
+    assert store.summary('p') == before
+
+
+def test_eviction_removes_the_contribution():
+    cache = PropertyCache(maxsize=2)
+    store = PortfolioSummaryStore(cache)
+    cache.put(record(1, 100000))
+    cache.put(record(2, 200000))
+    store.register('p', ['1', '2'])
+
+    cache.get('1')  # 2 is now the least recently used
+    cache.put(record(3, 300000))
+    assert cache.get('2') is None
+    assert store.summary('p') == summarize_properties([record(1, 100000)])
+
+
+def test_remove_forgets_the_portfolio():
+    cache = PropertyCache()
+    store = PortfolioSummaryStore(cache)
+    cache.put(record(1, 100000))
+    store.register('p', ['1'])
+    store.remove('p')
+
+    assert store.summary('p') is None
+    assert store.names() == []
+    cache.put(record(1, 200000))  # no portfolio left to update
+
+
+def test_versions_are_not_reused_after_eviction():
+    cache = PropertyCache(maxsize=1)
+    cache.put(record(1, 100000))
+    first = cache.version('1')
+    cache.put(record(2, 200000))
+    assert cache.version('1') == 0
+    cache.put(record(1, 150000))
+    assert cache.version('1') > first
+
+
+@pytest.mark.parametrize('value', [None, 'N/A', ''])
+def test_non_numeric_values_count_as_zero(value):
+    cache = PropertyCache()
+    store = PortfolioSummaryStore(cache)
+    cache.put({**record(1, 100000), 'rentalZestimate': value})
+    store.register('p', ['1'])
+    assert store.summary('p')['total_rental'] == 0
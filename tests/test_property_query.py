@@ -0,0 +1,106 @@
+import pytest
+
+import property_query
+from property_cache import PropertyCache
+from property_query import PropertyIndex, decode_cursor, encode_cursor
+
+
+def make_index(count=60):
+    cache = PropertyCache()
+    index = PropertyIndex(cache)
+    for i in range(count):
+        cap_rate = None if i % 7 == 0 else (i % 5) * 1.5  # ties and records without a value
+        cache.put({
+            'zpid': str(1000 + i),
+            'capRate': cap_rate if cap_rate is not None else 'N/A',
+            'zestimate': 100000 + i * 1000,
+            'latitude': 45.5 + i * 0.001,
+            'longitude': -122.6,
+        })
+    return cache, index
+
+
+def expected_order(cache, zpids, descending):
+    records = cache.get_many(zpids)
+    present = [(property_query._number(r['capRate']), z) for z, r in records.items()
+               if property_query._number(r['capRate']) is not None]
+    missing = sorted(z for z, r in records.items() if property_query._number(r['capRate']) is None)
+    return [z for _value, z in sorted(present, reverse=descending)] + missing
+
+
+def page_all(index, limit, **kwargs):
+    zpids, cursor, pages = [], None, 0
+    while True:
+        page = index.query(limit=limit, cursor=cursor, **kwargs)
+        zpids.extend(record['zpid'] for record in page.properties)
+        pages += 1
+        cursor = page.next_cursor
+        if cursor is None:
+            return zpids, pages
+
+
+@pytest.mark.parametrize('descending', [True, False])
+@pytest.mark.parametrize('scan_ratio', [0, 10 ** 6])
+def test_paging_matches_full_sort(monkeypatch, descending, scan_ratio):
+    # SCAN_RATIO 0 always scans the members; a huge one always walks the index
+    monkeypatch.setattr(property_query, 'SCAN_RATIO', scan_ratio)
+    cache, index = make_index()
+    members = [str(1000 + i) for i in range(0, 60, 2)]
+
+    zpids, pages = page_all(index, 4, zpids=members, sort='capRate', descending=descending)
+
+    assert zpids == expected_order(cache, members, descending)
+    assert pages == -(-len(members) // 4)
+
+
+def test_walk_and_scan_return_the_same_pages(monkeypatch):
+    cache, index = make_index()
+    members = [str(1000 + i) for i in range(1, 60, 3)]
+    results = []
+    for scan_ratio in (0, 10 ** 6):
+        monkeypatch.setattr(property_query, 'SCAN_RATIO', scan_ratio)
+        results.append(page_all(index, 3, zpids=members, sort='capRate', descending=True))
+    assert results[0] == results[1]
+
+
+@pytest.mark.parametrize('scan_ratio', [0, 10 ** 6])
+def test_missing_values_tail(monkeypatch, scan_ratio):
+    monkeypatch.setattr(property_query, 'SCAN_RATIO', scan_ratio)
+    cache, index = make_index()
+    members = [str(1000 + i) for i in range(60)]
+    missing = sorted(z for z in members if (int(z) - 1000) % 7 == 0)
+
+    # A cursor on a record without a value continues within the tail only
+    cursor = encode_cursor('capRate', True, None, missing[1])
+    page = index.query(zpids=members, sort='capRate', descending=True, limit=3, cursor=cursor)
+    assert [r['zpid'] for r in page.properties] == missing[2:5]
+
+    zpids, _pages = page_all(index, 5, zpids=members, sort='capRate', descending=True)
+    assert zpids[-len(missing):] == missing
+
+
+def test_range_filter_on_sort_field_excludes_missing_values():
+    cache, index = make_index()
+    zpids, _pages = page_all(index, 7, sort='capRate', descending=False, filters={'capRate': (1.5, 4.5)})
+    values = [property_query._number(cache.get(z)['capRate']) for z in zpids]
+    assert values == sorted(values)
+    assert all(1.5 <= value <= 4.5 for value in values)
+
+
+@pytest.mark.parametrize('value', ['abc', True, [1], {'a': 1}])
+def test_tampered_cursor_value_is_rejected(value):
+    _cache, index = make_index()
+    cursor = encode_cursor('capRate', True, value, '1001')
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 'capRate', True)
+    for members in (None, ['1001', '1002']):
+        with pytest.raises(ValueError):
+            index.query(zpids=members, sort='capRate', descending=True, cursor=cursor)
+
+
+def test_cursor_for_another_sort_is_rejected():
+    cursor = encode_cursor('zestimate', True, 1.0, '1001')
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 'capRate', True)
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor!', 'capRate', True)
@@ -0,0 +1,78 @@
+import pytest
+
+import app as app_module
+
+
+def record(zpid, zestimate=100000):
+    return {'zpid': str(zpid), 'zestimate': zestimate, 'rentalZestimate': 1000, 'capRate': 7.2,
+            'livingArea': 1000, 'bedrooms': 2, 'bathrooms': 1}
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    rows = []
+    monkeypatch.setattr(app_module, 'load_saved_portfolios', lambda: list(rows))
+    return rows
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    calls = []
+
+    def fetch(zpids):
+        calls.append(list(zpids))
+        return [record(z) for z in zpids if z != '404']
+    monkeypatch.setattr(app_module, 'fetch_property_records', fetch)
+    return calls
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def test_newest_revision_of_a_name_wins(saved):
+    saved.extend([
+        {'name': 'a', 'timestamp': '2024-01-02T00:00:00', 'zpids': ['2']},
+        {'name': 'a', 'timestamp': '2024-01-01T00:00:00', 'zpids': ['1']},
+        {'name': 'b', 'timestamp': '2024-01-01T00:00:00', 'zpids': ['3']},
+        {'name': 'b', 'timestamp': '2024-01-01T00:00:00', 'zpids': ['4']},
+    ])
+    latest = app_module.latest_saved_portfolios()
+    assert latest['a']['zpids'] == ['2']
+    assert latest['b']['zpids'] == ['4']  # the later row on a tie
+
+
+def test_shared_zpids_are_fetched_once(saved, fetched, client):
+    saved.extend([
+        {'name': 'r1', 'timestamp': '1', 'zpids': ['11', '12', '13']},
+        {'name': 'r2', 'timestamp': '1', 'zpids': ['12', '13', '14', '404']},
+        {'name': 'r1', 'timestamp': '0', 'zpids': ['99']},
+    ])
+    response = client.post('/api/refresh-portfolios', json={'names': ['r1', 'r2', 'nope', 'r1']})
+    assert response.status_code == 200
+    data = response.get_json()
+
+    assert fetched == [['11', '12', '13', '14', '404']]
+    assert data['total_entries'] == 7
+    assert data['unique_zpids'] == 5
+    assert data['refreshed'] == 4
+    assert data['not_found'] == ['nope']
+    summaries = {p['name']: p for p in data['portfolios']}
+    assert list(summaries) == ['r1', 'r2']
+    assert summaries['r1']['summary']['property_count'] == 3
+    assert summaries['r2']['missing_zpids'] == ['404']
+
+
+def test_refresh_over_the_zpid_cap_is_rejected(saved, fetched, client, monkeypatch):
+    monkeypatch.setattr(app_module, 'MAX_REFRESH_ZPIDS', 2)
+    saved.append({'name': 'big', 'timestamp': '1', 'zpids': ['21', '22', '23']})
+    response = client.post('/api/refresh-portfolios', json={'names': ['big']})
+    assert response.status_code == 400
+    assert fetched == []
+
+
+def test_unknown_portfolios_are_not_found(saved, fetched, client):
+    response = client.post('/api/refresh-portfolios', json={'names': ['missing']})
+    assert response.status_code == 404
+    assert client.post('/api/refresh-portfolios', json={'names': 'missing'}).status_code == 400
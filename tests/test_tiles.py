@@ -0,0 +1,83 @@
+import pytest
+
+import geohash_cells
+from tiles import adjacent_tiles, geohash_key, parse_heading, tile_bounds, xyz_key
+
+
+def test_geohash_encode_matches_known_cells():
+    assert geohash_cells.encode(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+    assert geohash_cells.encode(47.6062, -122.3321, 6) == 'c23nb6'
+
+
+def test_geohash_bounds_contain_the_point():
+    south, north, west, east = geohash_cells.bounds(geohash_cells.encode(47.6062, -122.3321, 7))
+    assert south <= 47.6062 < north and west <= -122.3321 < east
+    assert (north - south, east - west) == pytest.approx(geohash_cells.cell_size(7))
+
+
+def test_geohash_neighbors_wrap_the_antimeridian():
+    cell = geohash_cells.encode(0.01, 179.999, 6)
+    east = geohash_cells.neighbor(cell, 0, 1)
+    assert geohash_cells.center(east)[1] < -179
+    assert len(geohash_cells.neighbors(cell)) == 8
+    assert geohash_cells.neighbor(geohash_cells.encode(89.999, 0, 6), 1, 0) is None
+
+
+def test_cells_within_cover_the_circle():
+    cells = geohash_cells.cells_within(47.6062, -122.3321, 0.5, 6)
+    assert geohash_cells.encode(47.6062, -122.3321, 6) in cells
+    assert geohash_cells.encode(47.6062 + 0.5 / 69, -122.3321, 6) in cells
+    assert len(cells) == len(set(cells))
+
+
+@pytest.mark.parametrize('args', [(13, 0, 0), (21, 0, 0), (15, 2 ** 15, 0), (15, 0, -1)])
+def test_xyz_key_rejects_out_of_range_tiles(args):
+    with pytest.raises(ValueError):
+        xyz_key(*args)
+
+
+@pytest.mark.parametrize('prefix', ['c23nb', 'c23nb6c23n', 'c23nba'])
+def test_geohash_key_rejects_bad_prefixes(prefix):
+    with pytest.raises(ValueError):
+        geohash_key(prefix)
+
+
+def test_geohash_key_is_case_insensitive():
+    assert geohash_key('C23NB6') == ('geohash', 'c23nb6')
+
+
+def test_xyz_tiles_bounds_touch():
+    south, north, west, east = tile_bounds(xyz_key(15, 5000, 11000))
+    assert tile_bounds(xyz_key(15, 5001, 11000))[2] == pytest.approx(east)
+    assert tile_bounds(xyz_key(15, 5000, 11001))[1] == pytest.approx(south)
+    assert south < north and west < east
+
+
+def test_all_neighbors_without_a_heading():
+    assert len(adjacent_tiles(xyz_key(15, 5000, 11000))) == 8
+    # The top row has nothing to the north
+    assert len(adjacent_tiles(xyz_key(15, 5000, 0))) == 5
+
+
+@pytest.mark.parametrize('heading, expected', [
+    ((1, 0), {(5001, 10999), (5001, 11000), (5001, 11001)}),
+    ((0, -1), {(4999, 10999), (5000, 10999), (5001, 10999)}),
+    ((1, 1), {(5001, 11000), (5000, 11001), (5001, 11001)}),
+])
+def test_heading_keeps_the_tiles_ahead(heading, expected):
+    tiles = adjacent_tiles(xyz_key(15, 5000, 11000), heading)
+    assert {(x, y) for _, _, x, y in tiles} == expected
+
+
+def test_geohash_heading_north():
+    cell = 'c23nb6'
+    tiles = adjacent_tiles(geohash_key(cell), (0, -1))
+    assert len(tiles) == 3
+    assert ('geohash', geohash_cells.neighbor(cell, 1, 0)) in tiles
+    assert all(geohash_cells.center(t[1])[0] > geohash_cells.center(cell)[0] for t in tiles)
+
+
+@pytest.mark.parametrize('text', ['0,0', '2,0', 'east', '1', '1,0,1'])
+def test_bad_headings_are_rejected(text):
+    with pytest.raises(ValueError):
+        parse_heading(text)
@@ -0,0 +1,132 @@
+import logging
+import math
+
+import geohash_cells
+from bridge import build_property_record
+from cell_cache import CellCache
+from property_query import haversine_miles
+
+logger = logging.getLogger(__name__)
+
+# Smaller zooms / shorter prefixes cover more properties than one Bridge query returns
+MIN_TILE_ZOOM = 14
+MAX_TILE_ZOOM = 20
+MIN_GEOHASH_PRECISION = 6
+MAX_GEOHASH_PRECISION = 9
+# Bridge's maximum page size for a near query
+MAX_TILE_PROPERTIES = 200
+
+
+def xyz_key(z, x, y):
+    """Tile key for a z/x/y web map tile; ValueError if it is out of range"""
+    if not MIN_TILE_ZOOM <= z <= MAX_TILE_ZOOM:
+        raise ValueError(f"Zoom must be between {MIN_TILE_ZOOM} and {MAX_TILE_ZOOM}")
+    if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise ValueError(f"Tile {x}/{y} is outside zoom {z}")
+    return ('xyz', z, x, y)
+
+
+def geohash_key(prefix):
+    """Tile key for a geohash prefix; ValueError if it is invalid"""
+    prefix = prefix.lower()
+    if not MIN_GEOHASH_PRECISION <= len(prefix) <= MAX_GEOHASH_PRECISION:
+        raise ValueError(f"Geohash prefix must be {MIN_GEOHASH_PRECISION}-{MAX_GEOHASH_PRECISION} characters")
+    if not geohash_cells.is_valid(prefix):
+        raise ValueError(f"Invalid geohash: {prefix}")
+    return ('geohash', prefix)
+
+
+def tile_name(key):
+    return key[1] if key[0] == 'geohash' else '/'.join(str(part) for part in key[1:])
+
+
+def _tile_latitude(y, z):
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / 2 ** z))))
+
+
+def tile_bounds(key):
+    """(south, north, west, east) of a tile"""
+    if key[0] == 'geohash':
+        return geohash_cells.bounds(key[1])
+    _, z, x, y = key
+    return _tile_latitude(y + 1, z), _tile_latitude(y, z), x / 2 ** z * 360 - 180, (x + 1) / 2 ** z * 360 - 180
+
+
+def parse_heading(text):
+    """(dx, dy) pan direction from "dx,dy" with each -1, 0 or 1 (x east, y south); ValueError if invalid"""
+    try:
+        dx, dy = (int(part) for part in text.split(','))
+    except ValueError:
+        raise ValueError("heading must be dx,dy with each -1, 0 or 1")
+    if dx not in (-1, 0, 1) or dy not in (-1, 0, 1) or not (dx or dy):
+        raise ValueError("heading must be dx,dy with each -1, 0 or 1, not both 0")
+    return dx, dy
+
+
+def adjacent_tiles(key, heading=None):
+    """The tiles around a tile, wrapping around the antimeridian
+
+    With a (dx, dy) heading only the (up to three) tiles ahead of it are
+    returned, otherwise all eight.
+    """
+    offsets = [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy]
+    if heading:
+        offsets = [(dx, dy) for dx, dy in offsets if dx * heading[0] + dy * heading[1] > 0]
+    if key[0] == 'geohash':
+        cells = (geohash_cells.neighbor(key[1], -dy, dx) for dx, dy in offsets)
+        return [('geohash', cell) for cell in cells if cell]
+    _, z, x, y = key
+    n = 2 ** z
+    return [('xyz', z, (x + dx) % n, y + dy) for dx, dy in offsets if 0 <= y + dy < n]
+
+
+class TileCache:
+    """Enriched property records per map tile, with the tiles ahead of a pan prefetched
+
+    A tile is loaded with one Bridge near query at its center, keeping the
+    records inside it, plus the usual parcel lookup. Records live only in
+    the tile, so they expire with it rather than filling the property cache.
+    Prefetching the tiles in the pan direction means panning on is usually
+    answered from the cache, at no more than three extra queries per tile.
+    """
+
+    def __init__(self, client, cache_size=5000, cache_ttl=3600, workers=4, prefetch_workers=2):
+        self.client = client
+        self.tiles = CellCache(self._load_tile, 'tiles', maxsize=cache_size, ttl=cache_ttl, workers=workers,
+                               prefetch_workers=prefetch_workers)
+
+    def _load_tile(self, key):
+        south, north, west, east = tile_bounds(key)
+        latitude, longitude = (south + north) / 2, (west + east) / 2
+        bundle = self.client.get_nearby(longitude, latitude, limit=MAX_TILE_PROPERTIES)
+        inside = [
+            record for record in bundle
+            if record.get('zpid') and record.get('Latitude') is not None and record.get('Longitude') is not None
+            and south <= float(record['Latitude']) < north and west <= float(record['Longitude']) < east
+        ]
+        parcels = self.client.get_parcels([str(record['zpid']) for record in inside])
+        properties = [build_property_record(record, parcels.get(str(record['zpid']))) for record in inside]
+        logger.debug(f"Tile {tile_name(key)}: {len(properties)} of {len(bundle)} nearby records inside")
+
+        # A full page that ends before the tile's corners may have missed records near them
+        truncated = False
+        if len(bundle) >= MAX_TILE_PROPERTIES and bundle[-1].get('Latitude') is not None:
+            reach = haversine_miles(latitude, longitude, float(bundle[-1]['Latitude']), float(bundle[-1]['Longitude']))
+            truncated = reach < haversine_miles(latitude, longitude, north, east)
+        return {
+            'tile': tile_name(key),
+            'bounds': {'south': south, 'north': north, 'west': west, 'east': east},
+            'truncated': truncated,
+            'properties': properties
+        }
+
+    def get(self, key, heading=None):
+        """Tile payload, or None if it could not be loaded
+
+        With a (dx, dy) heading the adjacent tiles in that direction are
+        queued for prefetch; without one nothing is prefetched.
+        """
+        tile = self.tiles.get(key)
+        if heading:
+            self.tiles.prefetch(adjacent_tiles(key, heading))
+        return tile
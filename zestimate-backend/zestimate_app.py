@@ -4,6 +4,13 @@ import os
 import requests
 from dotenv import load_dotenv
 
+# bridge, instrumentation and metrics are imported from the repository root,
+# which must be on the import path: the Procfile runs gunicorn from there with
+# --pythonpath, and locally run PYTHONPATH=. python zestimate-backend/zestimate_app.py
+from bridge import BridgeBatchError, BridgeClient, cap_rate
+from instrumentation import init_instrumentation
+from metrics import init_metrics
+
 # Load environment variables from .env file if running locally
 if os.getenv('FLASK_ENV') != 'production':
     load_dotenv()
@@ -14,9 +21,22 @@ api_key = os.getenv("API_KEY")
 if not api_key:
     raise ValueError("API_KEY not found in the environment variables.")
 
+# Shared Bridge data access (pooled session, zpid.in batching, caching, rate
+# limiting), configured from the same BRIDGE_* env vars as app.py
+bridge_client = BridgeClient.from_env(api_key=api_key)
+
+# Nearby properties returned by /get-nearby-properties
+NEARBY_LIMIT = 200
+
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": ["https://realli-95ae66f0e9f4.herokuapp.com", "http://localhost:5173"]}})
+init_instrumentation(app)
+init_metrics(app)
+
+
+def format_cap_rate(record):
+    return f"{cap_rate(record.get('zestimate'), record.get('rentalZestimate')):.2f}%"
 
 
 @app.route('/')
@@ -31,33 +51,21 @@ def get_properties():
     if not zpid_list:
         return jsonify({"error": "No ZPIDs provided"}), 400
 
-    # Define the API URL with your access token
-    api_url = "https://api.bridgedataoutput.com/api/v2/zestimates_v2/zestimates"
-
-    # Initialize an empty list to store all results
-    all_results = []
-
-    # Split the ZPID list into batches of 8
-    batch_size = 8
-    for i in range(0, len(zpid_list), batch_size):
-        batch = zpid_list[i:i+batch_size]
-        params = {
-            "access_token": api_key,
-            "zpid.in": ",".join(batch)
-        }
-        response = requests.get(api_url, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            if 'bundle' in data:
-                bundle = data['bundle']
-                for result in bundle:
-                    zestimate = float(result.get('zestimate', 0))
-                    rental_zestimate = float(result.get('rentalZestimate', 0))
-                    cap_rate = (rental_zestimate * 12 * 0.60 / zestimate * 100) if zestimate != 0 else 0
-                    result['capRate'] = f"{cap_rate:.2f}%"
-                all_results.extend(bundle)
-        else:
-            return jsonify({"error": f"Request failed with status code {response.status_code}"}), response.status_code
+    zpid_list = [str(zpid) for zpid in zpid_list]
+    # As in app.py, a failed zpid.in batch leaves its ZPIDs out of the results;
+    # only when every batch failed is it an error
+    try:
+        zestimates = bridge_client.get_zestimates(zpid_list)
+    except BridgeBatchError as e:
+        if not e.results:
+            return jsonify({"error": str(e), "failed_zpids": e.failed}), 502
+        zestimates = e.results
+
+    # Cached records are shared, so annotate copies
+    all_results = [
+        {**zestimates[zpid], 'capRate': format_cap_rate(zestimates[zpid])}
+        for zpid in dict.fromkeys(zpid_list) if zpid in zestimates
+    ]
 
     if all_results:
         return jsonify(all_results), 200
@@ -71,65 +79,40 @@ def get_nearby_properties():
     if not zpid:
         return jsonify({'error': 'ZPID is required'}), 400
 
-    # Define the API URL with your access token
-    zpid_api_url = "https://api.bridgedataoutput.com/api/v2/zestimates_v2/zestimates"
-    params = {
-        "access_token": api_key,
-        "zpid": zpid
-    }
-
     try:
         # Get the property data for the given ZPID
-        property_response = requests.get(zpid_api_url, params=params)
-        property_response.raise_for_status()
-        property_data = property_response.json()
-
-        if 'bundle' in property_data and len(property_data['bundle']) > 0:
-            latitude = property_data['bundle'][0].get('Latitude')
-            longitude = property_data['bundle'][0].get('Longitude')
-
-            if latitude and longitude:
-                nearby_api_url = "https://api.bridgedataoutput.com/api/v2/zestimates_v2/zestimates"
-                params = {
-                    "access_token": api_key,
-                    "near": f"{longitude},{latitude}",
-                    "limit": 200
-                }
-
-                response = requests.get(nearby_api_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-
-                if 'bundle' in data:
-                    properties = []
-                    for result in data['bundle']:
-                        address = result.get('address', '')
-                        zestimate = result.get('zestimate', 0)
-                        rental_zestimate = result.get('rentalZestimate', 0)
-
-                        zestimate = float(zestimate) if zestimate is not None else 0
-                        rental_zestimate = float(rental_zestimate) if rental_zestimate is not None else 0
-
-                        cap_rate = (rental_zestimate * 12 * 0.60) / zestimate * 100 if zestimate != 0 else 0
-
-                        properties.append({
-                            'address': address,
-                            'zestimate': zestimate,
-                            'rentalZestimate': rental_zestimate,
-                            'capRate': f"{cap_rate:.2f}%"
-                        })
-
-                    properties.sort(key=lambda x: float(x['capRate'].rstrip('%')), reverse=True)
-                    return jsonify(properties)
-                else:
-                    return jsonify({'error': 'No nearby properties found'}), 404
-            else:
-                return jsonify({'error': 'Latitude and longitude not found for the given ZPID'}), 400
-        else:
+        property_data = bridge_client.get_zestimates([zpid]).get(str(zpid))
+        if not property_data:
             return jsonify({'error': 'No property found for the given ZPID'}), 404
 
+        latitude = property_data.get('Latitude')
+        longitude = property_data.get('Longitude')
+        if not (latitude and longitude):
+            return jsonify({'error': 'Latitude and longitude not found for the given ZPID'}), 400
+
+        bundle = bridge_client.get_nearby(longitude, latitude, limit=NEARBY_LIMIT)
+        if not bundle:
+            return jsonify({'error': 'No nearby properties found'}), 404
+
+        properties = []
+        for result in bundle:
+            zestimate = result.get('zestimate')
+            rental_zestimate = result.get('rentalZestimate')
+            properties.append({
+                'address': result.get('address', ''),
+                'zestimate': float(zestimate) if zestimate is not None else 0,
+                'rentalZestimate': float(rental_zestimate) if rental_zestimate is not None else 0,
+                'capRate': cap_rate(zestimate, rental_zestimate)
+            })
+
+        # Sort on the number, then format it
+        properties.sort(key=lambda x: x['capRate'], reverse=True)
+        for prop in properties:
+            prop['capRate'] = f"{prop['capRate']:.2f}%"
+        return jsonify(properties)
+
     except requests.RequestException as e:
-        return jsonify({'error': str(e)}), 500
+        return jsonify({'error': str(e)}), 502
 
 # Updated endpoint to get parcel data by ZPIDs
 @app.route('/get-parcel-data', methods=['POST'])
@@ -139,20 +122,11 @@ def get_parcel_data():
     if not zpid_list:
         return jsonify({"error": "No ZPIDs provided"}), 400
 
-    base_url = "https://api.bridgedataoutput.com/api/v2/pub/parcels"
-    all_records = []
-
-    for zpid in zpid_list:
-        url = f"{base_url}?zpid={zpid}&access_token={api_key}"
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-            if 'bundle' in data and len(data['bundle']) > 0:
-                # Include all fields from the API response
-                all_records.append(data['bundle'][0])
-        except requests.exceptions.RequestException as e:
-            print(f"Failed to retrieve data for ZPID {zpid}: {e}")
+    # Fetched in concurrent zpid.in batches; all fields from the API response are kept
+    zpid_list = list(dict.fromkeys(str(zpid) for zpid in zpid_list))
+    parcels = bridge_client.get_parcels(zpid_list)
+
+    all_records = [parcels[zpid] for zpid in zpid_list if zpid in parcels]
 
     if all_records:
         return jsonify(all_records), 200